@@ -0,0 +1,197 @@
+import io
+import os
+import glob
+import pickle
+import struct
+from typing import Dict, List, Optional
+
+CHECKPOINT_MAGIC = b'MCKP'
+CHECKPOINT_HEADER = struct.Struct('<4sIQ') # magic, buffer count, payload length
+BUFFER_LENGTH = struct.Struct('<Q')
+CHECKPOINT_PREFIX = 'checkpoint_'
+CHECKPOINT_SUFFIX = '.ckpt'
+
+class _CheckpointPickler(pickle.Pickler):
+    """ Shared engine objects are stored by reference and resolved against the running engine on load. """
+    def __init__(self, file, references: Dict[int, tuple], **kwargs):
+        super().__init__(file, **kwargs)
+        self.references = references
+
+    def persistent_id(self, obj):
+        return self.references.get(id(obj))
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    def __init__(self, file, references: Dict[tuple, object], **kwargs):
+        super().__init__(file, **kwargs)
+        self.references = references
+
+    def persistent_load(self, pid):
+        try:
+            return self.references[pid]
+        except KeyError:
+            raise pickle.UnpicklingError(f"Checkpoint references {pid}, which is not part of the running engine.")
+
+class Checkpointer:
+    """
+    Saves and restores the complete backtest engine state.
+
+    Checkpoints are written with pickle protocol 5, numpy buffers (e.g. in strategy dataframes) are written
+    out-of-band after the pickle payload instead of being copied into it. Symbols, contracts and the engine's
+    shared components are stored by reference, so restored state points at the live objects.
+    """
+    def __init__(self, directory: str, every_events: Optional[int] = None, at_eod: bool = True, keep: int = 2, resume: bool = True):
+        """
+        Args:
+            directory (str) : Directory the checkpoints are written to.
+            every_events (int) : Checkpoint once at least this many events were dispatched since the last one, None disables.
+            at_eod (bool) : Checkpoint once the first bar of every new day is processed.
+            keep (int) : Number of most recent checkpoints kept on disk.
+            resume (bool) : Resume the backtest from the latest checkpoint in directory if one exists.
+        """
+        if every_events is not None and (not isinstance(every_events, int) or every_events <= 0):
+            raise ValueError("'every_events' must be a positive integer or None.")
+        if not isinstance(keep, int) or keep <= 0:
+            raise ValueError("'keep' must be a positive integer.")
+
+        self.directory = directory
+        self.every_events = every_events
+        self.at_eod = at_eod
+        self.keep = keep
+        self.resume = resume
+        self.last_event_count = 0
+
+    def should_checkpoint(self, event_count: int, new_day: bool) -> bool:
+        if self.at_eod and new_day:
+            return True
+        return self.every_events is not None and event_count - self.last_event_count >= self.every_events
+
+    # -- State --
+    def capture(self, controller) -> dict:
+        """ Engine state at a point where the event queue is empty. """
+        return {
+            "event_count": controller.event_count,
+            "current_day": controller.current_day,
+            "data_client": {
+                "current_date_index": controller.hist_data_client.current_date_index,
+                "next_date": controller.hist_data_client.next_date,
+            },
+            "order_book": {
+                "book": controller.order_book.book,
+                "last_updated": controller.order_book.last_updated,
+            },
+            "dummy_broker": {
+                "positions": controller.dummy_broker.positions,
+                "position_versions": controller.dummy_broker.position_versions,
+                "dirty_positions": controller.dummy_broker.dirty_positions,
+                "last_trade": controller.dummy_broker.last_trade,
+                "account": controller.dummy_broker.account,
+                "valuation": controller.dummy_broker.valuation,
+                "resting_orders": controller.dummy_broker.resting_orders,
+            },
+            "portfolio_server": {
+                "capital": controller.portfolio_server.capital,
+                "account": controller.portfolio_server.account,
+                "positions": controller.portfolio_server.positions,
+                "position_versions": controller.portfolio_server.position_versions,
+                "active_orders": controller.portfolio_server.active_orders,
+            },
+            "performance_manager": {
+                "signals": controller.performance_manager.signals,
+                "trade_log": controller.performance_manager.trade_log,
+                "equity_log": controller.performance_manager.equity_log,
+                "online_stats": controller.performance_manager.online_stats,
+            },
+            "strategy": controller.strategy.get_state(),
+        }
+
+    def apply(self, controller, state: dict):
+        controller.event_count = state['event_count']
+        controller.current_day = state['current_day']
+
+        for component, attributes in [(controller.hist_data_client, state['data_client']),
+                                      (controller.order_book, state['order_book']),
+                                      (controller.dummy_broker, state['dummy_broker']),
+                                      (controller.portfolio_server, state['portfolio_server']),
+                                      (controller.performance_manager, state['performance_manager'])]:
+            for name, value in attributes.items():
+                setattr(component, name, value)
+
+        controller.strategy.set_state(state['strategy'])
+        self.last_event_count = controller.event_count
+
+    def _references(self, controller) -> Dict[tuple, object]:
+        references = {}
+        for name in ['event_queue', 'logger', 'order_book', 'order_manager', 'portfolio_server', 'performance_manager', 'broker_client', 'dummy_broker', 'hist_data_client']:
+            component = getattr(controller, name, None)
+            if component is not None:
+                references[('component', name)] = component
+
+        for ticker, symbol in controller.portfolio_server.symbols_map.items():
+            references[('symbol', ticker)] = symbol
+            references[('contract', ticker)] = symbol.contract
+        return references
+
+    # -- Files --
+    def save(self, controller) -> str:
+        """ Writes a checkpoint of the engine, returns its path. """
+        state = self.capture(controller)
+        references = {id(obj): pid for pid, obj in self._references(controller).items()}
+
+        buffers : List[pickle.PickleBuffer] = []
+        payload = io.BytesIO()
+        _CheckpointPickler(payload, references, protocol=5, buffer_callback=buffers.append).dump(state)
+        raw_buffers = [buffer.raw() for buffer in buffers]
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{CHECKPOINT_PREFIX}{controller.event_count:012d}{CHECKPOINT_SUFFIX}")
+        temp_path = path + '.tmp'
+
+        with open(temp_path, 'wb') as file:
+            file.write(CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, len(raw_buffers), payload.getbuffer().nbytes))
+            for buffer in raw_buffers:
+                file.write(BUFFER_LENGTH.pack(buffer.nbytes))
+            file.write(payload.getbuffer())
+            for buffer in raw_buffers:
+                file.write(buffer)
+
+        os.replace(temp_path, path) # a checkpoint is only visible once completely written
+        self.last_event_count = controller.event_count
+        self._prune()
+        return path
+
+    def load(self, controller, path: str):
+        """ Restores the engine from the checkpoint at path. """
+        with open(path, 'rb') as file:
+            data = memoryview(bytearray(file.read())) # writable, restored arrays are not read-only
+
+        magic, buffer_count, payload_length = CHECKPOINT_HEADER.unpack_from(data, 0)
+        if magic != CHECKPOINT_MAGIC:
+            raise ValueError(f"{path} is not a checkpoint.")
+
+        offset = CHECKPOINT_HEADER.size
+        lengths = []
+        for _ in range(buffer_count):
+            lengths.append(BUFFER_LENGTH.unpack_from(data, offset)[0])
+            offset += BUFFER_LENGTH.size
+
+        payload = data[offset:offset + payload_length]
+        offset += payload_length
+
+        buffers = []
+        for length in lengths:
+            buffers.append(data[offset:offset + length])
+            offset += length
+
+        state = _CheckpointUnpickler(io.BytesIO(payload), self._references(controller), buffers=buffers).load()
+        self.apply(controller, state)
+
+    def latest(self) -> Optional[str]:
+        checkpoints = self.checkpoints()
+        return checkpoints[-1] if checkpoints else None
+
+    def checkpoints(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, f"{CHECKPOINT_PREFIX}*{CHECKPOINT_SUFFIX}")))
+
+    def _prune(self):
+        for path in self.checkpoints()[:-self.keep]:
+            os.remove(path)
@@ -1,3 +1,4 @@
+import os
 import queue
 import logging
 from enum import Enum
@@ -10,6 +11,7 @@ from midas.order_book import OrderBook
 from midas.symbols.symbols import Symbol
 from midas.strategies import BaseStrategy
 from midas.utils.logger import SystemLogger
+from midas.utils.market_recorder import MarketDataRecorder
 from midas.portfolio import PortfolioServer
 from midas.order_manager import OrderManager
 from midas.performance import PerformanceManager
@@ -17,6 +19,7 @@ from midas.performance import PerformanceManager
 
 DATABASE_KEY = config('MIDAS_API_KEY')
 DATABASE_URL = config('MIDAS_URL')
+BACKTEST_UPLOAD_URL = config('MIDAS_BACKTEST_UPLOAD_URL', default=None) # backtests streamed gzip compressed when set
 
 class Mode(Enum):
     LIVE = "LIVE"
@@ -49,6 +52,7 @@ class Config:
         self.broker_client = None
         self.dummy_broker = None
         self.contract_handler = None
+        self.market_data_recorder = None
         self.symbols_map = {}
         self.data_ticker_map = {}
 
@@ -85,7 +89,9 @@ class Config:
 
     def _initialize_components(self):
         self.order_book = OrderBook(data_type=self.params.data_type)
-        self.performance_manager = PerformanceManager(self.database,self.logger, self.params)
+        # Benchmark closes cached on disk between runs
+        benchmark_cache_dir = os.path.join(os.getcwd(), self.params.strategy_name, 'benchmark_cache')
+        self.performance_manager = PerformanceManager(self.database,self.logger, self.params, benchmark_cache_dir=benchmark_cache_dir, upload_url=BACKTEST_UPLOAD_URL, api_key=DATABASE_KEY)
         self.portfolio_server = PortfolioServer(self.symbols_map, self.logger)
         self.order_manager = OrderManager(self.symbols_map, self.event_queue, self.order_book, self.portfolio_server, self.logger)
 
@@ -97,16 +103,23 @@ class Config:
     def _set_live_environment(self):
         from midas.gateways.live import (DataClient, BrokerClient, ContractManager)
         
+        # Incoming bars recorded to daily files, replayable in a backtest through Parameters.data_directory
+        self.market_data_recorder = MarketDataRecorder(os.path.join(os.getcwd(), self.params.strategy_name, 'market_data'), self.logger)
+        self.market_data_recorder.start()
+
         # Gateways
-        self.live_data_client = DataClient(self.event_queue, self.logger)
+        self.live_data_client = DataClient(self.event_queue, self.logger, recorder=self.market_data_recorder)
         self.broker_client = BrokerClient(self.event_queue,self.logger,self.portfolio_server, self.performance_manager)
         self._connect_live_clients()
         
         # Handlers
-        self.contract_handler = ContractManager(self.live_data_client, self.logger) # TODO: CAN ADD to the Data CLIENT AND/OR TRADE CLIENT
+        # Contracts validated concurrently, with validated details cached between runs
+        cache_path = os.path.join(os.getcwd(), self.params.strategy_name, 'contract_cache.pkl')
+        self.contract_handler = ContractManager(self.live_data_client, self.logger, cache_path=cache_path) # TODO: CAN ADD to the Data CLIENT AND/OR TRADE CLIENT
+        validated = self.contract_handler.validate_contracts([symbol.contract for symbol in self.symbols_map.values()])
 
         for ticker, symbol in self.symbols_map.items():
-            if not self.contract_handler.validate_contract(symbol.contract):
+            if not validated[self.contract_handler.contract_key(symbol.contract)]:
                 raise RuntimeError(f"{ticker} invalid contract.")
 
     def _set_backtest_environment(self):
@@ -114,7 +127,10 @@ class Config:
 
         # Gateways
         self.hist_data_client = DataClient(self.event_queue, self.database)
-        self.dummy_broker = DummyBroker(self.symbols_map, self.event_queue,self.order_book, self.params.capital, self.logger)
+        self.dummy_broker = DummyBroker(self.symbols_map, self.event_queue,self.order_book, self.params.capital, self.logger, margin_call_policy=self.params.margin_call_policy,
+                                        slippage_model=self.params.slippage_model, commission_model=self.params.commission_model,
+                                        volatility_surfaces=self.params.volatility_surfaces, risk_free_rate=self.params.option_rate,
+                                        base_currency=self.params.base_currency, fx_tickers=self.params.fx_tickers)
         self.broker_client = BrokerClient(self.event_queue, self.logger, self.portfolio_server, self.performance_manager, self.dummy_broker)
         
     def _connect_live_clients(self):
@@ -129,14 +145,26 @@ class Config:
             raise ValueError(f"Error loading live data for symbol {symbol.ticker}.")
 
     def load_backtest_data(self):
-        tickers = list(self.data_ticker_map.keys())
-        response  = self.hist_data_client.get_data(tickers, self.params.test_start, self.params.test_end,self.params.missing_values_strategy)
+        # FX bars the dummy broker converts to the base currency with are loaded with the instruments
+        fx_tickers = self._fx_tickers()
+
+        if self.params.data_directory:
+            # Recorded live bars are keyed by the contract symbol
+            tickers = list(self.symbols_map.keys()) + fx_tickers
+            response = self.hist_data_client.get_recorded_data(self.params.data_directory, tickers, self.params.test_start, self.params.test_end, self.params.missing_values_strategy)
+        else:
+            tickers = list(self.data_ticker_map.keys()) + fx_tickers
+            response  = self.hist_data_client.get_data(tickers, self.params.test_start, self.params.test_end,self.params.missing_values_strategy)
 
         if response:
             self.logger.info(f"Backtest data loaded.")
         else:
             raise RuntimeError("Backtest data did not load.")
 
+    def _fx_tickers(self) -> list:
+        fx = self.dummy_broker.valuation.fx if self.dummy_broker else None
+        return [ticker for ticker in fx.tickers.values() if ticker not in self.symbols_map] if fx else []
+
     def load_train_data(self):
         """
         Retrieves data from the database and initates the data processing. Stores initial data response in self.price_log.
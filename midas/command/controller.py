@@ -1,12 +1,19 @@
+import os
 import signal
 from datetime import datetime
+from typing import Iterator, List
 
 from .config import Config, Mode
+from .checkpoint import Checkpointer
+from midas.utils.latency import latency_tracker
+from midas.utils.event_journal import EventJournal, read_journal
 from midas.events import MarketEvent, OrderEvent, SignalEvent, ExecutionEvent
 
+REPLAY_COMPONENTS = ['strategy', 'order_manager', 'broker', 'performance']
+
 
 class EventController:
-    def __init__(self, config:Config):
+    def __init__(self, config:Config, journal_path:str=None, checkpointer:Checkpointer=None):
         # self.running = None
         # Initialize instance variables
         self.event_queue = config.event_queue
@@ -16,6 +23,8 @@ class EventController:
         # self.live_data_client = config.live_data_client
         self.hist_data_client = config.hist_data_client
         self.broker_client = config.broker_client
+        self.dummy_broker = config.dummy_broker
+        self.market_data_recorder = config.market_data_recorder
         
 
         # Core Components
@@ -24,14 +33,31 @@ class EventController:
         self.order_manager = config.order_manager
 
         # Supporting Components
+        self.portfolio_server = config.portfolio_server
         self.performance_manager = config.performance_manager
         self.logger = config.logger
+        self.strategy_name = config.params.strategy_name
+
+        # Every dispatched event is journaled when a path is given, see replay()
+        self.journal = EventJournal(journal_path) if journal_path else None
+
+        # Backtest checkpoints, the run resumes from the latest one if the checkpointer allows it
+        self.checkpointer = checkpointer
+        self.event_count = 0
+        self.current_day = None  # Variable to track the current day
         
     def run(self):
-        if self.mode == Mode.LIVE:
-            self._run_live()
-        elif self.mode == Mode.BACKTEST:
-            self._run_backtest()
+        if self.journal:
+            self.journal.open()
+
+        try:
+            if self.mode == Mode.LIVE:
+                self._run_live()
+            elif self.mode == Mode.BACKTEST:
+                self._run_backtest()
+        finally:
+            if self.journal:
+                self.journal.close()
 
     def signal_handler(self, signum, frame):
         """Handles termination signals to allow for a graceful shutdown."""
@@ -42,10 +68,16 @@ class EventController:
         self.running = True  # Flag to control the loop
         signal.signal(signal.SIGINT, self.signal_handler)  # Register signal handler
 
+        # Tick-to-trade latency, exported periodically and on shutdown
+        latency_export_path = os.path.join(os.getcwd(), self.strategy_name, 'latency.json')
+        latency_tracker.enable(self.logger, export_interval=300, export_path=latency_export_path)
+
         while self.running:
             while not self.event_queue.empty():
                 event = self.event_queue.get()
                 self.logger.info(event)
+                if self.journal:
+                    self.journal.write(event)
 
                 if isinstance(event, MarketEvent):
                     self.order_book.on_market_data(event)
@@ -59,28 +91,42 @@ class EventController:
 
         # Perform cleanup here
         self.logger.info("Live trading stopped. Performing cleanup...")
+        latency_tracker.export()
+        latency_tracker.disable()
+
+        if self.market_data_recorder:
+            self.market_data_recorder.stop()
           
     def _run_backtest(self):
-        current_day = None  # Variable to track the current day
+        if self.checkpointer and self.checkpointer.resume:
+            self._resume_from_checkpoint()
 
         while self.hist_data_client.data_stream():
+            new_day = False
+
             while not self.event_queue.empty():
                 event = self.event_queue.get()
+                self.event_count += 1
                 self.logger.info(event)
+                if self.journal:
+                    self.journal.write(event)
 
                 if isinstance(event, MarketEvent):
                     # event_timestamp = datetime.fromisoformat(event.timestamp)
                     event_timestamp = datetime.fromtimestamp(event.timestamp)
                     event_day = event_timestamp.date() 
 
-                    if current_day is None or event_day != current_day:
-                        if current_day is not None:
+                    if self.current_day is None or event_day != self.current_day:
+                        if self.current_day is not None:
                             # Perform EOD operations for the previous day
                             self.broker_client.eod_update()
+                            new_day = True
                         # Update the current day
-                        current_day = event_day
+                        self.current_day = event_day
                     self.order_book.on_market_data(event)
+                    self.broker_client.process_resting_orders() # Resting orders filled by the new prices, before the strategy reacts
                     self.broker_client.update_equity_value() # Updates equity value of the account with every new price change
+                    self.broker_client.check_margin_call()
                     self.strategy.handle_market_data()
 
                 elif isinstance(event, SignalEvent):
@@ -88,18 +134,134 @@ class EventController:
                     self.order_manager.on_signal(event)
 
                 elif isinstance(event, OrderEvent):
-                    self.broker_client.on_order(event)
+                    self.broker_client.on_basket(self._order_basket(event))
 
                 elif isinstance(event, ExecutionEvent):
                     self.broker_client.on_execution(event)
+
+            # Queue is drained, the engine state is consistent with the data cursor
+            if self.checkpointer and self.checkpointer.should_checkpoint(self.event_count, new_day):
+                path = self.checkpointer.save(self)
+                self.logger.info(f"Checkpoint saved : {path}")
         
         # Perform EOD operations for the last trading day
         self.logger.info("Backtest complete. Finalizing results ...")
         
-        if current_day is not None:
+        if self.current_day is not None:
             self.broker_client.eod_update()
             self.broker_client.liquidate_positions()
             
             # Finalize and save to database
             self.performance_manager.calculate_statistics()
             self.performance_manager.create_backtest()
+
+    def _order_basket(self, event: OrderEvent) -> List[OrderEvent]:
+        """ The order event and the legs of the same trade queued right behind it, the order manager queues the legs of a signal together. """
+        basket = [event]
+        while not self.event_queue.empty():
+            leg = self.event_queue.queue[0]
+            if not isinstance(leg, OrderEvent) or leg.trade_id != event.trade_id:
+                break
+
+            self.event_queue.get()
+            self.event_count += 1
+            self.logger.info(leg)
+            if self.journal:
+                self.journal.write(leg)
+            basket.append(leg)
+        return basket
+
+    def _resume_from_checkpoint(self):
+        path = self.checkpointer.latest()
+        if path:
+            self.checkpointer.load(self, path)
+            self.logger.info(f"Resumed from checkpoint : {path}")
+
+    @staticmethod
+    def _replay_batches(events: Iterator) -> Iterator[List]:
+        """ Journal events in dispatch order, consecutive order events of one trade together so they are queued as a basket. """
+        batch = []
+        for event in events:
+            if batch and not (isinstance(event, OrderEvent) and isinstance(batch[0], OrderEvent) and event.trade_id == batch[0].trade_id):
+                yield batch
+                batch = []
+            batch.append(event)
+        if batch:
+            yield batch
+
+    def replay(self, journal_path: str, components: List[str] = None):
+        """
+        Feeds a backtest journal back through the chosen components only, skipping everything upstream of them.
+
+        Events produced by a replayed component are regenerated rather than read from the journal, e.g. replaying
+        the broker re-executes the journaled orders and ignores the journaled executions.
+
+        Args:
+            journal_path (str) : Journal written by a previous backtest run.
+            components (List[str]) : Any of 'strategy', 'order_manager', 'broker', 'performance'. Default is ['broker', 'performance'].
+                'performance' requires 'broker', the equity values and trades are recorded by the broker and are not journaled.
+        """
+        if components is None:
+            components = ['broker', 'performance']
+
+        if not isinstance(components, list) or not all(component in REPLAY_COMPONENTS for component in components):
+            raise ValueError(f"'components' must be a list containing only {REPLAY_COMPONENTS}.")
+        if 'performance' in components and 'broker' not in components:
+            raise ValueError("'components' must include 'broker' to replay 'performance'.")
+
+        components = set(components)
+        regenerated = set()
+        if 'strategy' in components:
+            regenerated.add(SignalEvent)
+        if 'order_manager' in components:
+            regenerated.add(OrderEvent)
+        if 'broker' in components:
+            regenerated.add(ExecutionEvent)
+
+        event_types = [event_type for event_type in [MarketEvent, SignalEvent, OrderEvent, ExecutionEvent] if event_type not in regenerated]
+        current_day = None
+
+        for journal_events in self._replay_batches(read_journal(journal_path, event_types)):
+            for journal_event in journal_events:
+                self.event_queue.put(journal_event)
+
+            while not self.event_queue.empty():
+                event = self.event_queue.get()
+
+                if isinstance(event, MarketEvent):
+                    event_day = datetime.fromtimestamp(event.timestamp).date()
+
+                    if 'broker' in components and current_day is not None and event_day != current_day:
+                        self.broker_client.eod_update()
+                    current_day = event_day
+
+                    self.order_book.on_market_data(event)
+                    if 'broker' in components:
+                        self.broker_client.process_resting_orders()
+                        self.broker_client.update_equity_value()
+                        self.broker_client.check_margin_call()
+                    if 'strategy' in components:
+                        self.strategy.handle_market_data()
+
+                elif isinstance(event, SignalEvent):
+                    if 'performance' in components:
+                        self.performance_manager.update_signals(event)
+                    if 'order_manager' in components:
+                        self.order_manager.on_signal(event)
+
+                elif isinstance(event, OrderEvent):
+                    if 'broker' in components:
+                        self.broker_client.on_basket(self._order_basket(event))
+
+                elif isinstance(event, ExecutionEvent):
+                    if 'broker' in components:
+                        self.broker_client.on_execution(event)
+
+        self.logger.info("Replay complete. Finalizing results ...")
+
+        if current_day is not None:
+            if 'broker' in components:
+                self.broker_client.eod_update()
+                self.broker_client.liquidate_positions()
+            if 'performance' in components:
+                self.performance_manager.calculate_statistics()
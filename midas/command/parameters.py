@@ -1,10 +1,14 @@
 from datetime import datetime
-from typing import List, Literal
+from typing import Dict, List, Literal, TYPE_CHECKING
 from dataclasses import dataclass, field
 
-from midas.symbols import Symbol
+from midas.symbols import Symbol, Currency
 from midas.events import MarketDataType
 
+if TYPE_CHECKING: # the backtest gateway imports the performance manager, which imports this module
+    from midas.gateways.backtest.cost_models import SlippageModel, CommissionModel
+    from midas.gateways.backtest.options import VolatilitySurface
+
 @dataclass
 class Parameters:
     strategy_name: str
@@ -17,6 +21,16 @@ class Parameters:
     train_end: str = None
     train_start: str = None
     benchmark: List[str] = None
+    data_directory: str = None # recorded live bars to backtest on instead of the database
+    margin_call_policy: Literal['largest_margin', 'worst_pnl', 'pro_rata'] = None # backtest positions liquidated on a margin call, None only logs it
+    slippage_model: 'SlippageModel' = None # backtest slippage, validated by the DummyBroker
+    commission_model: 'CommissionModel' = None # backtest commissions, validated by the DummyBroker
+    volatility_surfaces: Dict[str, 'VolatilitySurface'] = None # backtest option volatility by underlying ticker
+    option_rate: float = 0.0 # risk-free rate backtest options are priced with
+    base_currency: Currency = None # backtest account currency, other currencies are converted at FX bars loaded with the data
+    fx_tickers: Dict[Currency, str] = None # FX bar ticker per currency, defaults to e.g. 'CADUSD' for a USD base
+    export_directory: str = None # backtest results also written to this directory as columnar files, None skips the export
+    export_format: Literal['parquet', 'feather'] = 'parquet'
     
     # Derived attribute, not directly passed by the user
     tickers: List[str] = field(default_factory=list)
@@ -43,6 +57,20 @@ class Parameters:
             raise TypeError("'symbols' must be of type list")
         if not all(isinstance(symbol, Symbol) for symbol in self.symbols):
             raise TypeError("All items in 'symbols' must be instances of Symbol")
+        if not isinstance(self.data_directory, (str, type(None))):
+            raise TypeError(f"data_directory must be of type str or None")
+        if self.volatility_surfaces is not None and not isinstance(self.volatility_surfaces, dict):
+            raise TypeError(f"volatility_surfaces must be of type dict or None")
+        if not isinstance(self.option_rate, (int, float)):
+            raise TypeError(f"option_rate must be of type int or float")
+        if not isinstance(self.base_currency, (Currency, type(None))):
+            raise TypeError(f"base_currency must be of type Currency or None")
+        if self.fx_tickers is not None and not isinstance(self.fx_tickers, dict):
+            raise TypeError(f"fx_tickers must be of type dict or None")
+        if not isinstance(self.export_directory, (str, type(None))):
+            raise TypeError(f"export_directory must be of type str or None")
+        if not isinstance(self.margin_call_policy, (str, type(None))):
+            raise TypeError(f"margin_call_policy must be of type str or None")
         if self.benchmark is not None:
             if not isinstance(self.benchmark, list):
                 raise TypeError("benchmark must be of type list or None")
@@ -52,6 +80,12 @@ class Parameters:
         # Constraint checks
         if self.missing_values_strategy not in ['drop', 'fill_forward']:
             raise ValueError(f"'missing_values_strategy' must be either 'drop' or 'fill_forward'")
+        
+        if self.margin_call_policy is not None and self.margin_call_policy not in ['largest_margin', 'worst_pnl', 'pro_rata']:
+            raise ValueError(f"'margin_call_policy' must be one of 'largest_margin', 'worst_pnl', 'pro_rata' or None")
+
+        if self.export_format not in ['parquet', 'feather']:
+            raise ValueError(f"'export_format' must be either 'parquet' or 'feather'")
 
         if self.capital <= 0:
             raise ValueError(f"'capital' must be greater than zero")
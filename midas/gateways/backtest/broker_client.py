@@ -1,5 +1,6 @@
 import logging
 from queue import Queue
+from typing import Dict, List
 from ibapi.order import Order
 from ibapi.contract import Contract
 
@@ -55,28 +56,61 @@ class BrokerClient:
             market_data (Object) : Initial MarketDataEvent, used to pass data not included in the signal or order to the trade client for portfolio updating.
 
         """
-        self.broker.placeOrder(timestamp, trade_id, leg_id, action ,contract, order)
+        if self.broker.placeOrder(timestamp, trade_id, leg_id, action ,contract, order):
+            self.settle()
+
+    def on_basket(self, events: List[OrderEvent]):
+        """
+        Places all legs of a trade in one broker call, positions, account and equity are settled once for the basket.
+
+        Args:
+            events (List[OrderEvent]) : Order events of the legs, all with the same trade_id.
+        """
+        if not events or not all(isinstance(event, OrderEvent) for event in events):
+            raise ValueError("'events' must be a non-empty list of OrderEvent instances.")
+        if len({event.trade_id for event in events}) != 1:
+            raise ValueError("'events' must all have the same trade_id.")
+
+        legs = [(event.leg_id, event.action, event.contract, event.order) for event in events]
+        if any(self.broker.place_basket(events[0].timestamp, events[0].trade_id, legs)):
+            self.settle()
+
+    def process_resting_orders(self):
+        """ Fills resting limit and stop orders triggered by the latest market data. """
+        if self.broker.process_resting_orders():
+            self.settle()
 
     def on_execution(self, event: ExecutionEvent):
+        """ Records the trade of the execution, positions, account and equity are settled by the call that filled it. """
         if not isinstance(event,ExecutionEvent):
             raise ValueError("'event' must be of type ExecutionEvent instance.")
-        
-        contract = event.contract
-        
-        self.update_positions()
-        self.update_account()
-        self.update_equity_value()
-        self.update_trades(contract)
+
+        self.performance_manager.update_trades(self._trade(event.trade_details))
   
+    def check_margin_call(self):
+        """ Intraday margin check, a breach liquidates positions per the broker's margin call policy. """
+        if self.broker.check_margin_call():
+            self.settle()
+
     def eod_update(self):
         self.broker.mark_to_market()
         self.broker.check_margin_call()
+        self.settle()
+
+    def settle(self):
+        """ Pushes the changed positions, the account and the equity value after fills. """
+        self.update_positions()
         self.update_account()
         self.update_equity_value()
    
     def update_positions(self):
-        positions = self.broker.return_positions()
-        for contract, position_data in positions.items():
+        """ Pushes the positions changed since the last sync to the portfolio server, closed positions are removed. """
+        changes = self.broker.return_position_changes()
+        for contract, (version, position_data) in changes.items():
+            if position_data is None:
+                self.portfolio_server.remove_position(contract, version)
+                continue
+
             # Convert the `PositionDetails` TypedDict into a `Position` data class instance.
             position_instance = Position(
                 action=position_data['action'],
@@ -88,37 +122,27 @@ class BrokerClient:
                 market_value=position_data.get('market_value', 0),   # Provide a default value if not present
             )
 
-            # Now, use `position_instance` as needed, for example, to update positions in the portfolio server.
-            self.portfolio_server.update_positions(contract, position_instance)
+            self.portfolio_server.update_positions(contract, position_instance, version)
 
     def update_trades(self, contract:Contract = None):
         if contract:
-            trade = self.broker.return_executed_trades(contract)
-            self.performance_manager.update_trades(Trade(
-                                                        trade_id = trade['trade_id'],
-                                                        leg_id = trade['leg_id'],
-                                                        timestamp = trade['timestamp'],
-                                                        ticker = trade['symbol'],
-                                                        quantity = trade['quantity'],
-                                                        price =  round(trade['price'],4),
-                                                        cost = trade['cost'],
-                                                        action = trade['action'],
-                                                        fees = trade['fees']
-                                                    ))
+            self.performance_manager.update_trades(self._trade(self.broker.return_executed_trades(contract)))
         else: 
             last_trades = self.broker.return_executed_trades()
             for contract, trade in last_trades.items():
-                self.performance_manager.update_trades(Trade(
-                                                        trade_id = trade['trade_id'],
-                                                        leg_id = trade['leg_id'],
-                                                        timestamp = trade['timestamp'],
-                                                        ticker = trade['symbol'],
-                                                        quantity = trade['quantity'],
-                                                        price =  round(trade['price'],4),
-                                                        cost = trade['cost'],
-                                                        action = trade['action'],
-                                                        fees = trade['fees']
-                                                    ))
+                self.performance_manager.update_trades(self._trade(trade))
+
+    def _trade(self, trade: dict) -> Trade:
+        """ Trade recorded by the performance manager for an executed trade of the broker. """
+        return Trade(trade_id = trade['trade_id'],
+                     leg_id = trade['leg_id'],
+                     timestamp = trade['timestamp'],
+                     ticker = trade['symbol'],
+                     quantity = trade['quantity'],
+                     price = round(trade['price'],4),
+                     cost = trade['cost'],
+                     action = trade['action'],
+                     fees = trade['fees'])
 
     def update_account(self):
         account = self.broker.return_account()
@@ -0,0 +1,145 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import List, Tuple, Union
+
+ArrayLike = Union[float, np.ndarray]
+
+class SlippageModel(ABC):
+    """
+    Price slippage per unit traded, always against the order.
+
+    Models implement the array formula only, a single order is evaluated through the same code as a batch, so the
+    broker and vectorized parameter sweeps share one definition of every model.
+    """
+    @abstractmethod
+    def slippage_array(self, prices: np.ndarray, quantities: np.ndarray, tick_sizes: np.ndarray, spreads: np.ndarray, volumes: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            prices (np.ndarray) : Reference price of each order.
+            quantities (np.ndarray) : Signed order quantities, positive buys.
+            tick_sizes (np.ndarray) : Minimum price increment of each symbol.
+            spreads (np.ndarray) : Quoted bid/ask spread, zero when trading on bars.
+            volumes (np.ndarray) : Volume traded in the bar or quote the order fills against, zero when unknown.
+
+        Returns:
+            np.ndarray : Non-negative slippage per unit, in price.
+        """
+        pass
+
+    def slippage(self, price: float, quantity: float, tick_size: float, spread: float = 0.0, volume: float = 0.0) -> float:
+        """ Slippage of a single order. """
+        return float(self.slippage_array(np.asarray(price, dtype=float), np.asarray(quantity, dtype=float), np.asarray(tick_size, dtype=float),
+                                         np.asarray(spread, dtype=float), np.asarray(volume, dtype=float)))
+
+    def fill_prices(self, prices: ArrayLike, quantities: ArrayLike, tick_sizes: ArrayLike, spreads: ArrayLike = 0.0, volumes: ArrayLike = 0.0) -> np.ndarray:
+        """ Fill prices of a batch of orders, buys pay the slippage and sells give it up. """
+        prices = np.asarray(prices, dtype=float)
+        quantities = np.asarray(quantities, dtype=float)
+        slippage = self.slippage_array(prices, quantities, np.asarray(tick_sizes, dtype=float), np.asarray(spreads, dtype=float), np.asarray(volumes, dtype=float))
+        return prices + np.sign(quantities) * slippage
+
+class FixedTickSlippage(SlippageModel):
+    """ A fixed number of ticks per order. """
+    def __init__(self, ticks: float = 1):
+        if not isinstance(ticks, (int, float)) or ticks < 0:
+            raise ValueError("'ticks' must be a non-negative number.")
+        self.ticks = ticks
+
+    def slippage_array(self, prices, quantities, tick_sizes, spreads, volumes):
+        return np.broadcast_to(self.ticks * tick_sizes, np.broadcast(prices, quantities, tick_sizes).shape).astype(float)
+
+class SpreadSlippage(SlippageModel):
+    """ A fraction of the quoted spread (half the spread crosses it from the mid), at least min_ticks. """
+    def __init__(self, fraction: float = 0.5, min_ticks: float = 0):
+        if not isinstance(fraction, (int, float)) or fraction < 0:
+            raise ValueError("'fraction' must be a non-negative number.")
+        if not isinstance(min_ticks, (int, float)) or min_ticks < 0:
+            raise ValueError("'min_ticks' must be a non-negative number.")
+        self.fraction = fraction
+        self.min_ticks = min_ticks
+
+    def slippage_array(self, prices, quantities, tick_sizes, spreads, volumes):
+        slippage = np.maximum(self.fraction * spreads, self.min_ticks * tick_sizes)
+        return np.broadcast_to(slippage, np.broadcast(prices, quantities, slippage).shape).astype(float)
+
+class SquareRootImpact(SlippageModel):
+    """
+    Square-root market impact on volume participation :
+        impact = coefficient * volatility * price * sqrt(|quantity| / volume)
+    An order without a known volume is treated as taking the whole volume. The impact is at least min_ticks.
+    """
+    def __init__(self, coefficient: float = 1.0, volatility: float = 0.02, min_ticks: float = 0):
+        """
+        Args:
+            coefficient (float) : Impact coefficient, of order one empirically.
+            volatility (float) : Volatility of returns over the bar horizon, as a fraction.
+            min_ticks (float) : Floor on the slippage, in ticks.
+        """
+        if not isinstance(coefficient, (int, float)) or coefficient < 0:
+            raise ValueError("'coefficient' must be a non-negative number.")
+        if not isinstance(volatility, (int, float)) or volatility < 0:
+            raise ValueError("'volatility' must be a non-negative number.")
+        if not isinstance(min_ticks, (int, float)) or min_ticks < 0:
+            raise ValueError("'min_ticks' must be a non-negative number.")
+        self.coefficient = coefficient
+        self.volatility = volatility
+        self.min_ticks = min_ticks
+
+    def slippage_array(self, prices, quantities, tick_sizes, spreads, volumes):
+        size = np.abs(quantities)
+        volumes = np.broadcast_to(volumes, np.broadcast(size, volumes).shape)
+        participation = np.divide(size, volumes, out=np.ones(volumes.shape), where=volumes > 0)
+        impact = self.coefficient * self.volatility * prices * np.sqrt(participation)
+        return np.maximum(impact, self.min_ticks * tick_sizes)
+
+class CommissionModel(ABC):
+    """ Commission of an order, array formula with a single order evaluated through the same code. """
+    @abstractmethod
+    def commission_array(self, quantities: np.ndarray, prices: np.ndarray, rates: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            quantities (np.ndarray) : Signed order quantities.
+            prices (np.ndarray) : Notional value per unit, price times multiplier.
+            rates (np.ndarray) : Per-unit fee of the symbol (Symbol.fees).
+        """
+        pass
+
+    def commission(self, quantity: float, price: float = 0.0, rate: float = 0.0) -> float:
+        """ Commission of a single order. """
+        return float(self.commission_array(np.asarray(quantity, dtype=float), np.asarray(price, dtype=float), np.asarray(rate, dtype=float)))
+
+class PerUnitCommission(CommissionModel):
+    """ Symbol fee per unit traded. """
+    def commission_array(self, quantities, prices, rates):
+        return np.abs(quantities) * rates
+
+class TieredCommission(CommissionModel):
+    """
+    Marginal per-unit rates on the units of an order falling in each tier, e.g. [(0, 0.0035), (500, 0.002)] charges
+    0.0035 on the first 500 units and 0.002 beyond. Bounded below by a minimum per order and optionally above by a
+    fraction of the order's notional.
+    """
+    def __init__(self, tiers: List[Tuple[float, float]], minimum: float = 0.0, maximum_rate: float = None):
+        if not tiers or not all(len(tier) == 2 for tier in tiers):
+            raise ValueError("'tiers' must be a non-empty list of (units, rate) tuples.")
+        thresholds = np.array([tier[0] for tier in tiers], dtype=float)
+        if thresholds[0] != 0 or np.any(np.diff(thresholds) <= 0):
+            raise ValueError("'tiers' must start at 0 units and be strictly increasing.")
+        if not isinstance(minimum, (int, float)) or minimum < 0:
+            raise ValueError("'minimum' must be a non-negative number.")
+        if maximum_rate is not None and (not isinstance(maximum_rate, (int, float)) or maximum_rate <= 0):
+            raise ValueError("'maximum_rate' must be a positive number or None.")
+
+        self.lower = thresholds
+        self.width = np.append(np.diff(thresholds), np.inf)
+        self.rates = np.array([tier[1] for tier in tiers], dtype=float)
+        self.minimum = minimum
+        self.maximum_rate = maximum_rate
+
+    def commission_array(self, quantities, prices, rates):
+        size = np.abs(quantities)
+        commission = (np.clip(size[..., None] - self.lower, 0, self.width) * self.rates).sum(axis=-1)
+        commission = np.where(size > 0, np.maximum(commission, self.minimum), 0.0)
+        if self.maximum_rate is not None:
+            commission = np.minimum(commission, self.maximum_rate * size * prices)
+        return commission
@@ -5,6 +5,7 @@ from typing import Dict, List
 from midas_database import DatabaseClient
 
 from midas.events import MarketEvent, BarData
+from midas.utils.market_recorder import read_recorded_bars
 
 class DataClient(DatabaseClient):
     def __init__(self, event_queue: Queue, data_client: DatabaseClient):
@@ -62,6 +63,48 @@ class DataClient(DatabaseClient):
         
         return True
 
+    def get_recorded_data(self, directory: str, tickers: List[str], start_date: str = None, end_date: str = None, missing_values_strategy: str = 'fill_forward'):
+        """
+        Loads bars captured by the live MarketDataRecorder, replaying a live session without the database.
+
+        Args:
+            directory (str) : Directory holding the recorded daily files.
+            tickers (List[str]) : A list of tickers ex. ['AAPL', 'MSFT']
+            start_date (str) : Optional first day to load ex. "2024-01-02"
+            end_date (str) : Optional last day to load, inclusive ex. "2024-01-05"
+            missing_values_strategy (str): Strategy to handle missing values ('drop' or 'fill_forward'). Default is 'fill_forward'.
+        """
+        # Type Checks
+        if isinstance(tickers, list):
+            if not all(isinstance(ticker, str) for ticker in tickers):
+                raise TypeError("All items in 'tickers' must be of type string.")
+        else:
+            raise TypeError("'tickers' must be a list of strings.")
+        
+        if not isinstance(missing_values_strategy, str) or missing_values_strategy not in ['fill_forward', 'drop']:
+            raise ValueError("'missing_value_strategy' must either 'fill_forward' or 'drop' of type str.")
+
+        if start_date is not None:
+            self._validate_timestamp_format(start_date)
+        if end_date is not None:
+            self._validate_timestamp_format(end_date)
+
+        data = read_recorded_bars(directory, start_date, end_date)
+        data = data[data['symbol'].isin(tickers)]
+
+        if data.empty:
+            return False
+
+        # Live bars can repeat on reconnect, the last bar received for a timestamp wins
+        data = data.drop_duplicates(subset=['timestamp', 'symbol'], keep='last')
+        data['timestamp'] = pd.to_datetime(data['timestamp'], unit='s', utc=True)
+        data = self._handle_null_values(data, missing_values_strategy)
+        self.data = self._process_bardata(data)
+
+        self.unique_timestamps = self.data['timestamp'].unique().tolist()
+        
+        return True
+
     def _validate_timestamp_format(self, timestamp:str):
         # Timestamp format check for ISO 8601
         try:
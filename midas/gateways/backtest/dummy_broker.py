@@ -1,14 +1,21 @@
+import math
 import logging
+import numpy as np
 from queue import Queue
 from ibapi.order import Order
 from datetime import datetime
 from ibapi.contract import Contract
-from typing import Dict, Union, TypedDict, Union, Optional
+from typing import Dict, List, Union, TypedDict, Union, Optional, Set, Tuple
 
 from midas.order_book import OrderBook
-from midas.symbols.symbols import Symbol, Future, Equity
+from .fx import FxRates
+from .valuation import PortfolioValuation
+from .cost_models import SlippageModel, CommissionModel, FixedTickSlippage, PerUnitCommission
+from .options import OptionBook, VolatilitySurface
+from .trigger_book import TriggerBook, RestingOrder
+from midas.symbols.symbols import Symbol, Future, Equity, Option, Currency
 from midas.account_data import AccountDetails,  EquityDetails
-from midas.events import ExecutionEvent, Action, BaseOrder, TradeInstruction, ExecutionDetails
+from midas.events import ExecutionEvent, Action, BaseOrder, MarketOrder, TradeInstruction, ExecutionDetails, OrderType, BarData, QuoteData
 
 class PositionDetails(TypedDict):
     action: str
@@ -19,16 +26,44 @@ class PositionDetails(TypedDict):
     unrealizedPnL :Optional[float]
     total_cost: Optional[float]
 
+MARGIN_CALL_POLICIES = ['largest_margin', 'worst_pnl', 'pro_rata']
+
 class DummyBroker:
-    def __init__(self, symbols_map: Dict[str, Symbol], event_queue: Queue, order_book:OrderBook, capital:float, logger:logging.Logger,  slippage_factor:int=1):
+    def __init__(self, symbols_map: Dict[str, Symbol], event_queue: Queue, order_book:OrderBook, capital:float, logger:logging.Logger,  slippage_factor:int=1, margin_call_policy: str=None,
+                 slippage_model: SlippageModel=None, commission_model: CommissionModel=None, volatility_surfaces: Dict[str, VolatilitySurface]=None, risk_free_rate: float=0.0,
+                 base_currency: Currency=None, fx_tickers: Dict[Currency, str]=None):
+        """
+        Args:
+            margin_call_policy (str) : Positions reduced on a margin call, one of 'largest_margin', 'worst_pnl', 'pro_rata'.
+                                       None only logs the margin call.
+            slippage_model (SlippageModel) : Slippage of every fill, defaults to slippage_factor ticks.
+            commission_model (CommissionModel) : Commission of every fill, defaults to the symbol's fee per unit.
+            volatility_surfaces (Dict[str, VolatilitySurface]) : Volatility surface of each option underlying, keyed by the underlying's ticker.
+            risk_free_rate (float) : Rate options are priced with.
+            base_currency (Currency) : Currency the account is kept in, cash flows and position values in other currencies are
+                                       converted at the latest FX bars. None treats every symbol as quoted in one currency.
+            fx_tickers (Dict[Currency, str]) : Ticker of the FX bars of a currency, defaults to e.g. 'CADUSD' for a USD base.
+        """
+        if margin_call_policy is not None and margin_call_policy not in MARGIN_CALL_POLICIES:
+            raise ValueError(f"'margin_call_policy' must be one of {MARGIN_CALL_POLICIES} or None.")
+        if slippage_model is not None and not isinstance(slippage_model, SlippageModel):
+            raise TypeError("'slippage_model' must be an instance of SlippageModel.")
+        if commission_model is not None and not isinstance(commission_model, CommissionModel):
+            raise TypeError("'commission_model' must be an instance of CommissionModel.")
+
         self.event_queue = event_queue
         self.order_book = order_book
         self.logger = logger
         self.symbols_map = symbols_map
         self.slippage_factor = slippage_factor # multiplied by tick size, so slippage will be x ticks against the position    
+        self.margin_call_policy = margin_call_policy
+        self.slippage_model = slippage_model or FixedTickSlippage(slippage_factor)
+        self.commission_model = commission_model or PerUnitCommission()
         
         # self.executions : Dict[str, ExecutionDetails] = {}
         self.positions : Dict[Contract, PositionDetails] = {}
+        self.position_versions : Dict[Contract, int] = {} # bumped on every change, kept when a position closes so a reopened position keeps counting
+        self.dirty_positions : Set[Contract] = set() # changed since the last return_position_changes
         self.last_trade : Dict[str, ExecutionDetails] = {}
         self.account : AccountDetails =  {"Timestamp": None, 
                                           "FullAvailableFunds": capital,
@@ -36,65 +71,199 @@ class DummyBroker:
                                           "FullInitMarginReq": 0, 
                                           "UnrealizedPnL": 0
                                         }
+        self.valuation = PortfolioValuation(symbols_map, FxRates(symbols_map, base_currency, fx_tickers) if base_currency else None)
+        self.resting_orders : Dict[str, TriggerBook] = {} # Limit and stop orders waiting on their trigger, keyed by symbol
+
+        # Options without market data of their own are priced off their underlying
+        self.option_book = OptionBook(symbols_map, volatility_surfaces, risk_free_rate)
+        self._option_slots = np.array([self.valuation.index[ticker] for ticker in self.option_book.tickers], dtype=np.intp)
+        self.greeks : Dict[str, Dict[str, float]] = {} # option greeks per underlying, as of the last valuation
+
+    def placeOrder(self, timestamp: Union[int ,float], trade_id:int, leg_id:int, action: Action, contract: Contract, order: BaseOrder) -> bool:
+        """ Returns True if the order filled on placement, False if it is resting. """
+        if order.order.orderType == OrderType.MARKET.value:
+            fill_price  = self._fill_price(contract, action, order.quantity)
+            self._execute_order(timestamp, trade_id, leg_id, action, contract, order, fill_price)
+            return True
+        else:
+            return self._place_resting_order(RestingOrder(timestamp, trade_id, leg_id, action, contract, order))
+
+    def place_basket(self, timestamp: Union[int ,float], trade_id: int, legs: List[Tuple[int, Action, Contract, BaseOrder]]) -> List[bool]:
+        """
+        Places every leg of a trade in one call, market legs fill against the same prices and the equity is revalued once.
+
+        Args:
+            legs (List[Tuple[int, Action, Contract, BaseOrder]]) : Leg id, action, contract and order of every leg.
+
+        Returns:
+            List[bool] : True for every leg filled on placement, False for a resting leg.
+        """
+        filled = []
+        fill_prices = [self._fill_price(contract, action, order.quantity) if order.order.orderType == OrderType.MARKET.value else None for _, action, contract, order in legs]
+
+        for (leg_id, action, contract, order), fill_price in zip(legs, fill_prices):
+            if fill_price is not None:
+                self._execute_order(timestamp, trade_id, leg_id, action, contract, order, fill_price, revalue=False)
+                filled.append(True)
+            else:
+                filled.append(self._place_resting_order(RestingOrder(timestamp, trade_id, leg_id, action, contract, order)))
+
+        self._update_account_equity_value()
+        return filled
 
-    def placeOrder(self, timestamp: Union[int ,float], trade_id:int, leg_id:int, action: Action, contract: Contract, order: BaseOrder):
+    def _execute_order(self, timestamp: Union[int ,float], trade_id:int, leg_id:int, action: Action, contract: Contract, order: BaseOrder, fill_price: float, revalue: bool = True):
         # Order Data
         quantity = order.quantity # +/- values
-        fill_price  = self._fill_price(contract, action)
-        commission_fees = self._calculate_commission_fees(contract,quantity)
+        commission_fees = self._calculate_commission_fees(contract,quantity, fill_price)
         
         # Update all account data(positions, account)
-        self._update_account(contract, action, quantity, fill_price,commission_fees)
+        self._update_account(contract, action, quantity, fill_price,commission_fees, revalue)
 
         # Create Execution Events
         trade_details = self._update_trades(timestamp, trade_id, leg_id, contract, quantity, action, fill_price, commission_fees)
         self._set_execution(timestamp, trade_details, action, contract)
 
-    def _fill_price(self, contract: Contract, action:Action):
+    def _place_resting_order(self, resting_order: RestingOrder) -> bool:
+        """ Fills a marketable limit or stop order immediately, otherwise rests it until a later bar triggers it. """
+        contract = resting_order.contract
+        current_price = self._current_price(contract)
+        fill_price = self._fill_price(contract, resting_order.action, resting_order.order.quantity)
+        is_buy = resting_order.side == 'BUY'
+
+        if resting_order.order_type == OrderType.LIMIT.value:
+            if (is_buy and current_price <= resting_order.price) or (not is_buy and current_price >= resting_order.price):
+                fill_price = min(fill_price, resting_order.price) if is_buy else max(fill_price, resting_order.price)
+                self._execute_order(resting_order.timestamp, resting_order.trade_id, resting_order.leg_id, resting_order.action, contract, resting_order.order, fill_price)
+                return True
+        elif resting_order.order_type == OrderType.STOPLOSS.value:
+            if (is_buy and current_price >= resting_order.price) or (not is_buy and current_price <= resting_order.price):
+                self._execute_order(resting_order.timestamp, resting_order.trade_id, resting_order.leg_id, resting_order.action, contract, resting_order.order, fill_price)
+                return True
+        else:
+            raise ValueError(f"Order type {resting_order.order_type} not supported.")
+
+        self.resting_orders.setdefault(contract.symbol, TriggerBook()).add(resting_order)
+        self.logger.info(f"Order resting : {resting_order.order_type} {resting_order.side} {contract.symbol} @ {resting_order.price}")
+        return False
+
+    def process_resting_orders(self) -> bool:
+        """
+        Fills the resting orders triggered by the latest market data, called once per market event before the strategy runs.
+        Returns True if any order filled.
+
+        Intrabar fills : a bar opening through the trigger fills at the open, otherwise at the trigger price.
+        Limit orders fill without slippage, stop orders become market orders and take slippage.
+        """
+        filled = False
+        for ticker in self.order_book.updated_tickers:
+            trigger_book = self.resting_orders.get(ticker)
+            if not trigger_book:
+                continue
+
+            data = self.order_book.book[ticker]
+            if isinstance(data, BarData):
+                buy_open = sell_open = data.open
+                buy_high, buy_low, sell_high, sell_low = data.high, data.low, data.high, data.low
+            elif isinstance(data, QuoteData):
+                buy_open = buy_high = buy_low = data.ask
+                sell_open = sell_high = sell_low = data.bid
+            else:
+                continue
+
+            for resting_order in trigger_book.triggered(buy_high, buy_low, sell_high, sell_low):
+                is_buy = resting_order.side == 'BUY'
+                trigger_price = resting_order.price
+                open_price = buy_open if is_buy else sell_open
+
+                if resting_order.order_type == OrderType.LIMIT.value:
+                    fill_price = min(open_price, trigger_price) if is_buy else max(open_price, trigger_price)
+                else:
+                    fill_price = max(open_price, trigger_price) if is_buy else min(open_price, trigger_price)
+                    fill_price = self._slippage_adjust_price(self._tick_size(resting_order.contract), fill_price, resting_order.action, resting_order.order.quantity, resting_order.contract)
+
+                self._execute_order(self.order_book.last_updated, resting_order.trade_id, resting_order.leg_id, resting_order.action, resting_order.contract, resting_order.order, fill_price)
+                filled = True
+
+        return filled
+
+    def cancel_resting_orders(self, trade_id: int):
+        cancelled = []
+        for trigger_book in self.resting_orders.values():
+            cancelled.extend(trigger_book.cancel(trade_id))
+        return cancelled
+
+    def _fill_price(self, contract: Contract, action:Action, quantity: float = 0):
         """
         Accounts for slippage.
         """
+        current_price = self._current_price(contract)
+        adjusted_price = self._slippage_adjust_price(self._tick_size(contract), current_price, action, quantity, contract)
+
+        return adjusted_price
+
+    def _current_price(self, contract: Contract):
+        """ Market price, options without market data are priced by the option book. """
         current_price = self.order_book.current_price(contract.symbol)
+        if current_price is None and contract.secType == 'OPT':
+            current_price = self.option_book.price(contract.symbol, self.order_book.last_updated, self.order_book.current_prices())
+        return current_price
 
+    def _tick_size(self, contract: Contract):
         if contract.secType == 'STK':
-            tick_size = 1
-        elif contract.secType == 'FUT':
-            tick_size = self.symbols_map[contract.symbol].tickSize
+            return 1
+        elif contract.secType in ['FUT', 'OPT']:
+            return self.symbols_map[contract.symbol].tickSize
         else:
-            raise ValueError("'contract.sectype' must be one of the following : STK, FUT.")
-        adjusted_price = self._slippage_adjust_price(tick_size, current_price, action)
-
-        return adjusted_price
-
-    def _slippage_adjust_price(self, tick_size: float, current_price: float, action: Action):
-        slippage = tick_size * self.slippage_factor
+            raise ValueError("'contract.sectype' must be one of the following : STK, FUT, OPT.")
 
+    def _slippage_adjust_price(self, tick_size: float, current_price: float, action: Action, quantity: float = 0, contract: Contract = None):
         if action in [Action.LONG, Action.COVER]:  # Entry signal for a long position or covering a short
-            adjusted_price = current_price + slippage
+            direction = 1
         elif action in [Action.SHORT, Action.SELL]:  # Entry signal for a short position or selling a long
-            adjusted_price = current_price - slippage
+            direction = -1
         else:
             raise ValueError(f"'action' must be of type Action enum.")
-        
-        return adjusted_price
 
-    def _calculate_commission_fees(self, contract: Contract, quantity: float):
+        spread, volume = self._market_liquidity(contract)
+        slippage = self.slippage_model.slippage(current_price, quantity, tick_size, spread, volume)
+        return current_price + direction * slippage
+
+    def _market_liquidity(self, contract: Contract):
+        """ Spread and volume of the latest market data of the contract, zero when unknown. """
+        data = self.order_book.book.get(contract.symbol) if contract is not None else None
+        if isinstance(data, QuoteData):
+            return data.ask - data.bid, data.ask_size + data.bid_size
+        elif isinstance(data, BarData):
+            return 0.0, data.volume
+        return 0.0, 0.0
+
+    def _fx_rate(self, contract: Contract) -> float:
+        """ Base currency per unit of the contract's currency, as of the latest FX bars. """
+        fx = self.valuation.fx
+        if fx is None:
+            return 1.0
+        self.valuation.update_fx(self.order_book.last_updated, self.order_book)
+        return fx.rate(self.symbols_map[contract.symbol].currency)
+
+    def _calculate_commission_fees(self, contract: Contract, quantity: float, price: float = 0.0):
         if contract.symbol in self.symbols_map:
-            return abs(quantity) * self.symbols_map[contract.symbol].fees
+            symbol = self.symbols_map[contract.symbol]
+            return self.commission_model.commission(quantity, price * symbol.multiplier, symbol.fees)
         else:
             self.logger.error(f"Warning: Symbol {contract.symbol} not found in symbols map. Defaulting to 0 commission fees.")
             return 0
     
-    def _update_account(self, contract: Contract, action: Action, quantity: float, fill_price: float, fees: float):
+    def _update_account(self, contract: Contract, action: Action, quantity: float, fill_price: float, fees: float, revalue: bool = True):
         if isinstance(self.symbols_map[contract.symbol], Future):
             self._update_account_futures(contract, action, quantity, fill_price, fees)
-        elif isinstance(self.symbols_map[contract.symbol], Equity):
+        elif isinstance(self.symbols_map[contract.symbol], (Equity, Option)): # option premium is paid and received like equities
             self._update_account_equities(contract, action, quantity, fill_price, fees)
         else:
             raise ValueError(f"Symbol not of valid type : {self.symbols_map[contract.symbol]}")
 
         self._update_positions(contract, action, quantity, fill_price)
-        self._update_account_equity_value()
+        if revalue:
+            self._update_account_equity_value()
 
     def _calculate_trade_pnl(self,position:PositionDetails, current_price:float, quantity:float):
         """
@@ -112,7 +281,9 @@ class DummyBroker:
         return position['unrealizedPnL']/abs(position['quantity'])
     
     def _update_account_futures(self, contract: Contract, action: Action, quantity: float, fill_price: float, fees: float):
-        self.account['FullAvailableFunds'] -= fees
+        # Fees and pnl are converted to the base currency, with FX rates the margin requirement is recomputed at the latest rates on the equity update
+        rate = self._fx_rate(contract)
+        self.account['FullAvailableFunds'] -= fees * rate
         margin_impact = self.symbols_map[contract.symbol].initialMargin * abs(quantity)
 
         if action in [Action.LONG, Action.SHORT]: # Not a default clear position
@@ -120,27 +291,31 @@ class DummyBroker:
                 self.account['FullInitMarginReq']  += margin_impact
 
             elif abs(self.positions[contract]['quantity']) > abs(quantity): # Reducing size of position
-                pnl = self._calculate_trade_pnl(self.positions[contract],fill_price,quantity)
+                pnl = self._calculate_trade_pnl(self.positions[contract],fill_price,quantity) * rate
                 realized_pnl = self._pnl_per_contract(self.positions[contract]) * quantity # pnl already marked to market
                 self.account['FullAvailableFunds']  += pnl - realized_pnl # add just new pnl
                 self.account['FullInitMarginReq'] -= self.symbols_map[contract.symbol].initialMargin * abs(quantity)  # remov margin for exited contracts
                 self.positions[contract]['unrealizedPnL'] -= realized_pnl
             
             else: # flip a position
-                pnl = self._calculate_trade_pnl(self.positions[contract],fill_price,quantity)
+                pnl = self._calculate_trade_pnl(self.positions[contract],fill_price,quantity) * rate
                 self.account['FullAvailableFunds']  += pnl - self.positions[contract]['unrealizedPnL']
                 self.account['FullInitMarginReq'] -= self.symbols_map[contract.symbol].initialMargin * abs(self.positions[contract]['quantity'])  
                 self.account['FullInitMarginReq'] += self.symbols_map[contract.symbol].initialMargin * (abs(quantity) - abs(self.positions[contract]['quantity'])) 
                 self.positions[contract]['unrealizedPnL'] = 0
 
-        elif action in [Action.SELL, Action.COVER]: # complete exit of current position
-            pnl = self._calculate_trade_pnl(self.positions[contract],fill_price,quantity)
-            self.account['FullAvailableFunds']  += pnl - self.positions[contract]['unrealizedPnL']
+        elif action in [Action.SELL, Action.COVER]: # exit of current position, in full or in part
+            position = self.positions[contract]
+            pnl = self._calculate_trade_pnl(position,fill_price,quantity) * rate
+            marked_pnl = position['unrealizedPnL'] * abs(quantity) / abs(position['quantity']) # share of the pnl already marked to market
+            self.account['FullAvailableFunds']  += pnl - marked_pnl
             self.account['FullInitMarginReq'] -= self.symbols_map[contract.symbol].initialMargin * abs(quantity)  
+            position['unrealizedPnL'] -= marked_pnl
        
     def _update_account_equities(self, contract: Contract, action: Action, quantity: float, fill_price: float, fees: float):
-        self.account['FullAvailableFunds'] -= fees
-        capital_impact = fill_price * abs(quantity) 
+        rate = self._fx_rate(contract)
+        self.account['FullAvailableFunds'] -= fees * rate
+        capital_impact = fill_price * abs(quantity) * self.symbols_map[contract.symbol].multiplier * rate # option premium is quoted per unit of the underlying
 
         if action in [Action.LONG, Action.COVER]:
             self.account['FullAvailableFunds']  -= capital_impact
@@ -197,25 +372,57 @@ class DummyBroker:
             else: 
                 raise ValueError(f"{action} not BUY or SELL")
 
+        position = self.positions.get(contract)
+        if position:
+            self.valuation.update_position(ticker, position['quantity'], position['avg_cost'], fill_price, position.get('unrealizedPnL', 0))
+        else:
+            self.valuation.update_position(ticker, 0, 0, fill_price)
+
+        self.position_versions[contract] = self.position_versions.get(contract, 0) + 1
+        self.dirty_positions.add(contract)
+
     def _update_account_equity_value(self):
         portfolio_value = self._calculate_portfolio_value()
-        
+        if self.valuation.fx is not None:
+            self.account['FullInitMarginReq'] = self.valuation.margin_requirement()
+
         current_equity_value = round(self.account['FullAvailableFunds'] +  portfolio_value, 2)
         self.account['NetLiquidation'] =  current_equity_value
         self.account['Timestamp'] = self.order_book.last_updated
 
     def _calculate_portfolio_value(self):
+        """ Portfolio value updated with the prices changed since the last valuation. """
+        self.valuation.update_fx(self.order_book.last_updated, self.order_book)
+        prices = self.order_book.updated_prices()
+        if len(self.option_book):
+            prices.update(self._option_prices())
+        portfolio_value = self.valuation.update_prices(prices)
+
+        if len(self.option_book):
+            self.greeks = self.option_book.portfolio_greeks(self.valuation.quantity[self._option_slots], self.order_book.last_updated, self.order_book.current_prices())
+        return portfolio_value
+
+    def _option_prices(self):
+        """ Model prices of the options without market data, the whole book is priced in one evaluation per bar. """
+        model_prices = self.option_book.prices(self.order_book.last_updated, self.order_book.current_prices())
+        return {ticker: price for ticker, price in model_prices.items() if ticker not in self.order_book.book}
+
+    def _revalue_portfolio(self):
+        """ Full revaluation of every open position, reference for the incremental valuation. """
         portfolio_value = 0
         current_prices = self.order_book.current_prices()
 
+        if len(self.option_book):
+            current_prices = {**self._option_prices(), **current_prices}
+
         for contract, position in self.positions.items():
             current_price = current_prices[contract.symbol]
-            if contract.secType == 'STK':
-                portfolio_value += self._equity_position_value(position, current_price)
+            if contract.secType in ['STK', 'OPT']:
+                portfolio_value += self._equity_position_value(position, current_price) * self._fx_rate(contract)
             elif contract.secType == 'FUT':
-                portfolio_value += self._future_position_value(position, current_price)
+                portfolio_value += self._future_position_value(position, current_price) * self._fx_rate(contract)
             else:
-                raise ValueError("'contract.sectype' must be one of the following : STK, FUT.")
+                raise ValueError("'contract.sectype' must be one of the following : STK, FUT, OPT.")
 
         return portfolio_value
     
@@ -229,6 +436,8 @@ class DummyBroker:
         return (current_price * position['multiplier']) * position['quantity'] 
     
     def _update_trades(self, timestamp: Union[int,float], trade_id:int, leg_id:int, contract:Contract, quantity: float, action: Action, fill_price:float, fees:float):
+        """ The price is in the symbol's currency, cost and fees are in the base currency so trades aggregate across currencies. """
+        rate = self._fx_rate(contract)
         trade = ExecutionDetails(
             timestamp = timestamp,
             trade_id = trade_id,
@@ -236,9 +445,9 @@ class DummyBroker:
             symbol = contract.symbol,
             quantity = round(quantity,4),
             price = fill_price,
-            cost = round(fill_price * quantity * self.symbols_map[contract.symbol].multiplier , 2),
+            cost = round(fill_price * quantity * self.symbols_map[contract.symbol].multiplier * rate, 2),
             action = action.value,
-            fees = round(fees,4)
+            fees = round(fees * rate,4)
         )
 
         self.last_trade[contract] = trade
@@ -266,21 +475,78 @@ class DummyBroker:
         current_prices = self.order_book.current_prices()
 
         for contract, position in self.positions.items():
+            if contract.secType == 'OPT': # premium paid in full, no variation margin
+                continue
             current_price = current_prices[contract.symbol]
-            pnl = self._future_position_value(position, current_price) # total pnl for the position over life
+            pnl = self._future_position_value(position, current_price) * self._fx_rate(contract) # total pnl for the position over life
             self.account['UnrealizedPnL'] += pnl  # current track of unrealized pnl for the account
             total_new_pnl += pnl - position['unrealizedPnL']  # new pnl on the postion since last updating
             position['unrealizedPnL'] = pnl # update postion pnl for new pnl
+            self.valuation.mark(contract.symbol, pnl)
 
         self.account['FullAvailableFunds'] += total_new_pnl
         self.logger.info(f"Account marked-to-market.")
 
-    def check_margin_call(self):
-        if self.account['FullAvailableFunds']  < self.account['FullInitMarginReq']:
-            self.logger.info("Margin call triggered.")
-            # Logic to handle margin call, e.g., liquidate positions to meet margin requirements
-            return True
-        return False
+    def check_margin_call(self) -> bool:
+        """
+        Checks the margin requirement against the available funds, including futures pnl accrued since the last mark to market,
+        so it holds intraday as well as after the end of day mark. On a breach, positions are reduced per the margin call policy.
+        """
+        shortfall = self.account['FullInitMarginReq'] - (self.account['FullAvailableFunds'] + self.valuation.unmarked_pnl())
+        if shortfall <= 0:
+            return False
+
+        self.logger.info("Margin call triggered.")
+        if self.margin_call_policy:
+            self._liquidate_margin_call(shortfall)
+        return True
+
+    def _liquidate_margin_call(self, shortfall: float):
+        """
+        Reduces positions until the funds they release cover the shortfall, fills go through the normal execution path.
+
+        A futures contract releases its initial margin, a long equity share its sale proceeds. Short equities need cash
+        to cover and are never reduced. Reductions are SELL/COVER exits recorded under the trade and leg that hold the position.
+        """
+        valuation = self.valuation
+        held = np.abs(valuation.quantity)
+        release = np.where(valuation.is_future, valuation.initial_margin, np.where(valuation.quantity > 0, valuation.prices * valuation.multiplier, 0.0)) * valuation.rates
+        capacity = release * held
+        eligible = np.flatnonzero(capacity > 0)
+        if not len(eligible):
+            self.logger.info("Margin call : no position can be reduced.")
+            return
+
+        reductions = {} # symbol index -> units
+        if self.margin_call_policy == 'pro_rata':
+            fraction = min(1.0, shortfall / capacity[eligible].sum())
+            for i in eligible:
+                reductions[i] = min(held[i], math.ceil(held[i] * fraction))
+        else:
+            if self.margin_call_policy == 'largest_margin':
+                priority = eligible[np.argsort(-capacity[eligible], kind='stable')]
+            else: # worst_pnl
+                priority = eligible[np.argsort(valuation.position_pnl()[eligible], kind='stable')]
+
+            remaining = shortfall
+            for i in priority:
+                reductions[i] = min(held[i], math.ceil(remaining / release[i]))
+                remaining -= reductions[i] * release[i]
+                if remaining <= 0:
+                    break
+
+        contracts = {contract.symbol: contract for contract in self.positions}
+        for i, units in reductions.items():
+            contract = contracts[valuation.tickers[i]]
+            position = self.positions[contract]
+            units = int(units) if float(units).is_integer() else float(units)
+            units = min(units, abs(position['quantity']))
+            action = Action.SELL if position['quantity'] > 0 else Action.COVER
+
+            opening_trade = self.last_trade[contract] # read before the exit replaces it
+            fill_price = self._fill_price(contract, action, units)
+            self.logger.info(f"Margin call liquidation : {action.value} {units} {contract.symbol} @ {fill_price}")
+            self._execute_order(self.order_book.last_updated, opening_trade['trade_id'], opening_trade['leg_id'], action, contract, MarketOrder(action, units), fill_price)
     
     def liquidate_positions(self):
         """
@@ -290,7 +556,7 @@ class DummyBroker:
             action = Action.SELL if position['action'] == 'BUY' else Action.COVER
             fill_price = self._fill_price(contract,action)
             quantity = position['quantity'] * -1
-            timestamp = self.order_book.book[contract.symbol].timestamp
+            timestamp = self.order_book.book[contract.symbol].timestamp if contract.symbol in self.order_book.book else self.order_book.last_updated
 
             trade = ExecutionDetails(
                 timestamp= timestamp,
@@ -299,7 +565,7 @@ class DummyBroker:
                 symbol= contract.symbol,
                 quantity= round(quantity,4),
                 price= fill_price,
-                cost= round(fill_price * quantity * self.symbols_map[contract.symbol].multiplier, 2),
+                cost= round(fill_price * quantity * self.symbols_map[contract.symbol].multiplier * self._fx_rate(contract), 2),
                 action= action.value,
                 fees= 0.0 # because not actually a trade
             )
@@ -311,6 +577,12 @@ class DummyBroker:
     # Return functions to mimic data return from broker
     def return_positions(self):
         return self.positions
+
+    def return_position_changes(self) -> Dict[Contract, Tuple[int, Optional[PositionDetails]]]:
+        """ Positions changed since the last call with their version, a closed position is returned as None. """
+        changes = {contract: (self.position_versions[contract], self.positions.get(contract)) for contract in self.dirty_positions}
+        self.dirty_positions.clear()
+        return changes
     
     def return_account(self):
         return self.account
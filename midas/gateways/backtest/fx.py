@@ -0,0 +1,72 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+from midas.symbols.symbols import Symbol, Currency
+
+def fx_ticker(currency: Currency, base_currency: Currency) -> str:
+    """ Default ticker of the FX bars quoting base_currency per unit of currency, e.g. 'CADUSD'. """
+    return f"{currency.value}{base_currency.value}"
+
+class FxRates:
+    """
+    Rates converting every symbol's currency to the base currency.
+
+    FX bars are loaded alongside the instrument data, each pair quoting the base currency per unit of a symbol currency.
+    Rates are held in an array indexed by currency, with the base currency first at a rate of one, and every symbol
+    keeps the index of its currency, so the rates of the whole book are a single gather. The rates are read from the
+    order book at most once per timestamp, a currency without an FX bar yet keeps a rate of one.
+    """
+    def __init__(self, symbols_map: Dict[str, Symbol], base_currency: Currency, tickers: Dict[Currency, str] = None):
+        """
+        Args:
+            symbols_map (Dict[str, Symbol]) : Symbols valued, their order is the valuation's symbol index.
+            base_currency (Currency) : Currency the portfolio is valued and accounted in.
+            tickers (Dict[Currency, str]) : Ticker of the FX bars of a currency, defaults to e.g. 'CADUSD'.
+        """
+        if not isinstance(base_currency, Currency):
+            raise TypeError("'base_currency' must be of type Currency enum.")
+
+        tickers = tickers or {}
+        foreign = sorted({symbol.currency for symbol in symbols_map.values()} - {base_currency}, key=lambda currency: currency.value)
+
+        self.base_currency = base_currency
+        self.currencies : List[Currency] = [base_currency] + foreign
+        self.code = {currency: i for i, currency in enumerate(self.currencies)}
+        self.tickers : Dict[Currency, str] = {currency: tickers.get(currency, fx_ticker(currency, base_currency)) for currency in foreign}
+        self.rates = np.ones(len(self.currencies))
+        self.symbol_code = np.array([self.code[symbol.currency] for symbol in symbols_map.values()], dtype=np.intp)
+        self.timestamp = None
+        self._symbol_rates = None
+
+    def update(self, timestamp: int, order_book) -> Optional[np.ndarray]:
+        """
+        Reads the latest FX prices, once per timestamp.
+
+        Returns:
+            np.ndarray : Rates before the update if any rate changed, else None.
+        """
+        if timestamp == self.timestamp or not self.tickers:
+            return None
+        self.timestamp = timestamp
+
+        rates = self.rates.copy()
+        for currency, ticker in self.tickers.items():
+            price = order_book.current_price(ticker)
+            if price:
+                rates[self.code[currency]] = price
+
+        if np.array_equal(rates, self.rates):
+            return None
+        previous, self.rates = self.rates, rates
+        self._symbol_rates = None
+        return previous
+
+    def rate(self, currency: Currency) -> float:
+        """ Base currency per unit of currency. """
+        return float(self.rates[self.code[currency]])
+
+    def symbol_rates(self) -> np.ndarray:
+        """ Rate of every symbol, gathered once per rate change. """
+        if self._symbol_rates is None:
+            self._symbol_rates = self.rates[self.symbol_code]
+        return self._symbol_rates
@@ -0,0 +1,268 @@
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Union
+
+from midas.symbols.symbols import Symbol, Option, Future, Right
+
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+GREEKS = ['delta', 'gamma', 'vega', 'theta']
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """ Standard normal cdf from a rational erfc approximation, fractional error below 1.2e-7. """
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.5 * z)
+    erfc = t * np.exp(-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (-0.18628806
+                      + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (-0.82215223 + t * 0.17087277)))))))))
+    return np.where(x >= 0, 1 - 0.5 * erfc, 0.5 * erfc)
+
+def option_values(underlying: np.ndarray, strike: np.ndarray, time: np.ndarray, rate: Union[float, np.ndarray], carry: Union[float, np.ndarray],
+                  volatility: np.ndarray, is_call: np.ndarray, greeks: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Generalized Black-Scholes price and greeks of a batch of european options.
+
+    The cost of carry selects the model : rate (less dividend yield) for Black-Scholes on a spot underlying, zero for
+    Black-76 on a futures underlying. Expired options are worth their intrinsic value.
+
+    Args:
+        underlying (np.ndarray) : Spot or futures price.
+        strike (np.ndarray) : Strike prices.
+        time (np.ndarray) : Time to expiry in years.
+        rate (float) : Continuously compounded risk-free rate.
+        carry (float) : Cost of carry.
+        volatility (np.ndarray) : Annualized volatility.
+        is_call (np.ndarray) : True for calls, False for puts.
+        greeks (bool) : Also return delta, gamma, vega (per unit of volatility) and theta (per year).
+
+    Returns:
+        Dict[str, np.ndarray] : 'price' and, if requested, the greeks.
+    """
+    underlying, strike, time, volatility, is_call = np.broadcast_arrays(np.asarray(underlying, dtype=float), np.asarray(strike, dtype=float),
+                                                                        np.asarray(time, dtype=float), np.asarray(volatility, dtype=float), np.asarray(is_call, dtype=bool))
+    sign = np.where(is_call, 1.0, -1.0)
+    live = (time > 0) & (volatility > 0)
+    t = np.where(live, time, 1.0) # placeholders keep the expired entries finite, they are replaced below
+    v = np.where(live, volatility, 1.0)
+
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(underlying / strike) + (carry + 0.5 * v * v) * t) / (v * sqrt_t)
+    d2 = d1 - v * sqrt_t
+    carry_discount = np.exp((carry - rate) * t)
+    discount = np.exp(-rate * t)
+
+    nd1 = norm_cdf(sign * d1)
+    nd2 = norm_cdf(sign * d2)
+    intrinsic = np.maximum(sign * (underlying - strike), 0.0)
+    values = {'price': np.where(live, sign * (underlying * carry_discount * nd1 - strike * discount * nd2), intrinsic)}
+
+    if greeks:
+        pdf = norm_pdf(d1)
+        in_the_money = sign * (underlying - strike) > 0
+        values['delta'] = np.where(live, sign * carry_discount * nd1, np.where(in_the_money, sign, 0.0))
+        values['gamma'] = np.where(live, carry_discount * pdf / (underlying * v * sqrt_t), 0.0)
+        values['vega'] = np.where(live, underlying * carry_discount * pdf * sqrt_t, 0.0)
+        values['theta'] = np.where(live, -underlying * carry_discount * pdf * v / (2 * sqrt_t)
+                                         - sign * (carry - rate) * underlying * carry_discount * nd1
+                                         - sign * rate * strike * discount * nd2, 0.0)
+    return values
+
+def implied_volatility(prices: np.ndarray, underlying: np.ndarray, strike: np.ndarray, time: np.ndarray, rate: float, carry: float,
+                       is_call: np.ndarray, tolerance: float = 1e-8, max_iterations: int = 100) -> np.ndarray:
+    """
+    Implied volatilities of a batch of option prices, Newton steps safeguarded by bisection so every entry converges.
+    Prices outside the no-arbitrage bounds and expired options return NaN.
+    """
+    prices, underlying, strike, time, is_call = np.broadcast_arrays(np.asarray(prices, dtype=float), np.asarray(underlying, dtype=float),
+                                                                    np.asarray(strike, dtype=float), np.asarray(time, dtype=float), np.asarray(is_call, dtype=bool))
+    low = np.full(prices.shape, 1e-6)
+    high = np.full(prices.shape, 5.0)
+    lower_bound = option_values(underlying, strike, time, rate, carry, low, is_call, greeks=False)['price']
+    upper_bound = option_values(underlying, strike, time, rate, carry, high, is_call, greeks=False)['price']
+    valid = (time > 0) & (prices >= lower_bound) & (prices <= upper_bound)
+
+    volatility = np.full(prices.shape, 0.2)
+    for _ in range(max_iterations):
+        values = option_values(underlying, strike, time, rate, carry, volatility, is_call)
+        error = values['price'] - prices
+        if np.all(np.abs(error[valid]) < tolerance):
+            break
+
+        # Keep the bracket around the root, price is increasing in volatility
+        high = np.where(error > 0, volatility, high)
+        low = np.where(error <= 0, volatility, low)
+
+        vega = values['vega']
+        newton = volatility - np.divide(error, vega, out=np.full(prices.shape, np.inf), where=vega > 1e-12)
+        volatility = np.where((newton > low) & (newton < high), newton, 0.5 * (low + high))
+
+    return np.where(valid, volatility, np.nan)
+
+def expiry_timestamp(lastTradeDateOrContractMonth: str) -> int:
+    """ UNIX time an option expires, the end of the expiry date (UTC). A contract month expires on its third Friday. """
+    if len(lastTradeDateOrContractMonth) == 8:
+        expiry = datetime.strptime(lastTradeDateOrContractMonth, '%Y%m%d')
+    elif len(lastTradeDateOrContractMonth) == 6:
+        first = datetime.strptime(lastTradeDateOrContractMonth, '%Y%m')
+        expiry = first + timedelta(days=(4 - first.weekday()) % 7 + 14)
+    else:
+        raise ValueError(f"'lastTradeDateOrContractMonth' must be YYYYMMDD or YYYYMM, got {lastTradeDateOrContractMonth}.")
+    return int((expiry + timedelta(days=1)).replace(tzinfo=timezone.utc).timestamp())
+
+class VolatilitySurface:
+    """
+    Implied volatility by time to expiry and strike.
+
+    Each expiry holds a smile interpolated linearly in strike (flat beyond the quoted strikes), expiries are
+    interpolated linearly in total variance. Evaluation is vectorized over any number of (time, strike) queries.
+    """
+    def __init__(self, expiries: List[float], strikes: List[np.ndarray], volatilities: List[np.ndarray]):
+        """
+        Args:
+            expiries (List[float]) : Times to expiry in years, increasing.
+            strikes (List[np.ndarray]) : Increasing strikes of each expiry's smile.
+            volatilities (List[np.ndarray]) : Implied volatility at each strike of each expiry.
+        """
+        if not expiries or len(expiries) != len(strikes) or len(strikes) != len(volatilities):
+            raise ValueError("'expiries', 'strikes' and 'volatilities' must be non-empty and of equal length.")
+        if np.any(np.diff(expiries) <= 0):
+            raise ValueError("'expiries' must be strictly increasing.")
+
+        self.expiries = np.asarray(expiries, dtype=float)
+        self.strikes = [np.asarray(strike, dtype=float) for strike in strikes]
+        self.volatilities = [np.asarray(volatility, dtype=float) for volatility in volatilities]
+
+    @classmethod
+    def flat(cls, volatility: float) -> 'VolatilitySurface':
+        return cls([1.0], [np.array([1.0])], [np.array([volatility])])
+
+    @classmethod
+    def from_prices(cls, prices: np.ndarray, underlying: float, strikes: np.ndarray, times: np.ndarray, rate: float, carry: float, is_call: np.ndarray) -> 'VolatilitySurface':
+        """ Calibrates the surface to observed option prices, quotes without an implied volatility are left out. """
+        volatilities = implied_volatility(prices, underlying, strikes, times, rate, carry, is_call)
+        strikes, times = np.broadcast_arrays(np.asarray(strikes, dtype=float), np.asarray(times, dtype=float))
+        valid = ~np.isnan(volatilities)
+        if not valid.any():
+            raise ValueError("No option price has an implied volatility.")
+
+        expiries, smile_strikes, smile_volatilities = [], [], []
+        for expiry in np.unique(times[valid]):
+            quotes = valid & (times == expiry)
+            order = np.argsort(strikes[quotes], kind='stable')
+            expiries.append(expiry)
+            smile_strikes.append(strikes[quotes][order])
+            smile_volatilities.append(volatilities[quotes][order])
+        return cls(expiries, smile_strikes, smile_volatilities)
+
+    def volatility(self, times: np.ndarray, strikes: np.ndarray) -> np.ndarray:
+        times, strikes = np.broadcast_arrays(np.asarray(times, dtype=float), np.asarray(strikes, dtype=float))
+        smiles = np.array([np.interp(strikes, smile_strikes, smile_volatilities) for smile_strikes, smile_volatilities in zip(self.strikes, self.volatilities)])
+        if len(self.expiries) == 1:
+            return smiles[0]
+
+        # Linear in total variance between the bracketing expiries, flat volatility outside them
+        upper = np.clip(np.searchsorted(self.expiries, times), 1, len(self.expiries) - 1)
+        lower = upper - 1
+        columns = np.arange(times.size).reshape(times.shape)
+        t0, t1 = self.expiries[lower], self.expiries[upper]
+        v0, v1 = smiles[lower, columns], smiles[upper, columns]
+        clipped = np.clip(times, t0, t1)
+        weight = (clipped - t0) / (t1 - t0)
+        variance = (1 - weight) * v0 * v0 * t0 + weight * v1 * v1 * t1
+        return np.sqrt(variance / np.maximum(clipped, 1e-12))
+
+class OptionBook:
+    """
+    Vectorized valuation of every option in the symbols map.
+
+    Option contracts are held in arrays, one evaluation prices and computes the greeks of the whole book from the
+    underlying prices. Options on futures use Black-76, options on other underlyings Black-Scholes. Volatilities come
+    from the underlying's cached surface and evaluations are cached per timestamp and underlying prices, so the broker
+    can price fills, value the portfolio and aggregate greeks within a bar from a single evaluation.
+    """
+    def __init__(self, symbols_map: Dict[str, Symbol], surfaces: Optional[Dict[str, VolatilitySurface]] = None, risk_free_rate: float = 0.0, default_volatility: float = 0.2):
+        """
+        Args:
+            surfaces (Dict[str, VolatilitySurface]) : Volatility surface of each underlying, keyed by the underlying's ticker.
+            risk_free_rate (float) : Continuously compounded risk-free rate.
+            default_volatility (float) : Flat volatility of underlyings without a surface.
+        """
+        self.surfaces : Dict[str, VolatilitySurface] = dict(surfaces or {})
+        self.risk_free_rate = risk_free_rate
+        self.default_volatility = default_volatility
+
+        options = {ticker: symbol for ticker, symbol in symbols_map.items() if isinstance(symbol, Option)}
+        for ticker, option in options.items():
+            if option.underlying is None:
+                raise ValueError(f"Option {ticker} has no underlying.")
+
+        self.tickers = list(options)
+        self.index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.strike = np.array([option.strike for option in options.values()], dtype=float)
+        self.expiry = np.array([expiry_timestamp(option.lastTradeDateOrContractMonth) for option in options.values()], dtype=np.int64)
+        self.is_call = np.array([option.right == Right.CALL for option in options.values()], dtype=bool)
+        self.multiplier = np.array([option.multiplier for option in options.values()], dtype=float)
+
+        # Options grouped by underlying, the carry of a futures underlying is zero (Black-76)
+        self.underlyings = sorted({option.underlying for option in options.values()})
+        self.underlying_code = np.array([self.underlyings.index(option.underlying) for option in options.values()], dtype=np.intp)
+        self.carry = np.array([0.0 if isinstance(symbols_map.get(option.underlying), Future) else risk_free_rate for option in options.values()])
+
+        self._cache_key = None
+        self._cache : Dict[str, np.ndarray] = {}
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def calibrate(self, underlying: str, timestamp: int, underlying_price: float, option_prices: Dict[str, float]):
+        """ Implies and caches the underlying's volatility surface from observed prices of its options. """
+        slots = np.array([self.index[ticker] for ticker in option_prices], dtype=np.intp)
+        carry = self.carry[slots[0]]
+        self.surfaces[underlying] = VolatilitySurface.from_prices(np.array(list(option_prices.values()), dtype=float), underlying_price, self.strike[slots],
+                                                                  self._time_to_expiry(timestamp)[slots], self.risk_free_rate, carry, self.is_call[slots])
+        self._cache_key = None
+
+    def evaluate(self, timestamp: int, underlying_prices: Dict[str, float]) -> Dict[str, np.ndarray]:
+        """ Price and greeks of every option, NaN for options whose underlying has no price yet. """
+        spot_by_underlying = np.array([underlying_prices.get(underlying, np.nan) or np.nan for underlying in self.underlyings], dtype=float)
+        key = (timestamp, spot_by_underlying.tobytes())
+        if key == self._cache_key:
+            return self._cache
+
+        time = self._time_to_expiry(timestamp)
+        volatility = np.full(len(self), self.default_volatility)
+        for code, underlying in enumerate(self.underlyings):
+            surface = self.surfaces.get(underlying)
+            if surface is not None:
+                members = self.underlying_code == code
+                volatility[members] = surface.volatility(np.maximum(time[members], 0.0), self.strike[members])
+
+        spot = spot_by_underlying[self.underlying_code]
+        self._cache = option_values(spot, self.strike, time, self.risk_free_rate, self.carry, volatility, self.is_call)
+        self._cache_key = key
+        return self._cache
+
+    def price(self, ticker: str, timestamp: int, underlying_prices: Dict[str, float]) -> Optional[float]:
+        price = self.evaluate(timestamp, underlying_prices)['price'][self.index[ticker]]
+        return None if np.isnan(price) else float(price)
+
+    def prices(self, timestamp: int, underlying_prices: Dict[str, float]) -> Dict[str, float]:
+        """ Model price of every option with a priced underlying. """
+        prices = self.evaluate(timestamp, underlying_prices)['price']
+        return {ticker: float(price) for ticker, price in zip(self.tickers, prices) if not np.isnan(price)}
+
+    def portfolio_greeks(self, quantities: np.ndarray, timestamp: int, underlying_prices: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+        """
+        Greeks of the option positions aggregated per underlying.
+
+        Args:
+            quantities (np.ndarray) : Position in every option of the book, in book order.
+        """
+        values = self.evaluate(timestamp, underlying_prices)
+        exposure = quantities * self.multiplier
+        aggregated = {greek: np.bincount(self.underlying_code, weights=np.nan_to_num(exposure * values[greek]), minlength=len(self.underlyings)) for greek in GREEKS}
+        return {underlying: {greek: float(aggregated[greek][code]) for greek in GREEKS} for code, underlying in enumerate(self.underlyings)}
+
+    def _time_to_expiry(self, timestamp: int) -> np.ndarray:
+        return (self.expiry - int(timestamp)) / SECONDS_PER_YEAR
@@ -0,0 +1,87 @@
+from bisect import insort
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Union
+from ibapi.contract import Contract
+
+from midas.events import Action, BaseOrder
+
+@dataclass
+class RestingOrder:
+    timestamp: Union[int, float]
+    trade_id: int
+    leg_id: int
+    action: Action
+    contract: Contract
+    order: BaseOrder
+    seq: int = 0
+
+    @property
+    def order_type(self) -> str:
+        return self.order.order.orderType
+
+    @property
+    def side(self) -> str:
+        return self.order.order.action
+
+    @property
+    def price(self) -> float:
+        return self.order.order.lmtPrice if self.order_type == 'LMT' else self.order.order.auxPrice
+
+class TriggerBook:
+    """
+    Resting limit and stop orders of a single symbol.
+
+    Each (order type, side) is a list sorted on a signed trigger price, chosen so the orders a bar triggers are always
+    a suffix of the list :
+        buy limit  : limit >= low   -> key  limit
+        sell limit : limit <= high  -> key -limit
+        buy stop   : stop  <= high  -> key -stop
+        sell stop  : stop  >= low   -> key  stop
+    Adding an order is a bisect and triggered orders are popped off the end, so a bar costs O(log n + fills).
+    Equal prices keep time priority.
+    """
+    SIGN = {('LMT', 'BUY'): 1, ('LMT', 'SELL'): -1, ('STP', 'BUY'): -1, ('STP', 'SELL'): 1}
+
+    def __init__(self):
+        self.books : Dict[Tuple[str, str], List[tuple]] = {side: [] for side in self.SIGN}
+        self._next_seq = 0
+
+    def __len__(self):
+        return sum(len(book) for book in self.books.values())
+
+    def add(self, resting_order: RestingOrder):
+        side = (resting_order.order_type, resting_order.side)
+        if side not in self.books:
+            raise ValueError(f"Order type {resting_order.order_type} cannot rest in the trigger book.")
+
+        resting_order.seq = self._next_seq
+        self._next_seq += 1
+        insort(self.books[side], (self.SIGN[side] * resting_order.price, -resting_order.seq, resting_order))
+
+    def triggered(self, buy_high: float, buy_low: float, sell_high: float, sell_low: float) -> List[RestingOrder]:
+        """
+        Removes and returns the orders triggered by the traded range, in time priority.
+
+        Args:
+            buy_high, buy_low (float) : Range buy orders are evaluated against, the bar's high/low or the ask.
+            sell_high, sell_low (float) : Range sell orders are evaluated against, the bar's high/low or the bid.
+        """
+        thresholds = {('LMT', 'BUY'): buy_low, ('LMT', 'SELL'): -sell_high, ('STP', 'BUY'): -buy_high, ('STP', 'SELL'): sell_low}
+        fills = []
+        for side, book in self.books.items():
+            threshold = thresholds[side]
+            while book and book[-1][0] >= threshold:
+                fills.append(book.pop()[2])
+
+        fills.sort(key=lambda resting_order: resting_order.seq)
+        return fills
+
+    def cancel(self, trade_id: int) -> List[RestingOrder]:
+        """ Removes every resting order of trade_id. """
+        cancelled = []
+        for side, book in self.books.items():
+            kept = []
+            for entry in book:
+                (cancelled if entry[2].trade_id == trade_id else kept).append(entry)
+            self.books[side] = kept
+        return [entry[2] for entry in cancelled]
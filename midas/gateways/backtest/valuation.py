@@ -0,0 +1,140 @@
+import numpy as np
+from typing import Dict
+
+from midas.symbols.symbols import Symbol
+from .fx import FxRates
+
+class PortfolioValuation:
+    """
+    Incremental portfolio valuation for the DummyBroker.
+
+    Quantity, multiplier and cost basis of every symbol are held in arrays indexed by symbol, the portfolio value is
+        sum(quantity * multiplier * price) - sum(cost_basis)
+    where the cost basis is avg_cost * quantity for futures (valued on pnl) and zero for equities (valued on market value).
+    A price update only touches the changed symbols, the value moves by the dot product of the price deltas and
+    quantity * multiplier. A position change revalues the book exactly, which also clears accumulated rounding.
+
+    The futures pnl is tracked the same way, together with the pnl already marked into the account's available funds,
+    so the pnl accrued since the last mark to market is available intraday without walking the positions.
+
+    With FX rates, values are in the base currency. The local value of the book is kept per currency, a price delta is
+    converted at its symbol's rate and a rate change moves the value by the rate delta times the local value held in
+    that currency, so a mixed-currency book is valued at the cost of a single-currency one.
+    """
+    def __init__(self, symbols_map: Dict[str, Symbol], fx: FxRates = None):
+        self.tickers = list(symbols_map)
+        self.index = {ticker: i for i, ticker in enumerate(symbols_map)}
+        self.quantity = np.zeros(len(self.index))
+        self.multiplier = np.array([symbol.multiplier for symbol in symbols_map.values()], dtype=float)
+        self.initial_margin = np.array([symbol.initialMargin for symbol in symbols_map.values()], dtype=float)
+        self.avg_cost = np.zeros(len(self.index))
+        self.cost_basis = np.zeros(len(self.index))
+        self.prices = np.zeros(len(self.index))
+        self.priced = np.zeros(len(self.index), dtype=bool)
+        self.value = 0.0
+
+        self.marked_pnl = np.zeros(len(self.index)) # pnl per symbol included in the available funds
+        self.futures_value = 0.0
+        self.marked_total = 0.0 # futures only
+
+        self.is_future = np.zeros(len(self.index), dtype=bool)
+        for i, symbol in enumerate(symbols_map.values()):
+            if symbol.secType.value == 'FUT':
+                self.is_future[i] = True
+            elif symbol.secType.value not in ['STK', 'OPT']: # options are valued on market value like equities
+                raise ValueError("'contract.sectype' must be one of the following : STK, FUT, OPT.")
+
+        self._exposure = np.zeros(len(self.index)) # quantity * multiplier
+
+        self.fx = fx
+        self.currency_code = fx.symbol_code if fx else np.zeros(len(self.index), dtype=np.intp)
+        self.rates = fx.symbol_rates() if fx else np.ones(len(self.index)) # base currency per unit of each symbol's currency
+        self.local_value = np.zeros(len(fx.currencies) if fx else 1) # value per currency, in that currency
+        self.local_futures = np.zeros(len(self.local_value))
+
+    def update_fx(self, timestamp: int, order_book) -> bool:
+        """ Applies the FX rates as of timestamp, returns True if any rate changed. """
+        if self.fx is None:
+            return False
+
+        previous = self.fx.update(timestamp, order_book)
+        if previous is None:
+            return False
+
+        change = self.fx.rates - previous
+        self.value += float(np.dot(change, self.local_value))
+        self.futures_value += float(np.dot(change, self.local_futures))
+        self.rates = self.fx.symbol_rates()
+        return True
+
+    def update_prices(self, prices: Dict[str, float]) -> float:
+        """ Applies the changed prices, returns the portfolio value. """
+        slots = [(self.index[ticker], price) for ticker, price in prices.items() if ticker in self.index]
+        if not slots:
+            return self.value
+
+        idx = np.fromiter((slot for slot, _ in slots), dtype=np.intp, count=len(slots))
+        new_prices = np.fromiter((price for _, price in slots), dtype=float, count=len(slots))
+
+        local = self._exposure[idx] * (new_prices - self.prices[idx])
+        local_futures = local * self.is_future[idx]
+        self.value += float(np.dot(self.rates[idx], local))
+        self.futures_value += float(np.dot(self.rates[idx], local_futures))
+
+        codes = self.currency_code[idx]
+        self.local_value += np.bincount(codes, local, minlength=len(self.local_value))
+        self.local_futures += np.bincount(codes, local_futures, minlength=len(self.local_futures))
+        self.prices[idx] = new_prices
+        self.priced[idx] = True
+        return self.value
+
+    def update_position(self, ticker: str, quantity: float, avg_cost: float, price: float = None, marked_pnl: float = 0.0):
+        """
+        Sets the position held in ticker, a closed position has a quantity of zero.
+
+        Args:
+            price (float) : Price the symbol is valued at if no market price was applied yet, e.g. the fill price.
+            marked_pnl (float) : Pnl of the position already included in the available funds.
+        """
+        i = self.index[ticker]
+        if not self.priced[i] and price is not None:
+            self.prices[i] = price
+            self.priced[i] = True
+
+        self.quantity[i] = quantity
+        self.avg_cost[i] = avg_cost
+        self._exposure[i] = quantity * self.multiplier[i]
+        self.cost_basis[i] = avg_cost * quantity if self.is_future[i] else 0.0
+        self.marked_pnl[i] = marked_pnl
+        self.revalue()
+
+    def mark(self, ticker: str, pnl: float):
+        """ Records the pnl of ticker marked into the available funds. """
+        i = self.index[ticker]
+        if self.is_future[i]:
+            self.marked_total += pnl - self.marked_pnl[i]
+        self.marked_pnl[i] = pnl
+
+    def unmarked_pnl(self) -> float:
+        """ Futures pnl accrued since the last mark to market. """
+        return self.futures_value - self.marked_total
+
+    def position_pnl(self) -> np.ndarray:
+        """ Unrealized pnl of every symbol since entry, in the base currency. """
+        return self.quantity * (self.prices * self.multiplier - self.avg_cost) * self.rates
+
+    def margin_requirement(self) -> float:
+        """ Initial margin of the futures held, in the base currency. """
+        return float(np.dot(self.rates, self.initial_margin * np.abs(self.quantity) * self.is_future))
+
+    def revalue(self) -> float:
+        """ Exact valuation over the whole book. """
+        local = self._exposure * self.prices - self.cost_basis
+        self.local_value = np.bincount(self.currency_code, local, minlength=len(self.local_value))
+        self.local_futures = np.bincount(self.currency_code, local * self.is_future, minlength=len(self.local_futures))
+
+        rates = self.fx.rates if self.fx else np.ones(1)
+        self.value = float(np.dot(rates, self.local_value))
+        self.futures_value = float(np.dot(rates, self.local_futures))
+        self.marked_total = float(self.marked_pnl[self.is_future].sum())
+        return self.value
@@ -9,6 +9,7 @@ from ibapi.contract import Contract
 from .wrapper import BrokerApp
 from midas.events import OrderEvent
 from midas.portfolio import PortfolioServer
+from midas.utils.latency import latency_tracker
 from midas.performance import PerformanceManager
 
 
@@ -23,8 +24,6 @@ class BrokerClient():
         self.port = int(port)
         self.clientId = clientId
         self.account = ib_account
-
-        self.lock = threading.Lock()  # create a lock
     
     # -- Helper --
     def _websocket_connection(self):
@@ -32,10 +31,7 @@ class BrokerClient():
         self.app.run()
 
     def _get_valid_id(self): 
-        with self.lock:
-            current_valid_id = self.app.next_valid_order_id
-            self.app.next_valid_order_id += 1
-            return current_valid_id 
+        return self.app.id_allocator.next_id()
         
     def _manange_subscription_to_account_updates(self, subscribe:bool):
         self.app.reqAccountUpdates(subscribe=subscribe, acctCode=self.account)
@@ -77,7 +73,8 @@ class BrokerClient():
         
         contract = event.contract
         order = event.order.order
-        self.handle_order(contract,order) 
+        orderId = self.handle_order(contract,order) 
+        latency_tracker.mark_order_placed(event.trade_id, orderId)
 
     def handle_order(self, contract:Contract, order:Order):
         orderId = self._get_valid_id()
@@ -85,6 +82,7 @@ class BrokerClient():
             self.app.placeOrder(orderId=orderId, contract=contract, order=order)
         except Exception as e:
             raise e
+        return orderId
 
     def cancel_order(self, orderId:int):
         self.app.cancelOrder(orderId=orderId)
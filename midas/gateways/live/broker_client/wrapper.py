@@ -11,6 +11,8 @@ from ibapi.order_state import OrderState
 from ibapi.contract import Contract, ContractDetails
 
 from midas.portfolio import PortfolioServer
+from midas.utils.latency import latency_tracker
+from midas.gateways.live.id_allocator import IdAllocator
 from midas.performance import PerformanceManager
 from midas.account_data import ActiveOrder, Position, Trade
 from midas.account_data import Position,ActiveOrder, AccountDetails, EquityDetails
@@ -37,8 +39,8 @@ class BrokerApp(EWrapper, EClient):
         self.account_download_event = threading.Event()
         self.open_orders_event = threading.Event()
 
-        # Thread Locks
-        self.next_valid_order_id_lock = threading.Lock()
+        # Id Allocation
+        self.id_allocator = IdAllocator()
 
     def error(self, reqId:int, errorCode:int, errorString:str, advancedOrderRejectJson:str=None):
         super().error(reqId, errorCode, errorString)
@@ -64,8 +66,8 @@ class BrokerApp(EWrapper, EClient):
     #### wrapper function for reqIds() -> This function manages the Order ID.
     def nextValidId(self, orderId:int):
         super().nextValidId(orderId)
-        with self.next_valid_order_id_lock:
-            self.next_valid_order_id = orderId
+        self.next_valid_order_id = orderId
+        self.id_allocator.sync(orderId)
         
         self.logger.info(f"Next Valid Id {self.next_valid_order_id}")
         self.valid_id_event.set()
@@ -144,6 +146,7 @@ class BrokerApp(EWrapper, EClient):
     # Wrapper function for orderStatus
     def orderStatus(self, orderId:int, status:str, filled:Decimal, remaining:Decimal, avgFillPrice:float, permId:int, parentId:int, lastFillPrice:float, clientId:int, whyHeld:str, mktCapPrice: float):
         super().orderStatus(orderId, status, filled, remaining, avgFillPrice, permId, parentId, lastFillPrice, clientId, whyHeld, mktCapPrice)
+        latency_tracker.mark_order_status(orderId)
         self.logger.info(f"Received order status update for orderId {orderId}: {status}")
         
         order_data = ActiveOrder(
@@ -1,27 +1,39 @@
+import os
+import time
+import pickle
 import logging
-from .data_client import DataClient
+from typing import Dict, List, Tuple
+from concurrent.futures import Future, wait
 from ibapi.contract import Contract
 
+from .data_client import DataClient
+
 class ContractManager:
-    def __init__(self, client_instance: DataClient, logger:logging.Logger):
+    def __init__(self, client_instance: DataClient, logger:logging.Logger, cache_path: str = None, cache_ttl: float = 86400, timeout: float = 10):
         self.logger = logger
         self.client = client_instance
         self.app = self.client.app
-        self.validated_contracts = {}  # Dictionary to store validated contracts
+        self.validated_contracts = {}  # Validated contracts keyed by contract_key, a symbol can name several contracts
+
+        # Persistent cache of ContractDetails, {key : (validated_at, ContractDetails)}
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl # seconds a cached validation remains valid
+        self.timeout = timeout # seconds to wait on outstanding contract details requests
+        self.contract_cache : Dict[str, tuple] = self._load_cache()
 
     def validate_contract(self, contract: Contract) -> bool:
         """Validate a contract with IB."""
 
         if not isinstance(contract, Contract):
             raise ValueError("'contract' must be of type Contract instance.")
-        
+
         # Check if the contract is already validated
         if self._is_contract_validated(contract):
             self.logger.info(f"Contract {contract.symbol} is already validated.")
             return True
 
         # Reset the validation attribute in case it has been used before
-        self.app.is_valid_contract = None  
+        self.app.is_valid_contract = None
         self.app.validate_contract_event.clear()
 
         # Request contract details from IB
@@ -31,13 +43,98 @@ class ContractManager:
 
         # Store the validated contract if it's valid
         if self.app.is_valid_contract:
-            self.validated_contracts[contract.symbol] = contract
+            self.validated_contracts[self.contract_key(contract)] = contract
             self.logger.info(f"Contract {contract.symbol} validated successfully.")
         else:
             self.logger.warning(f"Contract {contract.symbol} validation failed.")
-            
+
         return self.app.is_valid_contract
 
+    def validate_contracts(self, contracts: List[Contract]) -> Dict[str, bool]:
+        """
+        Validate a batch of contracts with IB, all requests are sent before waiting on any response.
+
+        Args:
+            contracts (List[Contract]) : Contracts to be validated.
+
+        Returns:
+            Dict[str, bool] : Validation result keyed by contract_key(contract).
+        """
+        if not isinstance(contracts, list) or not all(isinstance(contract, Contract) for contract in contracts):
+            raise ValueError("'contracts' must be a list of Contract instances.")
+
+        results = {}
+        requested = set()
+        pending : Dict[int, Tuple[Contract, Future]] = {} # keyed by reqId
+
+        for contract in contracts:
+            key = self.contract_key(contract)
+            if key in results or key in requested:
+                continue # same contract listed twice
+            if self._is_contract_validated(contract):
+                self.logger.info(f"Contract {contract.symbol} is already validated.")
+                results[key] = True
+            elif self._is_contract_cached(contract):
+                self.validated_contracts[key] = contract
+                self.logger.info(f"Contract {contract.symbol} validated from cache.")
+                results[key] = True
+            else:
+                reqId = self.client._get_valid_id()
+                future = Future()
+                self.app.contract_requests[reqId] = future
+                self.app.reqContractDetails(reqId=reqId, contract=contract)
+                pending[reqId] = (contract, future)
+                requested.add(key)
+
+        wait([future for _, future in pending.values()], timeout=self.timeout)
+
+        for reqId, (contract, future) in pending.items():
+            self.app.contract_requests.pop(reqId, None)
+            contract_details = future.result() if future.done() else None
+            key = self.contract_key(contract)
+
+            if contract_details:
+                self.validated_contracts[key] = contract
+                self.contract_cache[key] = (time.time(), contract_details[0])
+                self.logger.info(f"Contract {contract.symbol} validated successfully.")
+                results[key] = True
+            else:
+                self.logger.warning(f"Contract {contract.symbol} validation failed.")
+                results[key] = False
+
+        if pending:
+            self._save_cache()
+
+        return results
+
     def _is_contract_validated(self, contract: Contract) -> bool:
         """Check if a contract has already been validated."""
-        return contract.symbol in self.validated_contracts
+        return self.contract_key(contract) in self.validated_contracts
+
+    def _is_contract_cached(self, contract: Contract) -> bool:
+        """Check if a contract has a cached validation within the ttl."""
+        entry = self.contract_cache.get(self.contract_key(contract))
+        return entry is not None and (time.time() - entry[0]) < self.cache_ttl
+
+    def contract_key(self, contract: Contract) -> str:
+        """Identifies a contract by symbol, type, exchange, currency and expiry."""
+        return f"{contract.symbol}|{contract.secType}|{contract.exchange}|{contract.currency}|{contract.lastTradeDateOrContractMonth}"
+
+    def _load_cache(self) -> Dict[str, tuple]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+
+        try:
+            with open(self.cache_path, 'rb') as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            self.logger.warning(f"Contract cache could not be loaded, revalidating all contracts : {e}")
+            return {}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        with open(self.cache_path, 'wb') as file:
+            pickle.dump(self.contract_cache, file, protocol=pickle.HIGHEST_PROTOCOL)
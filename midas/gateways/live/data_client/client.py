@@ -11,15 +11,13 @@ from midas.events import MarketDataType
 
 class DataClient:
 
-    def __init__(self, event_queue:Queue, logger:logging.Logger,host=config('HOST'), port=config('PORT'), clientId=config('DATA_CLIENT_ID'), ib_account =config('IB_ACCOUNT')):
+    def __init__(self, event_queue:Queue, logger:logging.Logger,host=config('HOST'), port=config('PORT'), clientId=config('DATA_CLIENT_ID'), ib_account =config('IB_ACCOUNT'), bar_timeout=2.0, recorder=None):
         self.logger = logger
-        self.app = DataApp(event_queue, logger)
+        self.app = DataApp(event_queue, logger, bar_timeout, recorder=recorder)
         self.host = host
         self.port = int(port)
         self.clientId = clientId
         self.account = ib_account
-
-        self.lock = threading.Lock()  # create a lock
     
     # -- Helper --
     def _websocket_connection(self):
@@ -27,10 +25,7 @@ class DataClient:
         self.app.run()
 
     def _get_valid_id(self): 
-        with self.lock:
-            current_valid_id = self.app.next_valid_order_id
-            self.app.next_valid_order_id += 1
-            return current_valid_id 
+        return self.app.id_allocator.next_id()
 
     # -- Connection --
     def connect(self):
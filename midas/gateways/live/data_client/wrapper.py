@@ -3,34 +3,53 @@ import logging
 import threading
 from queue import Queue
 from decimal import Decimal
+from typing import Dict, List, Optional
+from concurrent.futures import Future
 from ibapi.client import EClient
 from ibapi.wrapper import EWrapper
 from ibapi.contract import ContractDetails
 
 from midas.events import MarketEvent, BarData
+from midas.utils.latency import latency_tracker
+from midas.utils.market_recorder import MarketDataRecorder
+from midas.gateways.live.id_allocator import IdAllocator
 
 
 class DataApp(EWrapper, EClient):
     
-    def __init__(self, event_queue:Queue, logger:logging.Logger):
+    def __init__(self, event_queue:Queue, logger:logging.Logger, bar_timeout:Optional[float]=2.0, bar_size:int=5, recorder:Optional[MarketDataRecorder]=None):
         EClient.__init__(self, self)
         self.event_queue = event_queue
         self.logger = logger
+        self.recorder = recorder # every incoming bar is recorded when set
+        self.bar_timeout = bar_timeout # seconds to wait on missing symbols before releasing a partial snapshot, None waits indefinitely
+        self.bar_size = bar_size
 
         #  Data Storage
         self.next_valid_order_id = None
         self.is_valid_contract = None
         self.reqId_to_symbol_map = {}
         self.market_data_top_book = {}
-        self.current_bar_data = {}
+        self.contract_requests : Dict[int, Future] = {} # Outstanding contract details requests keyed by reqId
+        self.contract_details : Dict[int, List[ContractDetails]] = {}
+        self.current_bar_data : Dict[int, Dict[str, BarData]] = {} # Pending bars keyed by bucket timestamp
+        self.bar_received : Dict[int, Dict[str, int]] = {} # Monotonic arrival of each symbol's bar in each bucket
+        self.last_bar_time = None
+        self.late_bars = 0
 
         # Event Handling
         self.connected_event = threading.Event()
         self.valid_id_event = threading.Event()
         self.validate_contract_event = threading.Event()
 
+        # Id Allocation
+        self.id_allocator = IdAllocator()
+
         # Thread Locks
-        self.next_valid_order_id_lock = threading.Lock()
+        self.bar_data_lock = threading.Lock()
+
+        # Timers
+        self.bar_timers : Dict[int, threading.Timer] = {}
 
     def error(self, reqId: int, errorCode: int, errorString: str, advancedOrderRejectJson: str=None):
         super().error(reqId, errorCode, errorString)
@@ -42,6 +61,9 @@ class DataApp(EWrapper, EClient):
             self.is_valid_contract = False
             self.validate_contract_event.set()
 
+        if reqId in self.contract_requests: # any error on a batched contract request fails it, e.g. 200, 321, 354, 10168
+            self._resolve_contract_request(reqId, [])
+
     #### wrapper function to signifying completion of successful connection.      
     def connectAck(self):
         super().connectAck()
@@ -56,31 +78,89 @@ class DataApp(EWrapper, EClient):
     #### wrapper function for reqIds() -> This function manages the Order ID.
     def nextValidId(self, orderId: int):
         super().nextValidId(orderId)
-        with self.next_valid_order_id_lock:
-            self.next_valid_order_id = orderId
+        self.next_valid_order_id = orderId
+        self.id_allocator.sync(orderId)
         
         self.logger.info(f"Next Valid Id {self.next_valid_order_id}")
         self.valid_id_event.set()
 
     def contractDetails(self, reqId: int, contractDetails: ContractDetails):
         self.is_valid_contract = True
+        self.contract_details.setdefault(reqId, []).append(contractDetails)
 
     def contractDetailsEnd(self, reqId: int):
         self.validate_contract_event.set()
+        self._resolve_contract_request(reqId, self.contract_details.pop(reqId, []))
+
+    def _resolve_contract_request(self, reqId: int, contract_details: List[ContractDetails]):
+        """ Completes the future of a batched contract details request, an empty list signals an invalid contract. """
+        self.contract_details.pop(reqId, None)
+        future = self.contract_requests.get(reqId)
+        if future and not future.done():
+            future.set_result(contract_details)
     
     def realtimeBar(self, reqId: int, time: int, open: float, high: float, low: float, close: float, volume: Decimal, wap: float, count: int):
         super().realtimeBar(reqId, time, open, high, low, close, volume, wap, count)
-        """ Updates the real time 5 seconds bars """
+        """ Updates the real time 5 seconds bars, aligned on the bar's time bucket. """
         symbol = self.reqId_to_symbol_map[reqId]
+        bar_time = time - (time % self.bar_size)
 
         new_bar_entry = BarData(time, open, high, low, close, float(volume))
-        self.current_bar_data[symbol] = new_bar_entry
+
+        if self.recorder:
+            self.recorder.record(symbol, time, open, high, low, close, float(volume))
+
+        with self.bar_data_lock:
+            # Snapshot for this bucket already released, bar is dropped
+            if self.last_bar_time is not None and bar_time <= self.last_bar_time:
+                self.late_bars += 1
+                self.logger.warning(f"Late bar for {symbol} at {bar_time}, {self.late_bars} late bars total.")
+                return
+
+            if bar_time not in self.current_bar_data:
+                self.current_bar_data[bar_time] = {}
+                self.bar_received[bar_time] = {}
+                self._start_bar_timer(bar_time)
+
+            self.current_bar_data[bar_time][symbol] = new_bar_entry
+            if latency_tracker.enabled:
+                self.bar_received[bar_time][symbol] = latency_tracker.now()
+
+            if len(self.current_bar_data[bar_time]) == len(self.reqId_to_symbol_map):
+                self._release_bars(bar_time)
+
+    def _start_bar_timer(self, bar_time: int):
+        """ Starts the completion deadline for a new bar bucket. """
+        if self.bar_timeout is None:
+            return
         
-        if len(self.current_bar_data) == len(self.reqId_to_symbol_map):
-            market_data_event = MarketEvent(timestamp=time, data=self.current_bar_data)
+        timer = threading.Timer(self.bar_timeout, self._on_bar_timeout, args=(bar_time,))
+        timer.daemon = True
+        self.bar_timers[bar_time] = timer
+        timer.start()
+
+    def _on_bar_timeout(self, bar_time: int):
+        """ Releases a partial snapshot if the bucket is still pending once its deadline passes. """
+        with self.bar_data_lock:
+            if bar_time in self.current_bar_data:
+                missing = set(self.reqId_to_symbol_map.values()) - set(self.current_bar_data[bar_time].keys())
+                self.logger.warning(f"Bar timeout at {bar_time}, releasing partial snapshot. Missing : {sorted(missing)}")
+                self._release_bars(bar_time)
+
+    def _release_bars(self, bar_time: int):
+        """ Queues a MarketEvent for every pending bucket up to and including bar_time, in time order. Caller must hold bar_data_lock. """
+        for pending_time in sorted(t for t in self.current_bar_data if t <= bar_time):
+            data = self.current_bar_data.pop(pending_time)
+            timer = self.bar_timers.pop(pending_time, None)
+            if timer:
+                timer.cancel()
+
+            market_data_event = MarketEvent(timestamp=pending_time, data=data)
+            for received_symbol, received_ns in self.bar_received.pop(pending_time, {}).items():
+                latency_tracker.mark_market(received_symbol, received_ns)
             self.event_queue.put(market_data_event)
-            # Reset current bar data for the next bar
-            self.current_bar_data = {}
+
+        self.last_bar_time = bar_time
 
     
     # def tickPrice(self, reqId: int, tickType, price: float, attrib):
@@ -0,0 +1,33 @@
+import itertools
+import threading
+
+class IdAllocator:
+    """
+    Hands out IB request and order ids without taking a lock on the hot path.
+
+    Ids are drawn from an itertools.count, whose __next__ is atomic under the GIL, so every caller draws from one
+    shared counter instead of reserving blocks per thread. Resyncs from nextValidId only move the counter forward and
+    skip resync_gap ids, so a caller still holding the previous counter cannot collide with ids issued by the new one.
+    """
+    def __init__(self, resync_gap: int = 100):
+        if not isinstance(resync_gap, int) or resync_gap <= 0:
+            raise ValueError("'resync_gap' must be a positive integer.")
+
+        self.resync_gap = resync_gap
+        self._counter = None
+        self._sync_lock = threading.Lock() # only taken on resync
+
+    def sync(self, next_valid_id: int):
+        """ Resyncs on the id returned by IB's nextValidId, ids never move backwards. """
+        with self._sync_lock:
+            if self._counter is None:
+                self._counter = itertools.count(next_valid_id)
+            else:
+                current_id = next(self._counter)
+                self._counter = itertools.count(max(next_valid_id, current_id + self.resync_gap))
+
+    def next_id(self) -> int:
+        counter = self._counter
+        if counter is None:
+            raise RuntimeError("No valid id received from IB, ids cannot be allocated before nextValidId.")
+        return next(counter)
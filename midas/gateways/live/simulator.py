@@ -0,0 +1,364 @@
+import time
+import queue
+import random
+import logging
+import threading
+import pandas as pd
+from decimal import Decimal
+from datetime import datetime
+from ibapi.order import Order
+from ibapi.common import TickAttrib
+from ibapi.order_state import OrderState
+from ibapi.contract import Contract, ContractDetails
+from typing import Callable, Dict, Iterable, List, Tuple
+
+Bar = Tuple[float, float, float, float, float] # open, high, low, close, volume
+
+class IBGatewaySimulator:
+    """
+    In-process stand-in for TWS/Gateway, speaks the EClient request and EWrapper callback surface.
+
+    Attached apps (DataApp, BrokerApp) have their EClient request methods routed to the simulator. Callbacks are
+    queued per app and invoked from the app's own run() thread, as the EReader/decoder would. Bars are replayed
+    from a recorded or synthetic source at a configurable rate, orders are acknowledged and filled against the
+    replayed prices and account updates are streamed after every fill.
+    """
+    def __init__(self, bars: Iterable[Tuple[int, Dict[str, Bar]]], bar_interval: float = 0, capital: float = 100000,
+                 commission: float = 0, spread: float = 0.01, account: str = "DU0000000", next_valid_id: int = 1,
+                 valid_symbols: List[str] = None, logger: logging.Logger = None):
+        """
+        Args:
+            bars (Iterable) : (timestamp, {symbol : (open, high, low, close, volume)}) in time order, see synthetic_bars and bars_from_dataframe.
+            bar_interval (float) : Wall clock seconds between replayed bars, 0 replays at full speed.
+            capital (float) : Starting account value.
+            commission (float) : Commission per unit filled.
+            spread (float) : Bid/ask spread around the close used for quote ticks.
+            valid_symbols (List[str]) : Symbols with contract details, None accepts every contract.
+        """
+        self.bars = bars
+        self.bar_interval = bar_interval
+        self.capital = capital
+        self.commission = commission
+        self.spread = spread
+        self.account = account
+        self.valid_symbols = valid_symbols
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._callbacks : Dict[object, queue.Queue] = {}
+        self._connected : Dict[object, bool] = {}
+        self._next_valid_id = next_valid_id
+
+        # Market data
+        self.last_prices : Dict[str, float] = {}
+        self.bar_subscriptions : Dict[int, Tuple[object, str]] = {} # reqId -> (app, symbol)
+        self.tick_subscriptions : Dict[int, Tuple[object, str]] = {}
+        self.bars_replayed = 0
+        self.replay_done = threading.Event()
+        self._stop = threading.Event()
+        self._replay_thread : threading.Thread = None
+
+        # Orders/Account
+        self.open_orders : Dict[int, Tuple[object, Contract, Order]] = {}
+        self.positions : Dict[str, dict] = {} # symbol -> {contract, position, avg_cost, multiplier}
+        self.realized_pnl = 0.0
+        self.fees = 0.0
+        self.account_subscribers : List[object] = []
+        self.orders_filled = 0
+
+    # -- Data sources --
+    @staticmethod
+    def synthetic_bars(symbols: List[str], start: int, count: int, bar_size: int = 5, start_price: float = 100, volatility: float = 0.001, seed: int = None):
+        """ Random walk bars for every symbol, aligned on bar_size second buckets. """
+        rng = random.Random(seed)
+        prices = {symbol: start_price for symbol in symbols}
+        start = start - (start % bar_size)
+
+        for i in range(count):
+            data = {}
+            for symbol in symbols:
+                open = prices[symbol]
+                close = max(0.01, open * (1 + rng.gauss(0, volatility)))
+                high = max(open, close) * (1 + abs(rng.gauss(0, volatility / 2)))
+                low = min(open, close) * (1 - abs(rng.gauss(0, volatility / 2)))
+                data[symbol] = (round(open, 4), round(high, 4), round(low, 4), round(close, 4), float(rng.randint(1, 1000)))
+                prices[symbol] = close
+            yield start + i * bar_size, data
+
+    @staticmethod
+    def bars_from_dataframe(data: pd.DataFrame):
+        """ Recorded bars in the backtest format, columns timestamp (unix), symbol, open, high, low, close, volume. """
+        data = data.sort_values(by='timestamp', kind='stable')
+        for timestamp, group in data.groupby('timestamp', sort=True):
+            yield int(timestamp), {row.symbol: (row.open, row.high, row.low, row.close, row.volume) for row in group.itertuples(index=False)}
+
+    # -- Attach --
+    def attach(self, app):
+        """ Routes the app's EClient requests to the simulator. """
+        self._callbacks[app] = queue.Queue()
+        self._connected[app] = False
+
+        app.connect = lambda host, port, clientId: self._connect(app)
+        app.run = lambda: self._run(app)
+        app.disconnect = lambda: self._disconnect(app)
+        app.isConnected = lambda: self._connected[app]
+        app.reqIds = lambda numIds: self._reqIds(app)
+        app.reqContractDetails = lambda reqId, contract: self._reqContractDetails(app, reqId, contract)
+        app.reqRealTimeBars = lambda reqId, contract, *args, **kwargs: self._subscribe(self.bar_subscriptions, app, reqId, contract)
+        app.cancelRealTimeBars = lambda reqId: self.bar_subscriptions.pop(reqId, None)
+        app.reqMktData = lambda reqId, contract, *args, **kwargs: self._subscribe(self.tick_subscriptions, app, reqId, contract)
+        app.cancelMktData = lambda reqId: self.tick_subscriptions.pop(reqId, None)
+        app.placeOrder = lambda orderId, contract, order: self._placeOrder(app, orderId, contract, order)
+        app.cancelOrder = lambda orderId, *args: self._cancelOrder(app, orderId)
+        app.reqAccountUpdates = lambda subscribe, acctCode: self._reqAccountUpdates(app, subscribe)
+        app.reqOpenOrders = lambda: self._reqOpenOrders(app)
+        return app
+
+    def _send(self, app, callback: Callable, *args):
+        """ Queues a callback to be invoked on the app's run() thread. """
+        self._callbacks[app].put((callback, args))
+
+    # -- Connection --
+    def _connect(self, app):
+        self._connected[app] = True
+        self._send(app, app.connectAck)
+        self._send(app, app.nextValidId, self._next_valid_id)
+
+    def _run(self, app):
+        callbacks = self._callbacks[app]
+        while True:
+            item = callbacks.get()
+            if item is None:
+                callbacks.task_done()
+                break
+            callback, args = item
+            try:
+                callback(*args)
+            except Exception as e:
+                self.logger.error(f"Simulator callback {callback.__name__} raised : {e}")
+            finally:
+                callbacks.task_done()
+
+    def wait_idle(self):
+        """ Blocks until every queued callback has been invoked by the connected apps. """
+        for app, callbacks in self._callbacks.items():
+            if self._connected[app]:
+                callbacks.join()
+
+    def _disconnect(self, app):
+        if self._connected.get(app):
+            self._connected[app] = False
+            self._send(app, app.connectionClosed)
+            self._callbacks[app].put(None)
+
+    def _reqIds(self, app):
+        with self._lock:
+            self._send(app, app.nextValidId, self._next_valid_id)
+
+    # -- Contracts --
+    def _reqContractDetails(self, app, reqId: int, contract: Contract):
+        if self.valid_symbols is not None and contract.symbol not in self.valid_symbols:
+            self._send(app, app.error, reqId, 200, "No security definition has been found for the request")
+            return
+
+        details = ContractDetails()
+        details.contract = contract
+        self._send(app, app.contractDetails, reqId, details)
+        self._send(app, app.contractDetailsEnd, reqId)
+
+    # -- Market Data --
+    def _subscribe(self, subscriptions: dict, app, reqId: int, contract: Contract):
+        with self._lock:
+            subscriptions[reqId] = (app, contract.symbol)
+
+    def start(self):
+        """ Starts replaying bars to the current subscriptions. """
+        self._stop.clear()
+        self.replay_done.clear()
+        self._replay_thread = threading.Thread(target=self._replay, daemon=True)
+        self._replay_thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._replay_thread:
+            self._replay_thread.join()
+
+    def _replay(self):
+        for timestamp, bars in self.bars:
+            if self._stop.is_set():
+                break
+
+            with self._lock:
+                bar_subscriptions = list(self.bar_subscriptions.items())
+                tick_subscriptions = list(self.tick_subscriptions.items())
+                for symbol, bar in bars.items():
+                    self.last_prices[symbol] = bar[3]
+
+            for reqId, (app, symbol) in bar_subscriptions:
+                if symbol in bars:
+                    open, high, low, close, volume = bars[symbol]
+                    self._send(app, app.realtimeBar, reqId, timestamp, open, high, low, close, Decimal(str(volume)), (high + low + close) / 3, 1)
+
+            for reqId, (app, symbol) in tick_subscriptions:
+                if symbol in bars:
+                    close, volume = bars[symbol][3], bars[symbol][4]
+                    self._send(app, app.tickPrice, reqId, 1, close - self.spread / 2, TickAttrib())
+                    self._send(app, app.tickPrice, reqId, 2, close + self.spread / 2, TickAttrib())
+                    self._send(app, app.tickSize, reqId, 0, Decimal(str(volume)))
+                    self._send(app, app.tickSize, reqId, 3, Decimal(str(volume)))
+
+            self._check_resting_orders(bars)
+            self.bars_replayed += 1
+
+            if self.bar_interval:
+                time.sleep(self.bar_interval)
+
+        self.replay_done.set()
+
+    # -- Orders --
+    def _placeOrder(self, app, orderId: int, contract: Contract, order: Order):
+        with self._lock:
+            self._next_valid_id = max(self._next_valid_id, orderId + 1)
+            self.open_orders[orderId] = (app, contract, order)
+
+        order_state = OrderState()
+        order_state.status = 'Submitted'
+        self._send(app, app.openOrder, orderId, contract, order, order_state)
+        self._order_status(app, orderId, 'Submitted', 0, order.totalQuantity, 0)
+
+        price = self.last_prices.get(contract.symbol)
+        if price is None:
+            return
+
+        fill_price = self._marketable_price(order, price, price, price)
+        if fill_price is not None:
+            self._fill(orderId, fill_price)
+
+    def _cancelOrder(self, app, orderId: int):
+        with self._lock:
+            order = self.open_orders.pop(orderId, None)
+
+        if order:
+            self._order_status(app, orderId, 'Cancelled', 0, order[2].totalQuantity, 0)
+
+    def _reqOpenOrders(self, app):
+        for orderId, (order_app, contract, order) in list(self.open_orders.items()):
+            order_state = OrderState()
+            order_state.status = 'Submitted'
+            self._send(app, app.openOrder, orderId, contract, order, order_state)
+        self._send(app, app.openOrderEnd)
+
+    def _marketable_price(self, order: Order, high: float, low: float, last: float):
+        """ Fill price of the order against a bar's range, None if it does not trigger. """
+        if order.orderType == 'MKT':
+            return last
+        elif order.orderType == 'LMT':
+            if order.action == 'BUY' and low <= order.lmtPrice:
+                return min(order.lmtPrice, last)
+            elif order.action == 'SELL' and high >= order.lmtPrice:
+                return max(order.lmtPrice, last)
+        elif order.orderType == 'STP':
+            if order.action == 'BUY' and high >= order.auxPrice:
+                return max(order.auxPrice, last)
+            elif order.action == 'SELL' and low <= order.auxPrice:
+                return min(order.auxPrice, last)
+        return None
+
+    def _check_resting_orders(self, bars: Dict[str, Bar]):
+        for orderId, (app, contract, order) in list(self.open_orders.items()):
+            if contract.symbol in bars:
+                open, high, low, close, volume = bars[contract.symbol]
+                fill_price = self._marketable_price(order, high, low, close)
+                if fill_price is not None:
+                    self._fill(orderId, fill_price)
+
+    def _fill(self, orderId: int, price: float):
+        with self._lock:
+            order_data = self.open_orders.pop(orderId, None)
+            if order_data is None:
+                return
+
+            app, contract, order = order_data
+            quantity = float(order.totalQuantity)
+            signed_quantity = quantity if order.action == 'BUY' else -quantity
+            self._update_position(contract, signed_quantity, price)
+            self.fees += quantity * self.commission
+            self.orders_filled += 1
+
+        self._order_status(app, orderId, 'Filled', quantity, 0, price)
+        self._stream_account_updates(contract.symbol)
+
+    def _order_status(self, app, orderId: int, status: str, filled: float, remaining: float, price: float):
+        self._send(app, app.orderStatus, orderId, status, Decimal(str(filled)), Decimal(str(remaining)), price, orderId, 0, price, 0, "", 0.0)
+
+    # -- Account --
+    def _update_position(self, contract: Contract, quantity: float, price: float):
+        """ Caller must hold the lock. avg_cost includes the multiplier, as reported by IB. """
+        multiplier = float(contract.multiplier or 1)
+        position = self.positions.setdefault(contract.symbol, {'contract': contract, 'position': 0.0, 'avg_cost': 0.0, 'multiplier': multiplier})
+        current = position['position']
+        net = current + quantity
+
+        if current == 0 or (current > 0) == (quantity > 0): # opening or adding
+            position['avg_cost'] = (position['avg_cost'] * abs(current) + price * multiplier * abs(quantity)) / abs(net)
+        else: # reducing, closing or flipping
+            closed = min(abs(quantity), abs(current))
+            direction = 1 if current > 0 else -1
+            self.realized_pnl += (price * multiplier - position['avg_cost']) * closed * direction
+            if abs(quantity) > abs(current):
+                position['avg_cost'] = price * multiplier
+
+        position['position'] = net
+
+    def _unrealized_pnl(self) -> float:
+        unrealized = 0.0
+        for symbol, position in self.positions.items():
+            price = self.last_prices.get(symbol)
+            if price is not None and position['position'] != 0:
+                unrealized += (price * position['multiplier'] - position['avg_cost']) * position['position']
+        return unrealized
+
+    def account_values(self) -> Dict[str, float]:
+        with self._lock:
+            unrealized = self._unrealized_pnl()
+            net_liquidation = self.capital + self.realized_pnl + unrealized - self.fees
+            return {
+                'FullAvailableFunds': net_liquidation,
+                'FullInitMarginReq': 0.0,
+                'NetLiquidation': net_liquidation,
+                'UnrealizedPnL': unrealized,
+                'FullMaintMarginReq': 0.0,
+                'ExcessLiquidity': net_liquidation,
+                'BuyingPower': net_liquidation,
+                'FuturesPNL': 0.0,
+                'TotalCashBalance': self.capital + self.realized_pnl - self.fees,
+            }
+
+    def _reqAccountUpdates(self, app, subscribe: bool):
+        if not subscribe:
+            if app in self.account_subscribers:
+                self.account_subscribers.remove(app)
+            return
+
+        self.account_subscribers.append(app)
+        self._send_account(app, list(self.positions.keys()))
+        self._send(app, app.accountDownloadEnd, self.account)
+
+    def _stream_account_updates(self, symbol: str):
+        for app in list(self.account_subscribers):
+            self._send_account(app, [symbol])
+
+    def _send_account(self, app, symbols: List[str]):
+        for key, value in self.account_values().items():
+            self._send(app, app.updateAccountValue, key, str(value), 'USD', self.account)
+        self._send(app, app.updateAccountValue, 'Currency', 'USD', 'USD', self.account)
+
+        for symbol in symbols:
+            position = self.positions[symbol]
+            price = self.last_prices.get(symbol, 0.0)
+            market_value = price * position['multiplier'] * position['position']
+            unrealized = (price * position['multiplier'] - position['avg_cost']) * position['position']
+            self._send(app, app.updatePortfolio, position['contract'], Decimal(str(position['position'])), price, market_value,
+                       position['avg_cost'], unrealized, self.realized_pnl, self.account)
+
+        self._send(app, app.updateAccountTime, datetime.now().strftime('%H:%M'))
@@ -10,6 +10,7 @@ class OrderBook:
 
         self.book : Dict[str,Union[BarData, QuoteData]] = {} # Example: {ticker : {'data': {Ask:{}, Bid:{}}, 'last_updated': timestamp}, ...}
         self.last_updated = None
+        self.updated_tickers = [] # tickers in the most recent market event
         self.data_type = data_type
 
     def on_market_data(self, event: MarketEvent):
@@ -40,6 +41,7 @@ class OrderBook:
             elif isinstance(market_data, QuoteData):
                 self._insert_or_update_quote(ticker, market_data, timestamp)
 
+        self.updated_tickers = list(data.keys())
         self.last_updated = timestamp
 
     def _insert_bar(self, ticker: str, data: MarketData):
@@ -76,6 +78,10 @@ class OrderBook:
                 prices[key] = (data.ask + data.bid) / 2 
         return prices
         
+    def updated_prices(self) -> dict:
+        """ Current prices of the tickers in the most recent market event only. """
+        return {ticker: self.current_price(ticker) for ticker in self.updated_tickers}
+        
     def _modify(self):
         # Changing an old bar or order in the book
         pass
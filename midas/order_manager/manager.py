@@ -6,6 +6,7 @@ from typing import Dict,List, Union
 
 from midas.order_book import OrderBook
 from midas.portfolio import PortfolioServer
+from midas.utils.latency import latency_tracker
 from midas.symbols.symbols import Symbol, Future, Equity
 from midas.events import  (SignalEvent, OrderEvent,  
                            LimitOrder, MarketOrder, StopLoss, 
@@ -142,6 +143,7 @@ class OrderManager:
         """
         try:
             order_event = OrderEvent(timestamp=timestamp, trade_id=trade_id, leg_id=leg_id, action=action, contract=contract, order=order)
+            latency_tracker.mark_order(trade_id)
             self._event_queue.put(order_event)
         except (ValueError, TypeError) as e:
             raise RuntimeError(f"Failed to create or queue OrderEvent due to input error: {e}") from e
@@ -0,0 +1,148 @@
+import numpy as np
+from typing import Dict, List, Optional
+
+class BatchStatistics:
+    """
+    PerformanceStatistics computed for many runs at once.
+
+    Equity curves are a 2-D array of daily closes, one run per row, so each statistic is a single vectorized pass
+    along the time axis and returns one value per run. Trade returns are ragged, one array per run, and are flattened
+    once and reduced per run with np.bincount. Inputs are validated once by summary, the individual statistics assume
+    validated arrays. Values are rounded the way PerformanceStatistics rounds them.
+    """
+    @staticmethod
+    def validate_equity_curves(equity_curves: np.ndarray, name: str = 'equity_curves') -> np.ndarray:
+        if not isinstance(equity_curves, np.ndarray):
+            raise TypeError(f"{name} must be a numpy array")
+        if equity_curves.ndim != 2:
+            raise ValueError(f"'{name}' must be a 2-D array of runs by time.")
+        if equity_curves.shape[1] < 2:
+            raise ValueError(f"'{name}' must hold at least two values per run.")
+        return equity_curves.astype(np.float64, copy=False)
+
+    @staticmethod
+    def validate_trade_returns(trade_returns: List[np.ndarray], runs: int):
+        if not isinstance(trade_returns, (list, tuple)) or not all(isinstance(returns, np.ndarray) for returns in trade_returns):
+            raise TypeError("trade_returns must be a list of numpy arrays")
+        if len(trade_returns) != runs:
+            raise ValueError("'trade_returns' must hold one array per run.")
+
+    # -- General --
+    @staticmethod
+    def daily_return(equity_curves: np.ndarray) -> np.ndarray:
+        """ Daily returns of every run, in decimal format. """
+        return np.around(np.diff(equity_curves, axis=1) / equity_curves[:, :-1], decimals=4)
+
+    @staticmethod
+    def cumulative_return(equity_curves: np.ndarray) -> np.ndarray:
+        """ Cumulative returns of every run, in decimal format. """
+        daily_returns = np.diff(equity_curves, axis=1) / equity_curves[:, :-1]
+        return np.around(np.cumprod(1 + daily_returns, axis=1) - 1, decimals=4)
+
+    @staticmethod
+    def total_return(equity_curves: np.ndarray) -> np.ndarray:
+        return BatchStatistics.cumulative_return(equity_curves)[:, -1]
+
+    @staticmethod
+    def drawdown(equity_curves: np.ndarray) -> np.ndarray:
+        rolling_max = np.maximum.accumulate(equity_curves, axis=1)
+        return np.around((equity_curves - rolling_max) / rolling_max, decimals=4)
+
+    @staticmethod
+    def max_drawdown(equity_curves: np.ndarray) -> np.ndarray:
+        return BatchStatistics.drawdown(equity_curves).min(axis=1)
+
+    @staticmethod
+    def annual_standard_deviation(equity_curves: np.ndarray) -> np.ndarray:
+        return np.around(np.std(equity_curves, axis=1, ddof=1) * np.sqrt(252), decimals=4)
+
+    # -- Comparables --
+    @staticmethod
+    def sharpe_ratio(equity_curves: np.ndarray, risk_free_rate: float = 0.04) -> np.ndarray:
+        excess_returns = BatchStatistics.daily_return(equity_curves) - risk_free_rate / 252
+        std = np.std(excess_returns, axis=1, ddof=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = np.mean(excess_returns, axis=1) / std
+        return np.where(std != 0, np.around(sharpe, decimals=4), 0.0)
+
+    @staticmethod
+    def sortino_ratio(trade_returns: List[np.ndarray], target_return: float = 0) -> np.ndarray:
+        """ Sortino ratio of the trade returns (gain/loss) of every run, 0 where a run has no downside deviation. """
+        runs = len(trade_returns)
+        counts = np.array([len(returns) for returns in trade_returns], dtype=np.int64)
+        returns = np.concatenate(trade_returns).astype(np.float64) if runs else np.empty(0)
+        run_ids = np.repeat(np.arange(runs), counts)
+
+        # Mean of all trade returns
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.bincount(run_ids, weights=returns, minlength=runs) / counts
+
+            # Sample deviation of the returns below target, around their own mean
+            below = returns < target_return
+            below_counts = np.bincount(run_ids[below], minlength=runs)
+            below_mean = np.bincount(run_ids[below], weights=returns[below], minlength=runs) / below_counts
+            squares = np.bincount(run_ids[below], weights=(returns[below] - below_mean[run_ids[below]]) ** 2, minlength=runs)
+            downside_deviation = np.sqrt(squares / (below_counts - 1))
+
+            sortino = (mean - target_return) / downside_deviation
+        return np.where((below_counts > 1) & (downside_deviation > 0), np.around(sortino, decimals=4), 0.0)
+
+    @staticmethod
+    def beta(portfolio_equity_curves: np.ndarray, benchmark_equity_curve: np.ndarray) -> np.ndarray:
+        """ Beta of every run, the benchmark is a single curve shared by all runs or one curve per run. """
+        portfolio_returns = BatchStatistics.daily_return(portfolio_equity_curves)
+        benchmark_returns = BatchStatistics.daily_return(np.atleast_2d(benchmark_equity_curve))
+
+        portfolio_deviation = portfolio_returns - portfolio_returns.mean(axis=1, keepdims=True)
+        benchmark_deviation = benchmark_returns - benchmark_returns.mean(axis=1, keepdims=True)
+        covariance = np.sum(portfolio_deviation * benchmark_deviation, axis=1)
+        variance = np.sum(benchmark_deviation ** 2, axis=1) # the ddof of both cancels out
+        return np.around(covariance / variance, decimals=4)
+
+    @staticmethod
+    def alpha(portfolio_equity_curves: np.ndarray, benchmark_equity_curve: np.ndarray, risk_free_rate: float) -> np.ndarray:
+        """ Annualized alpha of every run against the benchmark. """
+        annualized_portfolio_return = BatchStatistics.daily_return(portfolio_equity_curves).mean(axis=1) * 252
+        annualized_benchmark_return = BatchStatistics.daily_return(np.atleast_2d(benchmark_equity_curve)).mean(axis=1) * 252
+        beta_value = BatchStatistics.beta(portfolio_equity_curves, benchmark_equity_curve)
+        return np.around(annualized_portfolio_return - (risk_free_rate + beta_value * (annualized_benchmark_return - risk_free_rate)), decimals=4)
+
+    # -- Summary --
+    @staticmethod
+    def summary(equity_curves: np.ndarray, benchmark_equity_curve: Optional[np.ndarray] = None, trade_returns: Optional[List[np.ndarray]] = None, risk_free_rate: float = 0.04) -> Dict[str, np.ndarray]:
+        """
+        Validates the inputs once and computes the statistics of every run.
+
+        Args:
+            equity_curves (np.ndarray) : Daily equity values, one run per row.
+            benchmark_equity_curve (np.ndarray) : Daily benchmark closes aligned with the equity curves, 1-D or one row per run.
+            trade_returns (List[np.ndarray]) : Trade returns (gain/loss) of every run.
+            risk_free_rate (float) : Annual risk-free rate.
+
+        Returns:
+            Dict[str, np.ndarray] : Statistic name to an array with one value per run.
+        """
+        equity_curves = BatchStatistics.validate_equity_curves(equity_curves)
+        if not isinstance(risk_free_rate, (float, int)):
+            raise TypeError("risk_free_rate must be a float or int.")
+
+        stats = {
+            'total_return': BatchStatistics.total_return(equity_curves),
+            'max_drawdown': BatchStatistics.max_drawdown(equity_curves),
+            'annual_standard_deviation': BatchStatistics.annual_standard_deviation(equity_curves),
+            'ending_equity': equity_curves[:, -1],
+            'sharpe_ratio': BatchStatistics.sharpe_ratio(equity_curves, risk_free_rate),
+        }
+
+        if trade_returns is not None:
+            BatchStatistics.validate_trade_returns(trade_returns, len(equity_curves))
+            stats['sortino_ratio'] = BatchStatistics.sortino_ratio(trade_returns)
+
+        if benchmark_equity_curve is not None:
+            benchmark = BatchStatistics.validate_equity_curves(np.atleast_2d(benchmark_equity_curve) if isinstance(benchmark_equity_curve, np.ndarray) else benchmark_equity_curve, 'benchmark_equity_curve')
+            if benchmark.shape[1] != equity_curves.shape[1] or len(benchmark) not in (1, len(equity_curves)):
+                raise ValueError("'benchmark_equity_curve' must be aligned with the equity curves.")
+            stats['alpha'] = BatchStatistics.alpha(equity_curves, benchmark, risk_free_rate)
+            stats['beta'] = BatchStatistics.beta(equity_curves, benchmark)
+
+        return stats
@@ -0,0 +1,98 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+
+SECONDS_PER_DAY = 86400
+
+def daily_closes(timestamps: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Last value of every UTC day, keyed by int64 days since the epoch.
+
+    Args:
+        timestamps (np.ndarray) : Unix timestamps in seconds, in increasing order.
+        values (np.ndarray) : Value at each timestamp.
+    """
+    days = np.asarray(timestamps, dtype=np.int64) // SECONDS_PER_DAY
+    last = np.flatnonzero(np.r_[days[1:] != days[:-1], True]) if len(days) else np.empty(0, dtype=np.int64)
+    return days[last], np.asarray(values, dtype=np.float64)[last]
+
+def align_days(days: np.ndarray, values: np.ndarray, other_days: np.ndarray, other_values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Values of both daily series on the days they share, matched with np.searchsorted on the sorted day keys. """
+    index = np.searchsorted(other_days, days)
+    matched = index < len(other_days)
+    matched[matched] = other_days[index[matched]] == days[matched]
+    return values[matched], other_values[index[matched]]
+
+class BenchmarkCache:
+    """
+    Benchmark closes cached on disk and in process, keyed by the benchmark symbols and date range.
+
+    A series is fetched from the database once, converted to sorted unix timestamps and closes and reduced to daily
+    closes. The arrays are kept in memory for every PerformanceManager of the process, so a parameter sweep fetches
+    and aligns a benchmark once, and when cache_dir is set they are stored as .npz files reused by later processes.
+    """
+    _memory : Dict[tuple, Dict[str, np.ndarray]] = {} # shared by all instances of the process
+
+    def __init__(self, database, cache_dir: str = None):
+        """
+        Args:
+            database (DatabaseClient) : Client the benchmark data is fetched from on a miss.
+            cache_dir (str) : Directory of the on disk cache, None keeps the cache in memory only.
+        """
+        self.database = database
+        self.cache_dir = cache_dir
+
+    @classmethod
+    def clear(cls):
+        """ Empties the in process cache. """
+        cls._memory.clear()
+
+    def series(self, symbols: List[str], start: str, end: str) -> Tuple[np.ndarray, np.ndarray]:
+        """ Unix timestamps and closes of the benchmark, in increasing order. """
+        arrays = self._get(symbols, start, end)
+        return arrays['timestamps'], arrays['closes']
+
+    def daily(self, symbols: List[str], start: str, end: str) -> Tuple[np.ndarray, np.ndarray]:
+        """ Int64 day keys and daily closes of the benchmark. """
+        arrays = self._get(symbols, start, end)
+        return arrays['days'], arrays['daily_closes']
+
+    def _get(self, symbols: List[str], start: str, end: str) -> Dict[str, np.ndarray]:
+        key = (tuple(symbols) if isinstance(symbols, (list, tuple)) else (symbols,), str(start), str(end))
+        if key in self._memory:
+            return self._memory[key]
+
+        path = self._path(key)
+        if path and os.path.exists(path):
+            with np.load(path) as file:
+                arrays = {name: file[name] for name in file.files}
+        else:
+            arrays = self._fetch(symbols, start, end)
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                np.savez(path, **arrays)
+
+        self._memory[key] = arrays
+        return arrays
+
+    def _fetch(self, symbols: List[str], start: str, end: str) -> Dict[str, np.ndarray]:
+        data = pd.DataFrame(self.database.get_benchmark_data(symbols, start, end), columns=['timestamp', 'close'])
+
+        timestamps = data['timestamp']
+        if not pd.api.types.is_integer_dtype(timestamps): # unix seconds or date strings
+            timestamps = pd.to_datetime(timestamps, utc=True).astype('int64') // 10**9
+        timestamps = timestamps.to_numpy(dtype=np.int64)
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, closes = timestamps[order], data['close'].to_numpy(dtype=np.float64)[order]
+
+        days, closes_daily = daily_closes(timestamps, closes)
+        return {'timestamps': timestamps, 'closes': closes, 'days': days, 'daily_closes': closes_daily}
+
+    def _path(self, key: tuple) -> str:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha1(json.dumps(key).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"benchmark_{digest}.npz")
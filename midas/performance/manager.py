@@ -1,11 +1,17 @@
+import os
 import json  
+import zlib
 import logging
+import requests
 import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
-from typing import List, Dict, Union, TypedDict
+from typing import Iterator, List, Dict, Tuple, Union, TypedDict
 from midas_database import DatabaseClient
 
+from .benchmark import BenchmarkCache, align_days, daily_closes
+from .online import OnlineStatistics
+from .recorder import ColumnRecorder, NUMBER
 from .statistics import PerformanceStatistics
 from midas.account_data import EquityDetails, Trade
 from midas.events import SignalEvent, ExecutionDetails
@@ -22,42 +28,155 @@ from midas.events import SignalEvent, ExecutionDetails
 #     action: str
 #     fees: float
 
+TRADE_COLUMNS = {'timestamp': NUMBER, 'trade_id': np.int64, 'leg_id': np.int64, 'ticker': object, 'quantity': NUMBER,
+                 'price': np.float64, 'cost': np.float64, 'action': 'U6', 'fees': np.float64} # fixed width actions compare in C
+EQUITY_COLUMNS = {'timestamp': NUMBER, 'equity_value': np.float64}
+EXPORT_FORMATS = ['parquet', 'feather']
+
 class Backtest:
-    def __init__(self, database_client:DatabaseClient):
+    """
+    Results of a backtest. Timeseries statistics and trades are kept as the tables they are computed in, records are
+    only built for the payload posted to the database.
+
+    Args:
+        database_client (DatabaseClient) : Client the backtest is posted through when no upload_url is set.
+        upload_url (str) : Backtest endpoint the payload is streamed to gzip compressed, records built a batch at a time.
+        api_key (str) : Key sent with the streamed upload.
+    """
+    def __init__(self, database_client:DatabaseClient, upload_url: str = None, api_key: str = None):
         self.database_client = database_client
+        self.upload_url = upload_url
+        self.api_key = api_key
         
         self.parameters = {}
         self.signal_data = []
-        self.trade_data = []
+        self.trade_data = pd.DataFrame()
         self.static_stats = []
-        self.timeseries_stats = []
+        self.timeseries_stats = pd.DataFrame()
         
     def to_dict(self):
         return {
             "parameters": self.parameters,
             "static_stats": self.static_stats,
-            "timeseries_stats":self.timeseries_stats,
+            "timeseries_stats": self._records(self.timeseries_stats),
             "signals": self.signal_data,
-            "trades": self.trade_data,
+            "trades": self._records(self.trade_data),
         }
+
+    @staticmethod
+    def _records(frame: pd.DataFrame) -> List[Dict]:
+        """ Rows of frame as dictionaries of python values, NaN as None. """
+        return frame.astype(object).where(frame.notna(), None).to_dict(orient='records')
     
     def validate_attributes(self):
         if not isinstance(self.parameters, dict):
             raise ValueError("parameters must be a dictionary")
-        if not all(isinstance(item, dict) for item in self.static_stats):
+        if not all(isinstance(item, dict) for item in self.static_stats): # a single summary
             raise ValueError("static_stats must be a list of dictionaries")
-        if not all(isinstance(item, dict) for item in self.timeseries_stats):
-            raise ValueError("timeseries_stats must be a list of dictionaries")
-        if not all(isinstance(item, dict) for item in self.trade_data):
-            raise ValueError("trade_data must be a list of dictionaries")
-        if not all(isinstance(item, dict) for item in self.signal_data):
+        if not isinstance(self.timeseries_stats, pd.DataFrame):
+            raise ValueError("timeseries_stats must be a DataFrame")
+        if not isinstance(self.trade_data, pd.DataFrame):
+            raise ValueError("trade_data must be a DataFrame")
+        if not isinstance(self.signal_data, list):
             raise ValueError("signal_data must be a list of dictionaries")
     
-    def save(self):
+    def to_frames(self) -> Dict[str, pd.DataFrame]:
+        """ Timeseries statistics (with the equity values), trades and signals as tables, signals one row per trade instruction. """
+        signals = pd.DataFrame()
+        if self.signal_data:
+            meta = [key for key in self.signal_data[0] if key != 'trade_instructions']
+            signals = pd.json_normalize(self.signal_data, record_path='trade_instructions', meta=meta, meta_prefix='signal_')
+
+        return {
+            "timeseries_stats": self.timeseries_stats,
+            "trades": self.trade_data,
+            "signals": signals,
+        }
+
+    def export(self, directory: str, format: str = 'parquet') -> Dict[str, str]:
+        """
+        Writes the backtest to directory, parameters and static statistics as json and every table as a columnar file.
+
+        Args:
+            directory (str) : Directory the files are written to, created if missing.
+            format (str) : 'parquet' or 'feather'.
+
+        Returns:
+            Dict[str, str] : Paths of the written files by name.
+        """
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"'format' must be one of {EXPORT_FORMATS}.")
+
+        os.makedirs(directory, exist_ok=True)
+        paths = {"backtest": os.path.join(directory, "backtest.json")}
+        with open(paths["backtest"], 'w') as file:
+            json.dump({"parameters": self.parameters, "static_stats": self.static_stats}, file, default=str)
+
+        for name, frame in self.to_frames().items():
+            paths[name] = os.path.join(directory, f"{name}.{format}")
+            if format == 'parquet':
+                frame.to_parquet(paths[name], index=False)
+            else:
+                frame.reset_index(drop=True).to_feather(paths[name])
+        return paths
+
+    def iter_json(self, batch_rows: int = 10000) -> Iterator[str]:
+        """
+        The to_dict payload as JSON text, table records are built batch_rows at a time so memory is bounded by a batch.
+
+        Args:
+            batch_rows (int) : Rows of timeseries_stats and trade_data converted to records per batch.
+        """
+        if not isinstance(batch_rows, int) or batch_rows <= 0:
+            raise ValueError("'batch_rows' must be a positive integer.")
+        return self._json_parts(batch_rows) # validated before the first part is built
+
+    def _json_parts(self, batch_rows: int) -> Iterator[str]:
+        def table(frame: pd.DataFrame) -> Iterator[str]:
+            yield '['
+            for start in range(0, len(frame), batch_rows):
+                records = json.dumps(self._records(frame.iloc[start:start + batch_rows]), default=str)[1:-1]
+                yield records if start == 0 else ', ' + records
+            yield ']'
+
+        yield '{"parameters": ' + json.dumps(self.parameters, default=str)
+        yield ', "static_stats": ' + json.dumps(self.static_stats, default=str)
+        yield ', "timeseries_stats": '
+        yield from table(self.timeseries_stats)
+        yield ', "signals": ' + json.dumps(self.signal_data, default=str)
+        yield ', "trades": '
+        yield from table(self.trade_data)
+        yield '}'
+
+    def compressed_payload(self, batch_rows: int = 10000) -> Iterator[bytes]:
+        """ iter_json gzip compressed as it is built. """
+        parts = self.iter_json(batch_rows)
+        return self._compress(parts)
+
+    @staticmethod
+    def _compress(parts: Iterator[str]) -> Iterator[bytes]:
+        compressor = zlib.compressobj(wbits=31) # gzip container
+        for text in parts:
+            data = compressor.compress(text.encode())
+            if data:
+                yield data
+        yield compressor.flush()
+
+    def save(self, batch_rows: int = 10000):
+        """
+        Validates and posts the backtest. With an upload_url the payload is streamed gzip compressed, otherwise it is
+        posted through the database client.
+
+        Args:
+            batch_rows (int) : Table rows converted to records at a time in the streamed upload.
+        """
         try:
             self.validate_attributes()
-            # backtest_json = json.dumps(self.to_dict())
-            response = self.database_client.create_backtest(self.to_dict())
+            if self.upload_url:
+                headers = {'Authorization': f"Token {self.api_key}", 'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+                response = requests.post(self.upload_url, data=self.compressed_payload(batch_rows), headers=headers).status_code
+            else:
+                response = self.database_client.create_backtest(self.to_dict())
             if response == 201:
                print("Backtest save successful.")
             else:
@@ -69,33 +188,58 @@ class Backtest:
             raise Exception(f"Error when saving the backtest: {e}")
 
 class PerformanceManager(PerformanceStatistics):
-    def __init__(self, database:DatabaseClient, logger:logging.Logger, params) -> None:
+    def __init__(self, database:DatabaseClient, logger:logging.Logger, params, benchmark_cache_dir: str = None, upload_url: str = None, api_key: str = None) -> None:
         self.logger = logger
         self.params = params
         self.database = database
+        self.benchmark_cache = BenchmarkCache(database, benchmark_cache_dir) # benchmark fetched once per symbols and range
         
-        self.backtest = Backtest(database)
+        self.backtest = Backtest(database, upload_url, api_key)
         self.signals : List[Dict] = []
-        self.trades : List[Dict] = []
-        self.equity_value : List[EquityDetails] = []
+        self.trade_log = ColumnRecorder(TRADE_COLUMNS)
+        self.equity_log = ColumnRecorder(EQUITY_COLUMNS)
+        self.online_stats = OnlineStatistics() # queryable during the run, calculate_statistics adds the benchmark statistics at the end
         self.static_stats : List[Dict] =  []
         self.timeseries_stats : pd.DataFrame = ()
 
+    def load_records(self, trades: List[Dict] = None, equity_value: List[EquityDetails] = None):
+        """
+        Replaces the recorded trades and/or equity values with exported records and rebuilds the online statistics.
+
+        Args:
+            trades (List[Dict]) : Trade records, as exported by trade_log.to_records(), None keeps the recorded trades.
+            equity_value (List[EquityDetails]) : Equity records, as exported by equity_log.to_records(), None keeps the recorded equity.
+        """
+        if trades is not None:
+            self.trade_log = ColumnRecorder(TRADE_COLUMNS)
+            self.trade_log.extend(trades)
+        if equity_value is not None:
+            self.equity_log = ColumnRecorder(EQUITY_COLUMNS)
+            self.equity_log.extend(equity_value)
+        self._replay_online_stats()
+
+    def _replay_online_stats(self):
+        """ Rebuilds the online statistics from the recorded trades and equity. """
+        self.online_stats = OnlineStatistics(self.online_stats.risk_free_rate, self.online_stats.target_return)
+        for trade_id, action, cost, fees in zip(*(self.trade_log.column(name) for name in ['trade_id', 'action', 'cost', 'fees'])):
+            self.online_stats.update_trade(int(trade_id), action, float(cost), float(fees))
+        for timestamp, equity_value in zip(self.equity_log.column('timestamp'), self.equity_log.column('equity_value')):
+            self.online_stats.update_equity(int(timestamp), float(equity_value))
+
     def update_trades(self, trade: Trade):
-        trade_dict = trade.to_dict()
-        if trade_dict not in self.trades:
-            self.trades.append(trade_dict)
-            self.logger.info(f"\nTrades Updated: \n{self._output_trades()}")
+        if self.trade_log.append(vars(trade)):
+            self.online_stats.update_trade(trade.trade_id, trade.action, trade.cost, trade.fees)
+            self.logger.info(f"\nTrades Updated: \n {trade.to_dict()} \n")
 
     def _output_trades(self):
         string = ""
-        for trade in self.trades:
+        for trade in self.trade_log.to_records():
             string += f" {trade} \n"
         return string
     
     def update_signals(self, signal: SignalEvent):
         self.signals.append(signal.to_dict()) 
-        self.logger.info(f"\nSignals Updated: {self._output_signals()}")
+        self.logger.info(f"\nSignals Updated:  {self.signals[-1]} \n")
         
     def _output_signals(self):
         string = ""
@@ -103,42 +247,65 @@ class PerformanceManager(PerformanceStatistics):
             string += f" {signals} \n"
         return string
     
+    def log_snapshot(self):
+        """ Logs every trade and signal recorded so far. """
+        self.logger.info(f"\nTrades: \n{self._output_trades()}\nSignals: \n{self._output_signals()}")
+
     def update_equity(self, equity_details: EquityDetails):
-        equity_details['timestamp'] =  datetime.fromtimestamp(equity_details['timestamp'], timezone.utc).isoformat()
-        if equity_details not in self.equity_value:
-            self.equity_value.append(equity_details)
-            self.logger.info(f"\nEquity Updated: {self.equity_value[-1]}")
+        if self.equity_log.append(equity_details):
+            self.online_stats.update_equity(equity_details['timestamp'], equity_details['equity_value'])
+            self.logger.info(f"\nEquity Updated: {equity_details}")
             
     def _aggregate_trades(self) -> pd.DataFrame:
-        if not self.trades:
+        """
+        Aggregates the recorded fills by trade_id. Fills are sorted by trade_id once and every trade is a segment
+        reduced with np.add.reduceat, entry and exit values are the costs of the LONG/SHORT and SELL/COVER fills.
+        """
+        if not len(self.trade_log):
             return pd.DataFrame()  # Return an empty DataFrame for consistency
-        
-        df = pd.DataFrame(self.trades)
-
-        # Group by trade_id to calculate aggregated values
-        aggregated = df.groupby('trade_id').agg({
-            'timestamp': ['first', 'last'],
-            'cost': [('entry_value', lambda x: x[df['action'].isin(['LONG', 'SHORT'])].sum()),
-                    ('exit_value', lambda x: x[df['action'].isin(['SELL', 'COVER'])].sum())],
-            'fees': 'sum'  # Sum of all fees for each trade group
-        })
-
-        # Simplify column names after aggregation
-        aggregated.columns = ['start_date', 'end_date', 'entry_value', 'exit_value', 'fees']
-
-        # Calculate Profit and Loss (PnL)
-        aggregated['pnl'] = aggregated['exit_value'] + aggregated['entry_value'] - aggregated['fees']
 
-        # Calculate percentage gain/loss based on the entry value
-        aggregated['gain/loss'] = aggregated['pnl'] / aggregated['entry_value'].abs()
-
-        # Reset index to make 'trade_id' a column again
-        aggregated.reset_index(inplace=True)
-
-        return aggregated
+        trade_ids = self.trade_log.column('trade_id')
+        if np.all(trade_ids[1:] >= trade_ids[:-1]): # trade ids are usually increasing already
+            order = np.arange(len(trade_ids))
+        else:
+            order = np.argsort(trade_ids, kind='stable') # keeps fill order within a trade
+        trade_ids = trade_ids[order]
+        starts = np.flatnonzero(np.r_[True, trade_ids[1:] != trade_ids[:-1]])
+        ends = np.r_[starts[1:], len(trade_ids)] - 1
+
+        action = self.trade_log.column('action')[order]
+        cost = self.trade_log.column('cost')[order]
+        timestamps = self.trade_log.column('timestamp')[order]
+
+        entry_value = np.add.reduceat(np.where((action == 'LONG') | (action == 'SHORT'), cost, 0.0), starts)
+        exit_value = np.add.reduceat(np.where((action == 'SELL') | (action == 'COVER'), cost, 0.0), starts)
+        fees = np.add.reduceat(self.trade_log.column('fees')[order], starts)
+        pnl = exit_value + entry_value - fees
+
+        with np.errstate(divide='ignore', invalid='ignore'): # trades without an entry have no return
+            gain_loss = pnl / np.abs(entry_value)
+
+        return pd.DataFrame({
+            'trade_id': trade_ids[starts],
+            'start_date': pd.to_datetime(timestamps[starts], unit='s', utc=True),
+            'end_date': pd.to_datetime(timestamps[ends], unit='s', utc=True),
+            'entry_value': entry_value,
+            'exit_value': exit_value,
+            'fees': fees,
+            'pnl': pnl,
+            'gain/loss': gain_loss,
+        })
     
-    def _calculate_return_and_drawdown(self):
-        df = pd.DataFrame(self.equity_value)
+    def _calculate_return_and_drawdown(self, benchmark: Tuple[np.ndarray, np.ndarray] = None, rolling_window: int = 21, risk_free_rate: float = 0.04):
+        """
+        Timeseries statistics at every equity update, the rolling statistics cover the trailing rolling_window days.
+
+        Args:
+            benchmark (Tuple[np.ndarray, np.ndarray]) : Sorted benchmark timestamps and closes, held at the latest close at or before each equity update.
+            rolling_window (int) : Length of the rolling window in days, converted to a number of equity updates.
+            risk_free_rate (float) : Annual risk-free rate.
+        """
+        df = self.equity_log.to_frame(iso=True)
         equity_curve = df['equity_value'].to_numpy()
 
         # Adjust daily_return to add a placeholder at the beginning
@@ -152,16 +319,43 @@ class PerformanceManager(PerformanceStatistics):
         df['daily_return'] = daily_returns_adjusted
         df['cumulative_return'] = cumulative_returns_adjusted
         df['drawdown'] = self.drawdown(equity_curve)
-        df.fillna(0, inplace=True)  # Replace NaN with 0 for the first element
+        df['drawdown_duration'] = self.drawdown_duration(equity_curve)
+
+        # Rolling statistics, windows and annualization in equity updates
+        timestamps = self.equity_log.column('timestamp')
+        updates_per_day = len(timestamps) / max(len(np.unique(timestamps // 86400)), 1)
+        window = max(int(round(rolling_window * updates_per_day)), 2)
+        periods_per_year = int(round(252 * updates_per_day))
+
+        df['rolling_volatility'] = np.insert(self.rolling_volatility(equity_curve, window, periods_per_year), 0, np.nan)
+        df['rolling_sharpe_ratio'] = np.insert(self.rolling_sharpe_ratio(equity_curve, window, risk_free_rate, periods_per_year), 0, np.nan)
+        df['rolling_sortino_ratio'] = np.insert(self.rolling_sortino_ratio(equity_curve, window, periods_per_year=periods_per_year), 0, np.nan)
+
+        if benchmark is not None and len(benchmark[0]):
+            benchmark_curve = self._benchmark_at(timestamps, *benchmark)
+            df['rolling_beta'] = np.insert(self.rolling_beta(equity_curve, benchmark_curve, window), 0, np.nan)
+            df['rolling_alpha'] = np.insert(self.rolling_alpha(equity_curve, benchmark_curve, window, risk_free_rate, periods_per_year), 0, np.nan)
+        else:
+            df['rolling_beta'] = np.nan
+            df['rolling_alpha'] = np.nan
+
+        # Rolling statistics stay NaN while the window is incomplete or the benchmark is missing, exported as None
+        return_columns = ['daily_return', 'cumulative_return', 'drawdown', 'drawdown_duration']
+        df[return_columns] = df[return_columns].fillna(0)
 
         return df
+
+    def _benchmark_at(self, timestamps: np.ndarray, benchmark_timestamps: np.ndarray, benchmark_closes: np.ndarray) -> np.ndarray:
+        """ Latest benchmark close at or before each timestamp, updates before the first close take the first close. """
+        index = np.searchsorted(benchmark_timestamps, timestamps, side='right') - 1
+        return benchmark_closes[np.clip(index, 0, None)]
     
     def _standardize_to_daily_values(self, data: List[dict]) -> pd.DataFrame:
         # Convert the equity curve to a DataFrame
         data_df = pd.DataFrame(data)
         
-        # Convert timestamps to datetime and set as index
-        data_df['timestamp'] = pd.to_datetime(data_df['timestamp'])
+        # Convert timestamps to UTC datetimes and set as index, recorded timestamps carry an offset and benchmark data may not
+        data_df['timestamp'] = pd.to_datetime(data_df['timestamp'], utc=True).dt.tz_localize(None)
         data_df.set_index('timestamp', inplace=True)
         
         # Resample to daily frequency, taking the last value of the day
@@ -174,38 +368,35 @@ class PerformanceManager(PerformanceStatistics):
         return data_df
     
     def _align_equity_and_benchmark(self, equity_curve:List[dict], benchmark_curve:List[dict]):
-        # Ensure both timeseries are daily time intervals
-        equity_curve_df = self._standardize_to_daily_values(equity_curve)
-        bm_curve_df = self._standardize_to_daily_values(benchmark_curve)
-        
-        # Align the two datasets, keeping only the dates that exist in both
-        # This operation will automatically drop dates that do not align
-        combined_df = pd.concat([equity_curve_df, bm_curve_df], axis=1, join='inner')
-
-        # Convert the selected columns to NumPy arrays
-        equity_values_array = combined_df['equity_value'].to_numpy()
-        benchmark_close_array = combined_df['close'].to_numpy()
+        # Daily closes keyed by int64 days, only the days that exist in both are kept
+        equity_days, equity_values = daily_closes(*self._timestamps_and_values(equity_curve, 'equity_value'))
+        benchmark_days, benchmark_closes = daily_closes(*self._timestamps_and_values(benchmark_curve, 'close'))
+        return align_days(equity_days, equity_values, benchmark_days, benchmark_closes)
 
-        equity_values_array = equity_values_array.astype(np.float64)
-        benchmark_close_array = benchmark_close_array.astype(np.float64)
-
-        return equity_values_array, benchmark_close_array
+    def _timestamps_and_values(self, data: List[dict], column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """ Unix timestamps and values of records sorted by time, timestamps may be unix or date strings. """
+        data_df = pd.DataFrame(data)
+        timestamps = data_df['timestamp']
+        if not pd.api.types.is_integer_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps, utc=True).astype('int64') // 10**9
+        timestamps = timestamps.to_numpy(dtype=np.int64)
+        order = np.argsort(timestamps, kind='stable')
+        return timestamps[order], data_df[column].to_numpy(dtype=np.float64)[order]
     
-    def calculate_statistics(self, risk_free_rate: float= 0.04):
+    def calculate_statistics(self, risk_free_rate: float= 0.04, rolling_window: int = 21):
         # Aggregate Trades
         aggregated_trades = self._aggregate_trades()
 
         # Calculate Timeseries Statistics
-        self.timeseries_stats = self._calculate_return_and_drawdown()
+        benchmark = self.benchmark_cache.series(self.params.benchmark, self.params.test_start, self.params.test_end)
+        self.timeseries_stats = self._calculate_return_and_drawdown(benchmark, rolling_window, risk_free_rate)
         # self.timeseries_stats = self.timeseries_stats.drop(self.timeseries_stats.index[0])
 
         # Standardize Equity Values to daily time frame
-        equity_df = self._standardize_to_daily_values(self.equity_value) 
-        equity_curve = equity_df['equity_value'].to_numpy()
+        equity_days, equity_curve = daily_closes(self.equity_log.column('timestamp'), self.equity_log.column('equity_value'))
 
-        # Align benchmark and equity values
-        benchmark_data = self.database.get_benchmark_data(self.params.benchmark, self.params.test_start, self.params.test_end)
-        aligned_equity, aligned_benchmark = self._align_equity_and_benchmark(self.equity_value, benchmark_data)
+        # Align benchmark and equity values, the benchmark's daily closes are cached across runs
+        aligned_equity, aligned_benchmark = align_days(equity_days, equity_curve, *self.benchmark_cache.daily(self.params.benchmark, self.params.test_start, self.params.test_end))
 
         # benchmark_curve  = np.array([float(entry['close']) for entry in benchmark_data])
         # print(benchmark_curve)
@@ -251,10 +442,15 @@ class PerformanceManager(PerformanceStatistics):
         # Create Backtest Object
         self.backtest.parameters = self.params.to_dict()
         self.backtest.static_stats = self.static_stats
-        self.backtest.timeseries_stats = self.timeseries_stats.to_dict(orient='records')
-        self.backtest.trade_data = self.trades
+        self.backtest.timeseries_stats = self.timeseries_stats
+        self.backtest.trade_data = self.trade_log.to_frame(iso=True)
         self.backtest.signal_data = self.signals
 
+        # Columnar copy of the results, written from the tables without building records
+        if self.params.export_directory:
+            paths = self.backtest.export(self.params.export_directory, self.params.export_format)
+            self.logger.info(f"Backtest exported : {paths}")
+
         # Save Backtest Object
         self.backtest.save()
         # backtest_json = json.dumps(self.backtest.to_dict())
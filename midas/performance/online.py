@@ -0,0 +1,194 @@
+import math
+import numpy as np
+from typing import Dict, Tuple
+
+SECONDS_PER_DAY = 86400
+
+class _Moments:
+    """ Welford count, mean and sum of squared deviations, a sample can be removed again. """
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x: float):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        mean = (self.count * self.mean - x) / (self.count - 1)
+        self.m2 = max(self.m2 - (x - mean) * (x - self.mean), 0.0)
+        self.mean = mean
+        self.count -= 1
+
+    def with_sample(self, x: float) -> Tuple[int, float, float]:
+        """ Count, mean and m2 as if x was added, without adding it. """
+        count = self.count + 1
+        delta = x - self.mean
+        mean = self.mean + delta / count
+        return count, mean, self.m2 + delta * (x - mean)
+
+    @staticmethod
+    def std(count: int, m2: float) -> float:
+        """ Sample standard deviation, nan below two samples. """
+        return math.sqrt(m2 / (count - 1)) if count > 1 else math.nan
+
+class OnlineStatistics:
+    """
+    Performance statistics updated incrementally on every equity and trade update.
+
+    Equity statistics are computed on daily closes like PerformanceManager.calculate_statistics, the last update of each
+    UTC day is its close and the current day counts with its latest value. Trades are aggregated by trade_id as fills
+    arrive, a fill replaces its trade's previous contribution in the running sums, so every statistic is O(1) per update.
+    The results, rounded like PerformanceStatistics, are kept in stats and read at any time.
+    """
+    def __init__(self, risk_free_rate: float = 0.04, target_return: float = 0.0):
+        """
+        Args:
+            risk_free_rate (float) : Annual risk-free rate of the sharpe ratio.
+            target_return (float) : Trade return below which trades count towards the sortino downside deviation.
+        """
+        self.risk_free_rate = risk_free_rate
+        self.target_return = target_return
+
+        # Equity, on daily closes
+        self.day = None
+        self.close = None # latest value of the current day
+        self.previous_close = None
+        self.first_close = None
+        self.peak = -math.inf
+        self.max_drawdown = 0.0
+        self.returns = _Moments()
+        self.levels = _Moments()
+
+        # Trades, aggregated by trade_id
+        self.trades : Dict[int, Tuple[float, float, float]] = {} # entry value, exit value, fees
+        self.trade_count = 0
+        self.pnl = 0.0
+        self.fees = 0.0
+        self.wins = 0
+        self.losses = 0
+        self.win_pnl = 0.0
+        self.loss_pnl = 0.0
+        self.win_return = 0.0 # sum of rounded trade returns, as averaged by PerformanceStatistics
+        self.loss_return = 0.0
+        self.trade_returns = _Moments()
+        self.downside = _Moments()
+
+        self.stats : Dict[str, float] = {}
+        self._update_trade_stats()
+
+    # -- Equity --
+    def update_equity(self, timestamp: int, equity_value: float):
+        day = int(timestamp) // SECONDS_PER_DAY
+        if self.day is not None and day != self.day:
+            self._close_day()
+        self.day = day
+        self.close = float(equity_value)
+        self._update_equity_stats()
+
+    def _close_day(self):
+        close = self.close
+        if self.previous_close is None:
+            self.first_close = close
+        else:
+            self.returns.add(_round((close - self.previous_close) / self.previous_close))
+        self.levels.add(close)
+        self.peak = max(self.peak, close)
+        self.max_drawdown = min(self.max_drawdown, _round((close - self.peak) / self.peak))
+        self.previous_close = close
+
+    def _update_equity_stats(self):
+        close = self.close
+        first = close if self.first_close is None else self.first_close
+        peak = max(self.peak, close)
+
+        standard_deviation = _Moments.std(*self.levels.with_sample(close)[::2])
+
+        if self.previous_close is None:
+            sharpe = 0.0
+        else:
+            count, mean, m2 = self.returns.with_sample(_round((close - self.previous_close) / self.previous_close))
+            std = _Moments.std(count, m2)
+            sharpe = _round((mean - self.risk_free_rate / 252) / std) if std > 0 else 0.0
+
+        self.stats.update({
+            'total_return': _round(close / first - 1),
+            'max_drawdown': min(self.max_drawdown, _round((close - peak) / peak)),
+            'annual_standard_deviation': _round(standard_deviation * math.sqrt(252)) if self.levels.count else 0.0,
+            'ending_equity': close,
+            'sharpe_ratio': sharpe,
+        })
+
+    # -- Trades --
+    def update_trade(self, trade_id: int, action: str, cost: float, fees: float):
+        """ Adds a fill to its trade, LONG/SHORT fills are entries and SELL/COVER fills exits. """
+        entry_value, exit_value, trade_fees = self.trades.get(trade_id, (0.0, 0.0, 0.0))
+        if trade_id in self.trades:
+            self._add_trade(entry_value, exit_value, trade_fees, -1) # replaced by the updated trade
+
+        if action in ['LONG', 'SHORT']:
+            entry_value += cost
+        elif action in ['SELL', 'COVER']:
+            exit_value += cost
+        trade_fees += fees
+
+        self.trades[trade_id] = (entry_value, exit_value, trade_fees)
+        self._add_trade(entry_value, exit_value, trade_fees, 1)
+        self._update_trade_stats()
+
+    def _add_trade(self, entry_value: float, exit_value: float, fees: float, sign: int):
+        pnl = exit_value + entry_value - fees
+        trade_return = pnl / abs(entry_value) if entry_value else math.nan # no return without an entry
+
+        self.trade_count += sign
+        self.pnl += sign * pnl
+        self.fees += sign * fees
+        if pnl > 0:
+            self.wins += sign
+            self.win_pnl += sign * pnl
+            self.win_return += sign * _round(trade_return)
+        elif pnl < 0:
+            self.losses += sign
+            self.loss_pnl += sign * pnl
+            self.loss_return += sign * _round(trade_return)
+
+        if not math.isnan(trade_return):
+            moments = [self.trade_returns, self.downside] if trade_return < self.target_return else [self.trade_returns]
+            for moment in moments:
+                if sign > 0:
+                    moment.add(trade_return)
+                else:
+                    moment.remove(trade_return)
+
+    def _update_trade_stats(self):
+        net_profit = _round(self.pnl)
+        avg_win = self.win_pnl / self.wins if self.wins else 0
+        avg_loss = self.loss_pnl / self.losses if self.losses else 0
+        downside_deviation = _Moments.std(self.downside.count, self.downside.m2)
+
+        self.stats.update({
+            'net_profit': net_profit,
+            'total_fees': self.fees,
+            'total_trades': self.trade_count,
+            'num_winning_trades': self.wins,
+            'num_lossing_trades': self.losses,
+            'avg_win_percent': _round(self.win_return / self.wins) if self.wins else 0,
+            'avg_loss_percent': _round(self.loss_return / self.losses) if self.losses else 0,
+            'percent_profitable': _round(self.wins / self.trade_count) if self.trade_count else 0.0,
+            'profit_and_loss': _round(abs(avg_win / avg_loss)) if avg_loss != 0 else 0.0,
+            'profit_factor': _round(self.win_pnl / abs(self.loss_pnl)) if self.losses and self.loss_pnl != 0 else 0.0,
+            'avg_trade_profit': _round(net_profit / self.trade_count) if self.trade_count else 0,
+            'sortino_ratio': _round((self.trade_returns.mean - self.target_return) / downside_deviation) if downside_deviation > 0 else 0.0,
+        })
+
+def _round(value: float) -> float:
+    """ Rounded to 4 decimals the way PerformanceStatistics rounds. """
+    return float(np.around(value, decimals=4))
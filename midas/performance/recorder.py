@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from typing import Dict, List, Iterable, Union
+
+NUMBER = 'number' # int64 column promoted to float64 when a float is recorded
+
+class ColumnRecorder:
+    """
+    Append-only records held in growable numpy columns.
+
+    Columns double in capacity when full, so appending a record is O(1) amortised. Every record is also hashed into
+    an index, a duplicate is rejected with a set lookup instead of a scan of the history. Timestamps are kept as raw
+    unix numbers and only rendered as ISO strings on export. NUMBER columns hold int64 values until the first float
+    is recorded, so integer quantities and timestamps export as integers and float ones are never truncated.
+    """
+    def __init__(self, columns: Dict[str, type], timestamp: str = 'timestamp', capacity: int = 1024):
+        """
+        Args:
+            columns (Dict[str, type]) : Column names and their numpy dtypes or NUMBER, in record order.
+            timestamp (str) : Column holding the unix timestamps.
+            capacity (int) : Initial number of records the columns hold before growing.
+        """
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError("'capacity' must be a positive integer.")
+        if timestamp not in columns:
+            raise ValueError(f"'{timestamp}' must be one of the columns.")
+
+        self.timestamp = timestamp
+        self.capacity = capacity
+        self.size = 0
+        self._columns = {name: np.empty(capacity, dtype=np.int64 if dtype == NUMBER else dtype) for name, dtype in columns.items()}
+        self._integer_numbers = {name for name, dtype in columns.items() if dtype == NUMBER} # NUMBER columns not yet promoted
+        self._index = set()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, record: dict) -> bool:
+        """ Appends record, returns False if an identical record was already recorded. """
+        key = tuple(record[name] for name in self._columns)
+        if key in self._index:
+            return False
+        self._index.add(key)
+
+        if self.size == self.capacity:
+            self._grow()
+
+        for name in [name for name in self._integer_numbers if isinstance(record[name], (float, np.floating))]:
+            self._columns[name] = self._columns[name].astype(np.float64)
+            self._integer_numbers.discard(name)
+
+        for name, column in self._columns.items():
+            column[self.size] = record[name]
+        self.size += 1
+        return True
+
+    def extend(self, records: Iterable[dict]):
+        """ Appends exported records, timestamps may be unix or date strings. """
+        records = list(records)
+        if not records:
+            return
+
+        timestamps = [record[self.timestamp] for record in records]
+        if not all(isinstance(timestamp, (int, float, np.integer, np.floating)) for timestamp in timestamps):
+            timestamps = (pd.to_datetime(pd.Series(timestamps), utc=True).astype('int64') // 10**9).tolist()
+
+        for record, timestamp in zip(records, timestamps):
+            self.append({**record, self.timestamp: timestamp})
+
+    def _grow(self):
+        self.capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(self.capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self._columns[name] = grown
+
+    def column(self, name: str) -> np.ndarray:
+        """ View of the recorded values of a column. """
+        return self._columns[name][:self.size]
+
+    def to_frame(self, iso: bool = False) -> pd.DataFrame:
+        """ Recorded values with raw timestamps, or ISO timestamps as exported by to_records if iso is set. """
+        frame = pd.DataFrame({name: column[:self.size].copy() for name, column in self._columns.items()})
+        if iso:
+            frame[self.timestamp] = iso_timestamps(frame[self.timestamp].tolist())
+        return frame
+
+    def to_records(self) -> List[dict]:
+        """ Recorded values as dictionaries with ISO timestamps. """
+        columns = {name: column[:self.size].tolist() for name, column in self._columns.items()}
+        columns[self.timestamp] = iso_timestamps(columns[self.timestamp])
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+def iso_timestamps(timestamps: List[Union[int, float]]) -> List[str]:
+    """ Unix timestamps as ISO 8601 strings in UTC. """
+    return [datetime.fromtimestamp(timestamp, timezone.utc).isoformat() for timestamp in timestamps]
@@ -0,0 +1,164 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Tuple
+
+STATISTICS = ['sharpe_ratio', 'max_drawdown', 'net_profit']
+
+class RobustnessAnalysis:
+    """
+    Resampled distributions of sharpe ratio, max drawdown and net profit of a backtest, and their confidence intervals.
+
+    Three resampling methods are supported. Trade permutation replays the trade pnls in random order. Stationary block
+    bootstrap draws the daily returns in blocks of geometric length. Entry delay keeps the strategy flat for a random
+    number of days after each trade entry. Resamples are generated as 2-D arrays of paths, in batches spread across a
+    process pool. Every batch has its own seed, so results depend on the seed only and not on the number of workers.
+    """
+    def __init__(self, equity_curve: np.ndarray, trade_pnl: np.ndarray, trade_entries: np.ndarray = None, risk_free_rate: float = 0.04,
+                 workers: int = None, batch_size: int = 500, seed: int = None):
+        """
+        Args:
+            equity_curve (np.ndarray) : Daily equity values.
+            trade_pnl (np.ndarray) : Net pnl of every trade.
+            trade_entries (np.ndarray) : Index of the first daily return each trade is exposed to, needed by entry_delay.
+            risk_free_rate (float) : Annual risk-free rate of the sharpe ratio of daily returns.
+            workers (int) : Processes resamples are spread over, defaults to the number of cpus, 1 runs in process.
+            batch_size (int) : Resamples generated per vectorized batch.
+            seed (int) : Seed the batches' random generators are spawned from.
+        """
+        if not isinstance(equity_curve, np.ndarray) or len(equity_curve) < 2:
+            raise TypeError("equity_curve must be a numpy array of at least two values")
+        if not isinstance(trade_pnl, np.ndarray):
+            raise TypeError("trade_pnl must be a numpy array")
+        if workers is not None and (not isinstance(workers, int) or workers <= 0):
+            raise ValueError("'workers' must be a positive integer.")
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError("'batch_size' must be a positive integer.")
+
+        self.equity_curve = equity_curve.astype(np.float64)
+        self.returns = np.diff(self.equity_curve) / self.equity_curve[:-1]
+        self.trade_pnl = trade_pnl.astype(np.float64)
+        self.trade_entries = None if trade_entries is None else np.clip(np.asarray(trade_entries, dtype=np.int64), 0, len(self.returns) - 1)
+        self.risk_free_rate = risk_free_rate
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.seed = seed
+
+    @classmethod
+    def from_performance_manager(cls, performance_manager, **kwargs) -> 'RobustnessAnalysis':
+        """ Analysis of the equity and trade logs collected by a PerformanceManager. """
+        equity_df = performance_manager._standardize_to_daily_values(performance_manager.equity_log.to_records())
+        trades = performance_manager._aggregate_trades()
+        if trades.empty:
+            return cls(equity_df['equity_value'].to_numpy(), np.empty(0), np.empty(0, dtype=np.int64), **kwargs)
+
+        # A trade entered during a day is first exposed to the return closing that day
+        days = equity_df.index.to_numpy(dtype='datetime64[D]')
+        entry_days = trades['start_date'].dt.tz_localize(None).to_numpy(dtype='datetime64[D]')
+        trade_entries = np.searchsorted(days, entry_days, side='left') - 1
+        return cls(equity_df['equity_value'].to_numpy(), trades['pnl'].to_numpy(), trade_entries, **kwargs)
+
+    # -- Resampling --
+    def trade_permutation(self, resamples: int = 1000) -> Dict[str, np.ndarray]:
+        """ Statistics of the trade pnls replayed in random order, net profit is the same for every order. """
+        return self._run(_permutation_batch, resamples, self.trade_pnl, self.equity_curve[0])
+
+    def block_bootstrap(self, resamples: int = 1000, mean_block: float = 5.0) -> Dict[str, np.ndarray]:
+        """ Statistics of daily returns drawn with the stationary block bootstrap, blocks of mean_block days on average. """
+        if not isinstance(mean_block, (int, float)) or mean_block < 1:
+            raise ValueError("'mean_block' must be a number of at least 1.")
+        return self._run(_bootstrap_batch, resamples, self.returns, mean_block, self.equity_curve[0], self.risk_free_rate / 252)
+
+    def entry_delay(self, resamples: int = 1000, max_delay: int = 3) -> Dict[str, np.ndarray]:
+        """ Statistics of the daily returns with every trade entered between 0 and max_delay days late, flat meanwhile. """
+        if not isinstance(max_delay, int) or max_delay < 0:
+            raise ValueError("'max_delay' must be a non-negative integer.")
+        if self.trade_entries is None:
+            raise ValueError("'trade_entries' are required to delay entries.")
+        return self._run(_entry_delay_batch, resamples, self.returns, self.trade_entries, max_delay, self.equity_curve[0], self.risk_free_rate / 252)
+
+    def run(self, resamples: int = 1000, confidence: float = 0.95) -> Dict[str, Dict[str, Tuple[float, float]]]:
+        """ Confidence intervals of every resampling method, entry delay only when trade entries are known. """
+        results = {
+            'trade_permutation': self.trade_permutation(resamples),
+            'block_bootstrap': self.block_bootstrap(resamples),
+        }
+        if self.trade_entries is not None:
+            results['entry_delay'] = self.entry_delay(resamples)
+        return {method: self.confidence_intervals(samples, confidence) for method, samples in results.items()}
+
+    @staticmethod
+    def confidence_intervals(samples: Dict[str, np.ndarray], confidence: float = 0.95) -> Dict[str, Tuple[float, float]]:
+        """ Percentile interval of every resampled statistic. """
+        if not isinstance(confidence, float) or not 0 < confidence < 1:
+            raise ValueError("'confidence' must be a float between 0 and 1.")
+        tail = (1 - confidence) / 2 * 100
+        return {name: tuple(np.percentile(values, [tail, 100 - tail]).tolist()) for name, values in samples.items()}
+
+    def _run(self, batch: Callable, resamples: int, *args) -> Dict[str, np.ndarray]:
+        if not isinstance(resamples, int) or resamples <= 0:
+            raise ValueError("'resamples' must be a positive integer.")
+
+        sizes = [self.batch_size] * (resamples // self.batch_size)
+        if resamples % self.batch_size:
+            sizes.append(resamples % self.batch_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+
+        if self.workers == 1 or len(sizes) == 1:
+            results = [batch(seed, size, *args) for seed, size in zip(seeds, sizes)]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(sizes))) as executor:
+                results = list(executor.map(batch, seeds, sizes, *[[arg] * len(sizes) for arg in args]))
+
+        return {name: np.concatenate([result[name] for result in results]) for name in STATISTICS}
+
+# -- Batches, module level so the process pool can pickle them --
+def _permutation_batch(seed: np.random.SeedSequence, size: int, trade_pnl: np.ndarray, capital: float) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    order = np.argsort(rng.random((size, len(trade_pnl))), axis=1)
+    paths = capital + np.cumsum(trade_pnl[order], axis=1)
+    return _path_statistics(np.hstack([np.full((size, 1), capital), paths]), 0.0)
+
+def _bootstrap_batch(seed: np.random.SeedSequence, size: int, returns: np.ndarray, mean_block: float, capital: float, period_rate: float) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    length = len(returns)
+
+    # A new block starts with probability 1 / mean_block, at a random position, and continues circularly
+    new_block = rng.random((size, length)) < 1 / mean_block
+    new_block[:, 0] = True
+    steps = np.arange(length)
+    block_start = np.maximum.accumulate(np.where(new_block, steps, 0), axis=1)
+    positions = rng.integers(0, length, (size, length))
+    index = (np.take_along_axis(positions, block_start, axis=1) + steps - block_start) % length
+
+    paths = capital * np.cumprod(1 + returns[index], axis=1)
+    return _path_statistics(np.hstack([np.full((size, 1), capital), paths]), period_rate)
+
+def _entry_delay_batch(seed: np.random.SeedSequence, size: int, returns: np.ndarray, trade_entries: np.ndarray, max_delay: int, capital: float, period_rate: float) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    length = len(returns)
+
+    # Flat from each entry until its delay ends, marked with a difference array
+    delays = rng.integers(0, max_delay + 1, (size, len(trade_entries)))
+    rows = np.repeat(np.arange(size), len(trade_entries))
+    entries = np.tile(trade_entries, size)
+    waiting = np.zeros((size, length + 1), dtype=np.int64)
+    np.add.at(waiting, (rows, entries), 1)
+    np.add.at(waiting, (rows, np.minimum(entries + delays.ravel(), length)), -1)
+    flat = np.cumsum(waiting, axis=1)[:, :length] > 0
+
+    paths = capital * np.cumprod(1 + np.where(flat, 0.0, returns), axis=1)
+    return _path_statistics(np.hstack([np.full((size, 1), capital), paths]), period_rate)
+
+def _path_statistics(paths: np.ndarray, period_rate: float) -> Dict[str, np.ndarray]:
+    """ Sharpe ratio, max drawdown and net profit of every equity path, one path per row. """
+    returns = np.diff(paths, axis=1) / paths[:, :-1] - period_rate
+    std = returns.std(axis=1, ddof=1) if returns.shape[1] > 1 else np.zeros(len(paths))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, returns.mean(axis=1) / std, 0.0)
+    rolling_max = np.maximum.accumulate(paths, axis=1)
+    return {
+        'sharpe_ratio': sharpe,
+        'max_drawdown': ((paths - rolling_max) / rolling_max).min(axis=1),
+        'net_profit': paths[:, -1] - paths[:, 0],
+    }
@@ -390,6 +390,73 @@ class PerformanceStatistics:
         alpha_value = annualized_portfolio_return - (risk_free_rate + beta_value * (annualized_benchmark_return - risk_free_rate))
         return round(alpha_value, 4)
     
+    # -- Rolling --
+    @staticmethod
+    def period_returns(equity_curve: np.ndarray) -> np.ndarray:
+        """Unrounded returns between consecutive values, intraday returns are too small to round to 4 decimals."""
+        if not isinstance(equity_curve, np.ndarray):
+            raise TypeError("equity_curve must be a numpy array")
+        return np.diff(equity_curve) / equity_curve[:-1]
+
+    @staticmethod
+    def rolling_volatility(equity_curve: np.ndarray, window: int, periods_per_year: int = 252) -> np.ndarray:
+        """Annualized standard deviation of the returns over the trailing window, nan until the window is full."""
+        _, std = _rolling_mean_std(PerformanceStatistics.period_returns(equity_curve), window)
+        return np.around(std * np.sqrt(periods_per_year), decimals=4)
+
+    @staticmethod
+    def rolling_sharpe_ratio(equity_curve: np.ndarray, window: int, risk_free_rate: float = 0.04, periods_per_year: int = 252) -> np.ndarray:
+        """Annualized sharpe ratio over the trailing window, 0 where the returns do not vary."""
+        mean, std = _rolling_mean_std(PerformanceStatistics.period_returns(equity_curve), window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = np.where(std > 0, (mean - risk_free_rate / periods_per_year) / std * np.sqrt(periods_per_year), 0.0)
+        return np.around(np.where(np.isnan(std), np.nan, sharpe), decimals=4)
+
+    @staticmethod
+    def rolling_sortino_ratio(equity_curve: np.ndarray, window: int, target_return: float = 0.0, periods_per_year: int = 252) -> np.ndarray:
+        """Annualized sortino ratio over the trailing window, the downside deviation is of the returns below target_return."""
+        returns = PerformanceStatistics.period_returns(equity_curve)
+        mean, _ = _rolling_mean_std(returns, window)
+        downside_deviation = np.sqrt(_rolling_sum(np.minimum(returns - target_return, 0) ** 2, window) / window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sortino = np.where(downside_deviation > 0, (mean - target_return) / downside_deviation * np.sqrt(periods_per_year), 0.0)
+        return np.around(np.where(np.isnan(downside_deviation), np.nan, sortino), decimals=4)
+
+    @staticmethod
+    def rolling_beta(portfolio_equity_curve: np.ndarray, benchmark_equity_curve: np.ndarray, window: int) -> np.ndarray:
+        """Beta of the portfolio against the benchmark over the trailing window, nan where the benchmark does not vary."""
+        if len(portfolio_equity_curve) != len(benchmark_equity_curve):
+            raise ValueError("'benchmark_equity_curve' must be aligned with 'portfolio_equity_curve'.")
+        covariance, variance = _rolling_covariance(PerformanceStatistics.period_returns(portfolio_equity_curve), PerformanceStatistics.period_returns(benchmark_equity_curve), window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.around(np.where(variance > 0, covariance / variance, np.nan), decimals=4)
+
+    @staticmethod
+    def rolling_alpha(portfolio_equity_curve: np.ndarray, benchmark_equity_curve: np.ndarray, window: int, risk_free_rate: float = 0.04, periods_per_year: int = 252) -> np.ndarray:
+        """Annualized alpha of the portfolio against the benchmark over the trailing window."""
+        if len(portfolio_equity_curve) != len(benchmark_equity_curve):
+            raise ValueError("'benchmark_equity_curve' must be aligned with 'portfolio_equity_curve'.")
+        portfolio_returns = PerformanceStatistics.period_returns(portfolio_equity_curve)
+        benchmark_returns = PerformanceStatistics.period_returns(benchmark_equity_curve)
+        covariance, variance = _rolling_covariance(portfolio_returns, benchmark_returns, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            beta = np.where(variance > 0, covariance / variance, np.nan)
+
+        period_rate = risk_free_rate / periods_per_year
+        portfolio_mean = _rolling_sum(portfolio_returns, window) / window
+        benchmark_mean = _rolling_sum(benchmark_returns, window) / window
+        return np.around((portfolio_mean - (period_rate + beta * (benchmark_mean - period_rate))) * periods_per_year, decimals=4)
+
+    @staticmethod
+    def drawdown_duration(equity_curve: np.ndarray) -> np.ndarray:
+        """Number of periods since the last peak of the equity curve, 0 at a new peak."""
+        if not isinstance(equity_curve, np.ndarray):
+            raise TypeError("equity_curve must be a numpy array")
+        index = np.arange(len(equity_curve))
+        at_peak = equity_curve >= np.maximum.accumulate(equity_curve)
+        last_peak = np.maximum.accumulate(np.where(at_peak, index, 0))
+        return index - last_peak
+
     # -- Plots --
     @staticmethod
     def plot_curve(y, title='Title', x_label="Time", y_label="Curve", show_plot=True):
@@ -505,3 +572,35 @@ class PerformanceStatistics:
 
         if show_plot:
             plt.show()
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """ Sum over the trailing window from one cumulative sum, O(n), nan until the window is full. """
+    if not isinstance(window, int) or window < 2:
+        raise ValueError("'window' must be an integer of at least 2.")
+    sums = np.full(len(values), np.nan)
+    if len(values) >= window:
+        cumulative = np.concatenate(([0.0], np.cumsum(values)))
+        sums[window - 1:] = cumulative[window:] - cumulative[:-window]
+    return sums
+
+def _rolling_mean_std(values: np.ndarray, window: int):
+    """ Mean and sample standard deviation over the trailing window. """
+    center = values.mean() if len(values) else 0.0 # centered, so the sums of squares do not cancel out
+    values = values - center
+    sums = _rolling_sum(values, window)
+    squares = _rolling_sum(values ** 2, window)
+    variance = np.maximum((squares - sums ** 2 / window) / (window - 1), 0)
+    variance[variance * (window - 1) <= squares * 1e-12] = 0 # cumulative sum rounding on a flat window
+    return sums / window + center, np.sqrt(variance)
+
+def _rolling_covariance(x: np.ndarray, y: np.ndarray, window: int):
+    """ Covariance of x and y and variance of y over the trailing window, both with the same ddof. """
+    x = x - (x.mean() if len(x) else 0.0)
+    y = y - (y.mean() if len(y) else 0.0)
+    sum_x = _rolling_sum(x, window)
+    sum_y = _rolling_sum(y, window)
+    covariance = _rolling_sum(x * y, window) - sum_x * sum_y / window
+    squares = _rolling_sum(y ** 2, window)
+    variance = np.maximum(squares - sum_y ** 2 / window, 0)
+    variance[variance <= squares * 1e-12] = 0 # cumulative sum rounding on a flat window
+    return covariance, variance
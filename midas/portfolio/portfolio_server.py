@@ -8,6 +8,8 @@ from midas.account_data import Position,ActiveOrder, AccountDetails
 class PortfolioServer:
     """
     Interacts with the portfolio client, retrieves commonly needed data, that would be stored in the portfolio client.
+
+    Updates log only what changed, the full positions, orders and account are logged on demand by log_snapshot.
     """
     def __init__(self, symbols_map: Dict[str, Symbol], logger:logging.Logger):
         """
@@ -22,16 +24,43 @@ class PortfolioServer:
         self.capital = None
         self.account : AccountDetails = {}
         self.positions : Dict[Contract, Position] = {}
+        self.position_versions : Dict[str, int] = {} # broker version of each position, set by versioned updates
         self.active_orders : Dict[int, ActiveOrder] = {}
+        self._logged_account : AccountDetails = {} # account as of the last log, the broker updates its account in place
+
+    def update_positions(self, contract: Contract, new_position: Position, version: int = None):
+        """
+        Updates the position held in the contract.
+
+        Args:
+            version (int) : Broker version of the position, a version already applied is skipped without comparing positions.
+                            Unversioned updates (e.g. live broker callbacks) are compared against the current position.
+        """
+        if version is not None:
+            if self.position_versions.get(contract.symbol, 0) >= version:
+                return
+            self.positions[contract.symbol] = new_position
+            self.position_versions[contract.symbol] = version
+            self.logger.info(f"\nPosition Updated: \n {contract.symbol}: {new_position.__dict__} \n")
+            return
 
-    def update_positions(self, contract: Contract, new_position: Position):
         # Check if this position exists and is equal to the new position
         if contract.symbol in self.positions and self.positions[contract.symbol] == new_position:
             return  # Positions are identical, do nothing
         else:
             # Update the position and log the change
             self.positions[contract.symbol] = new_position
-            self.logger.info(f"\nPositions Updated: \n{self._output_positions()}")
+            self.logger.info(f"\nPosition Updated: \n {contract.symbol}: {new_position.__dict__} \n")
+
+    def remove_position(self, contract: Contract, version: int = None):
+        """ Removes a closed position, versioned like update_positions. """
+        if version is not None:
+            if self.position_versions.get(contract.symbol, 0) >= version:
+                return
+            self.position_versions[contract.symbol] = version
+
+        if self.positions.pop(contract.symbol, None) is not None:
+            self.logger.info(f"\nPosition Closed: \n {contract.symbol} \n")
 
     def _output_positions(self):
         string =""
@@ -39,6 +68,10 @@ class PortfolioServer:
             string += f" {contract}: {position.__dict__} \n"
         return string
     
+    def log_snapshot(self):
+        """ Logs the full positions, active orders and account. """
+        self.logger.info(f"\nPositions: \n{self._output_positions()}\nOrders: \n{self._output_orders()}\nAccount: \n{self._output_account()}")
+
     def update_orders(self, order: ActiveOrder):
         # If the status is 'Cancelled' and the order is present in the dict, remove it
         if order['status'] == 'Cancelled' or order['status'] == 'Filled' and order['permId'] in self.active_orders:
@@ -50,9 +83,9 @@ class PortfolioServer:
             else:
                 self.active_orders[order['permId']].update(order)
 
-        self.logger.info(f"\nOrder Updated: \n{self._ouput_orders()}")
+        self.logger.info(f"\nOrder Updated: \n {order} \n")
 
-    def _ouput_orders(self):
+    def _output_orders(self):
         string =""
         for permId, order in self.active_orders.items():
             string += f" {order} \n"
@@ -62,11 +95,14 @@ class PortfolioServer:
         self.account = account_details
         self.capital = float(self.account['FullAvailableFunds'])
 
-        self.logger.info(f"\nAccount Updated: \n{self._output_account()}")
+        changes = {key: value for key, value in self.account.items() if key not in self._logged_account or self._logged_account[key] != value}
+        if changes:
+            self._logged_account = dict(self.account)
+            self.logger.info(f"\nAccount Updated: \n{self._output_account(changes)}")
     
-    def _output_account(self):
+    def _output_account(self, account: AccountDetails = None):
         string = ""
-        for key, value in self.account.items():
+        for key, value in (self.account if account is None else account).items():
             string += f" {key} : {value} \n"
         return string
     
@@ -5,6 +5,7 @@ from abc import ABC, abstractmethod
 
 from midas.order_book import OrderBook
 from midas.portfolio import PortfolioServer
+from midas.utils.latency import latency_tracker
 from midas.events import  SignalEvent, MarketEvent, TradeInstruction
 
 
@@ -32,6 +33,14 @@ class BaseStrategy(ABC):
         self.trade_id = 1
         self.historical_data = None
 
+    def get_state(self) -> dict:
+        """ State saved in engine checkpoints, override if the strategy holds objects that cannot be pickled. """
+        return dict(self.__dict__)
+
+    def set_state(self, state: dict):
+        """ Restores the state returned by get_state when resuming from a checkpoint. """
+        self.__dict__.update(state)
+
     @abstractmethod
     def prepare(self):
         """ Takes care of any initial set up needed. """
@@ -65,6 +74,11 @@ class BaseStrategy(ABC):
         """
         try:
             signal_event = SignalEvent(timestamp, trade_capital, trade_instructions)
+            if latency_tracker.enabled:
+                trades = {}
+                for trade in trade_instructions:
+                    trades.setdefault(trade.trade_id, []).append(trade.ticker)
+                latency_tracker.mark_signal(trades)
             self._event_queue.put(signal_event)
         except (ValueError, TypeError) as e:
             raise RuntimeError(f"Failed to create or queue SignalEvent due to input error: {e}") from e
@@ -146,12 +146,17 @@ class Option(Symbol):
     multiplier: int = None
     right: Right = None
     strike: float = None
+    underlying: str = None # ticker of the underlying symbol, required to price the option in a backtest
+    tickSize: float = None
 
-    def __init__(self, ticker: str, currency: Currency, exchange: Exchange,fees: float, lastTradeDateOrContractMonth: str, multiplier: int, right: Right, strike: float, data_ticker: str=None):
+    def __init__(self, ticker: str, currency: Currency, exchange: Exchange,fees: float, lastTradeDateOrContractMonth: str, multiplier: int, right: Right, strike: float, data_ticker: str=None, underlying: str=None, tickSize: float=0.01):
         self.lastTradeDateOrContractMonth = lastTradeDateOrContractMonth
         self.multiplier = multiplier
         self.right = right
         self.strike = strike
+        self.underlying = underlying
+        self.tickSize = tickSize
+        self.initialMargin = 0 # premium is paid in full
         super().__init__(ticker=ticker,data_ticker=data_ticker, secType=SecType.OPTION, currency=currency, exchange=exchange, fees=fees)
 
     def __post_init__(self):
@@ -164,12 +169,18 @@ class Option(Symbol):
             raise TypeError(f"right must be an instance of Right")
         if not isinstance(self.strike, (float,int)):
             raise TypeError(f"strike must be an int or float")
+        if self.underlying is not None and not isinstance(self.underlying, str):
+            raise TypeError(f"underlying must be a string or None")
+        if not isinstance(self.tickSize, (float,int)):
+            raise TypeError(f"tickSize must be a int or float")
         
         # Constraint Validation
         if self.multiplier <= 0:
             raise ValueError(f"multiplier must be greater than 0")
         if self.strike <= 0:
             raise ValueError(f"strike must be greater than 0")
+        if self.tickSize <= 0:
+            raise ValueError(f"tickSize must be greater than 0")
 
         super().__post_init__()
 
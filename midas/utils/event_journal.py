@@ -0,0 +1,75 @@
+import os
+import pickle
+import struct
+from typing import Iterator, List, Optional
+
+from midas.events import MarketEvent, SignalEvent, OrderEvent, ExecutionEvent
+
+EVENT_TYPES = [MarketEvent, SignalEvent, OrderEvent, ExecutionEvent] # index is the record's type code
+RECORD_HEADER = struct.Struct('<BI') # type code, payload length
+JOURNAL_MAGIC = b'MIDASJ1\n'
+
+class EventJournal:
+    """
+    Append-only binary log of the events dispatched by the EventController.
+
+    Each record is a type code and a length followed by the pickled event, so a reader can skip event types
+    it does not need without unpickling them.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.events_written = 0
+        self._file = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._file.write(JOURNAL_MAGIC)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def write(self, event):
+        type_code = EVENT_TYPES.index(type(event))
+        payload = pickle.dumps(event, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.write(RECORD_HEADER.pack(type_code, len(payload)))
+        self._file.write(payload)
+        self.events_written += 1
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def read_journal(path: str, event_types: Optional[List[type]] = None) -> Iterator:
+    """
+    Yields the journaled events in dispatch order.
+
+    Args:
+        path (str) : Journal file written by EventJournal.
+        event_types (List[type]) : Event classes to return, all events when None.
+    """
+    wanted = None if event_types is None else {EVENT_TYPES.index(event_type) for event_type in event_types}
+
+    with open(path, 'rb') as file:
+        if file.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+            raise ValueError(f"{path} is not an event journal.")
+
+        while True:
+            header = file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+
+            type_code, length = RECORD_HEADER.unpack(header)
+            if wanted is not None and type_code not in wanted:
+                file.seek(length, os.SEEK_CUR)
+                continue
+
+            payload = file.read(length)
+            if len(payload) < length: # truncated final record
+                return
+            yield pickle.loads(payload)
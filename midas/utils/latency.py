@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+class LatencyHistogram:
+    """ Latency histogram with fixed log2 spaced buckets, values in microseconds. """
+    EDGES = [2 ** i for i in range(27)] # 1us to ~67s, last bucket is overflow
+
+    def __init__(self):
+        self.counts = [0] * (len(self.EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, value_us: float):
+        self.counts[bisect.bisect_left(self.EDGES, value_us)] += 1
+        self.count += 1
+        self.total += value_us
+        self.min = value_us if self.min is None else min(self.min, value_us)
+        self.max = value_us if self.max is None else max(self.max, value_us)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """ Upper edge of the bucket containing the q quantile, q in decimal format. """
+        if self.count == 0:
+            return None
+
+        target = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return self.EDGES[i] if i < len(self.EDGES) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_us": round(self.total / self.count, 2) if self.count else None,
+            "min_us": self.min,
+            "max_us": self.max,
+            "p50_us": self.percentile(0.5),
+            "p90_us": self.percentile(0.9),
+            "p99_us": self.percentile(0.99),
+            "buckets": {edge: count for edge, count in zip(self.EDGES + ['inf'], self.counts) if count}
+        }
+
+class LatencyTracker:
+    """
+    Tick-to-trade latency along the live path, stamped with monotonic timestamps at every hop.
+
+    Hops are correlated by trade_id until placeOrder and by orderId afterwards :
+        realtimeBar -> set_signal -> OrderEvent -> placeOrder -> first orderStatus
+    Disabled by default, every mark is a no-op until enable() is called.
+    """
+    STAGES = ['bar_to_signal', 'signal_to_order', 'order_to_place', 'place_to_status', 'tick_to_trade']
+
+    def __init__(self, max_pending: int = 10000):
+        self.enabled = False
+        self.logger : logging.Logger = None
+        self.export_path = None
+        self.max_pending = max_pending
+
+        self.histograms : Dict[str, LatencyHistogram] = {stage: LatencyHistogram() for stage in self.STAGES}
+        self._last_market : Dict[str, int] = {} # symbol -> latest market data received
+        self._trades : Dict[int, Dict[str, int]] = OrderedDict() # trade_id -> {hop : timestamp_ns}
+        self._orders : Dict[int, tuple] = OrderedDict() # orderId -> (trade_id, placed_ns)
+        self._lock = threading.Lock()
+        self._export_timer : threading.Timer = None
+
+    @staticmethod
+    def now() -> int:
+        return time.perf_counter_ns()
+
+    def enable(self, logger: logging.Logger, export_interval: float = None, export_path: str = None):
+        """ Starts tracking, if export_interval is set the histograms are exported every export_interval seconds. """
+        self.logger = logger
+        self.export_path = export_path
+        self.enabled = True
+
+        if export_interval:
+            self._schedule_export(export_interval)
+
+    def disable(self):
+        self.enabled = False
+        if self._export_timer:
+            self._export_timer.cancel()
+            self._export_timer = None
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+            self._last_market.clear()
+            self._trades.clear()
+            self._orders.clear()
+
+    # -- Hops --
+    def mark_market(self, symbol: str, received_ns: int = None):
+        """ Market data for symbol received from the broker callback. """
+        if not self.enabled:
+            return
+        self._last_market[symbol] = received_ns or self.now()
+
+    def mark_signal(self, trades: Dict[int, List[str]]):
+        """ Signal set by the strategy, trade_id -> tickers of its legs. A trade is timed from the latest market data of its legs. """
+        if not self.enabled:
+            return
+
+        now = self.now()
+        with self._lock:
+            for trade_id, tickers in trades.items():
+                received = [self._last_market[ticker] for ticker in tickers if ticker in self._last_market]
+                market = max(received) if received else None
+                self._trades[trade_id] = {'market': market, 'signal': now}
+                self._record('bar_to_signal', market, now)
+            self._trim(self._trades)
+
+    def mark_order(self, trade_id: int):
+        """ OrderEvent created by the order manager, first leg only. """
+        if not self.enabled:
+            return
+
+        now = self.now()
+        with self._lock:
+            hops = self._trades.get(trade_id)
+            if hops is not None and 'order' not in hops:
+                hops['order'] = now
+                self._record('signal_to_order', hops['signal'], now)
+
+    def mark_order_placed(self, trade_id: int, orderId: int):
+        """ Order handed to the broker through placeOrder. """
+        if not self.enabled:
+            return
+
+        now = self.now()
+        with self._lock:
+            hops = self._trades.get(trade_id)
+            if hops is not None:
+                self._record('order_to_place', hops.get('order'), now)
+            self._orders[orderId] = (trade_id, now)
+            self._trim(self._orders)
+
+    def mark_order_status(self, orderId: int):
+        """ Order status received from the broker, only the first status of an order is recorded. """
+        if not self.enabled:
+            return
+
+        now = self.now()
+        with self._lock:
+            order = self._orders.pop(orderId, None)
+            if order is None:
+                return
+
+            trade_id, placed = order
+            self._record('place_to_status', placed, now)
+            hops = self._trades.get(trade_id)
+            if hops is not None:
+                self._record('tick_to_trade', hops.get('market'), now)
+
+    def _record(self, stage: str, start_ns: Optional[int], end_ns: int):
+        if start_ns is not None:
+            self.histograms[stage].record((end_ns - start_ns) / 1000)
+
+    def _trim(self, pending: OrderedDict):
+        while len(pending) > self.max_pending:
+            pending.popitem(last=False)
+
+    # -- Export --
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {stage: histogram.to_dict() for stage, histogram in self.histograms.items()}
+
+    def export(self):
+        """ Logs the per stage latency summary and writes the full histograms to export_path if set. """
+        snapshot = self.snapshot()
+
+        if self.logger:
+            string = ""
+            for stage, stats in snapshot.items():
+                string += f" {stage} : count={stats['count']} mean={stats['mean_us']}us p50={stats['p50_us']}us p99={stats['p99_us']}us max={stats['max_us']}us \n"
+            self.logger.info(f"\nLatency Statistics: \n{string}")
+
+        if self.export_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.export_path)), exist_ok=True)
+            with open(self.export_path, 'w') as file:
+                json.dump(snapshot, file, indent=2)
+
+        return snapshot
+
+    def _schedule_export(self, interval: float):
+        def run():
+            if not self.enabled:
+                return
+            try:
+                self.export()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Latency export failed : {e}")
+            self._schedule_export(interval)
+
+        self._export_timer = threading.Timer(interval, run)
+        self._export_timer.daemon = True
+        self._export_timer.start()
+
+# Shared tracker for the live path
+latency_tracker = LatencyTracker()
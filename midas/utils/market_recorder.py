@@ -0,0 +1,183 @@
+import os
+import glob
+import queue
+import struct
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+BAR_COLUMNS = ['timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume']
+BAR_DTYPES = {
+    'timestamp': np.dtype('<i8'),
+    'symbol': np.dtype('S32'),
+    'open': np.dtype('<f8'),
+    'high': np.dtype('<f8'),
+    'low': np.dtype('<f8'),
+    'close': np.dtype('<f8'),
+    'volume': np.dtype('<f8'),
+}
+BLOCK_MAGIC = b'MDRB'
+BLOCK_HEADER = struct.Struct('<4sI') # magic, row count
+ROW_SIZE = sum(dtype.itemsize for dtype in BAR_DTYPES.values())
+FILE_PREFIX = 'bars_'
+FILE_SUFFIX = '.mdr'
+
+class MarketDataRecorder:
+    """
+    Records live bars to append-only columnar files, one file per UTC day.
+
+    Each flush appends a block to the day's file, a header followed by every column as a contiguous array :
+        MDRB | n | timestamp int64[n] | symbol S32[n] | open f8[n] | high f8[n] | low f8[n] | close f8[n] | volume f8[n]
+    record() only enqueues the bar, buffering and disk writes happen on the recorder's own thread.
+    """
+    def __init__(self, directory: str, logger: logging.Logger = None, buffer_size: int = 1000, flush_interval: float = 5.0):
+        if not isinstance(buffer_size, int) or buffer_size <= 0:
+            raise ValueError("'buffer_size' must be a positive integer.")
+        if not isinstance(flush_interval, (int, float)) or flush_interval <= 0:
+            raise ValueError("'flush_interval' must be a positive number.")
+
+        self.directory = directory
+        self.logger = logger
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.skipped_symbols = set()
+
+        self._queue = queue.Queue()
+        self._buffer : List[tuple] = []
+        self._file = None
+        self._file_day : str = None
+        self._thread : threading.Thread = None
+        self._stop = object() # sentinel
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="MarketDataRecorder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Flushes all pending bars and closes the current file. """
+        if self._thread is None:
+            return
+        self._queue.put(self._stop)
+        self._thread.join()
+        self._thread = None
+
+    def record(self, symbol: str, timestamp: int, open: float, high: float, low: float, close: float, volume: float):
+        """ Called from the data callback thread, never blocks on disk or raises, bars of a symbol too wide to record are skipped. """
+        encoded = symbol.encode()
+        if len(encoded) > BAR_DTYPES['symbol'].itemsize:
+            if symbol not in self.skipped_symbols and self.logger:
+                self.logger.error(f"Market data recorder skips {symbol}, it exceeds the {BAR_DTYPES['symbol'].itemsize} bytes recorded per symbol.")
+            self.skipped_symbols.add(symbol)
+            return
+        self._queue.put((int(timestamp), encoded, open, high, low, close, volume))
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush()
+                continue
+
+            if item is self._stop:
+                self._flush()
+                self._close_file()
+                return
+
+            self._buffer.append(item)
+            if len(self._buffer) >= self.buffer_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+
+        rows, self._buffer = self._buffer, []
+        try:
+            # Rows are split on day boundaries so every block lands in its own day's file
+            days = [self._day(row[0]) for row in rows]
+            start = 0
+            for i in range(1, len(rows) + 1):
+                if i == len(rows) or days[i] != days[start]:
+                    self._write_block(days[start], rows[start:i])
+                    start = i
+            self.rows_written += len(rows)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Market data recorder failed to write {len(rows)} bars : {e}")
+
+    def _write_block(self, day: str, rows: List[tuple]):
+        if day != self._file_day:
+            self._close_file()
+            self._file = open(os.path.join(self.directory, f"{FILE_PREFIX}{day}{FILE_SUFFIX}"), 'ab')
+            self._file_day = day
+
+        columns = list(zip(*rows))
+        block = [BLOCK_HEADER.pack(BLOCK_MAGIC, len(rows))]
+        block.extend(np.asarray(column, dtype=BAR_DTYPES[name]).tobytes() for name, column in zip(BAR_COLUMNS, columns))
+        self._file.write(b''.join(block))
+        self._file.flush()
+
+    def _close_file(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            self._file_day = None
+
+    @staticmethod
+    def _day(timestamp: int) -> str:
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d')
+
+def read_recorded_file(path: str) -> Dict[str, np.ndarray]:
+    """ Reads every complete block of a recorded file, a truncated trailing block from an interrupted write is ignored. """
+    with open(path, 'rb') as file:
+        buffer = file.read()
+
+    blocks = {name: [] for name in BAR_COLUMNS}
+    offset = 0
+    while offset + BLOCK_HEADER.size <= len(buffer):
+        magic, count = BLOCK_HEADER.unpack_from(buffer, offset)
+        if magic != BLOCK_MAGIC:
+            raise ValueError(f"Corrupt block in {path} at offset {offset}.")
+
+        end = offset + BLOCK_HEADER.size + count * ROW_SIZE
+        if end > len(buffer):
+            break
+
+        offset += BLOCK_HEADER.size
+        for name in BAR_COLUMNS:
+            dtype = BAR_DTYPES[name]
+            blocks[name].append(np.frombuffer(buffer, dtype=dtype, count=count, offset=offset))
+            offset += count * dtype.itemsize
+
+    return {name: np.concatenate(arrays) if arrays else np.empty(0, dtype=BAR_DTYPES[name]) for name, arrays in blocks.items()}
+
+def recorded_files(directory: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[str]:
+    """ Recorded files in day order, optionally restricted to days within start_date and end_date (YYYY-MM-DD, inclusive). """
+    files = []
+    for path in sorted(glob.glob(os.path.join(directory, f"{FILE_PREFIX}*{FILE_SUFFIX}"))):
+        day = os.path.basename(path)[len(FILE_PREFIX):-len(FILE_SUFFIX)]
+        if (start_date and day < start_date[:10]) or (end_date and day > end_date[:10]):
+            continue
+        files.append(path)
+    return files
+
+def read_recorded_bars(directory: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> pd.DataFrame:
+    """
+    Loads the bars recorded in directory.
+
+    Returns:
+        pd.DataFrame : Columns timestamp (UNIX seconds), symbol, open, high, low, close, volume.
+    """
+    columns = [read_recorded_file(path) for path in recorded_files(directory, start_date, end_date)]
+    if not columns:
+        return pd.DataFrame({name: pd.Series(dtype=object if name == 'symbol' else BAR_DTYPES[name]) for name in BAR_COLUMNS})
+
+    data = {name: np.concatenate([column[name] for column in columns]) for name in BAR_COLUMNS}
+    data['symbol'] = np.char.decode(data['symbol']).astype(object)
+    return pd.DataFrame(data, columns=BAR_COLUMNS)
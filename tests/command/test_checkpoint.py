@@ -0,0 +1,150 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+from queue import Queue
+from unittest.mock import Mock
+
+from midas.order_book import OrderBook
+from midas.account_data import Trade
+from midas.strategies import BaseStrategy
+from midas.portfolio import PortfolioServer
+from midas.performance import PerformanceManager
+from midas.command import EventController, Mode
+from midas.command.checkpoint import Checkpointer
+from midas.gateways.backtest.dummy_broker import DummyBroker
+from midas.symbols.symbols import Equity, Currency, Exchange
+from midas.events import MarketEvent, BarData, MarketDataType, Action, MarketOrder
+
+class CheckpointStrategy(BaseStrategy):
+    def __init__(self, portfolio_server, order_book, logger, event_queue):
+        super().__init__(portfolio_server, order_book, logger, event_queue)
+        self.prices = np.zeros(1000)
+
+    def prepare(self):
+        pass
+
+    def handle_market_data(self):
+        pass
+
+    def _asset_allocation(self):
+        pass
+
+    def _entry_signal(self):
+        pass
+
+    def _exit_signal(self):
+        pass
+
+class TestCheckpointer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+        self.symbols_map = {'AAPL': Equity(ticker='AAPL', currency=Currency.USD, exchange=Exchange.NASDAQ, fees=0.1)}
+        self.trade = Trade(trade_id=1, leg_id=1, timestamp=1651500000, ticker='AAPL', quantity=10, price=100.5, cost=-1005.0, action='LONG', fees=1.0)
+        self.controller = self._engine()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _engine(self) -> EventController:
+        config = Mock()
+        config.mode = Mode.BACKTEST
+        config.event_queue = Queue()
+        config.logger = Mock()
+        config.order_book = OrderBook(MarketDataType.BAR)
+        config.portfolio_server = PortfolioServer(self.symbols_map, config.logger)
+        config.performance_manager = PerformanceManager(Mock(), config.logger, Mock())
+        config.dummy_broker = DummyBroker(self.symbols_map, config.event_queue, config.order_book, 100000, config.logger)
+        config.strategy = CheckpointStrategy(config.portfolio_server, config.order_book, config.logger, config.event_queue)
+        config.hist_data_client = Mock(current_date_index=-1, next_date=None)
+        return EventController(config)
+
+    def _trade(self, controller: EventController):
+        contract = self.symbols_map['AAPL'].contract
+        controller.order_book.on_market_data(MarketEvent(timestamp=1651500000, data={'AAPL': BarData(1651500000, 100.0, 101.0, 99.0, 100.5, 1000.0)}))
+        controller.dummy_broker.placeOrder(1651500000, 1, 1, Action.LONG, contract, MarketOrder(Action.LONG, 10))
+        controller.event_queue.get() # execution event
+        controller.portfolio_server.update_account_details(controller.dummy_broker.return_account())
+        controller.performance_manager.update_trades(self.trade)
+        controller.strategy.prices[:3] = [1.0, 2.0, 3.0]
+        controller.strategy.trade_id = 2
+        controller.hist_data_client.current_date_index = 41
+        controller.hist_data_client.next_date = 1651500000
+        controller.event_count = 120
+
+    def test_save_and_load(self):
+        self._trade(self.controller)
+        checkpointer = Checkpointer(self.directory)
+        path = checkpointer.save(self.controller)
+
+        restored = self._engine()
+        checkpointer.load(restored, path)
+
+        # Validation
+        contract = self.symbols_map['AAPL'].contract
+        self.assertEqual(restored.event_count, 120)
+        self.assertEqual(restored.hist_data_client.current_date_index, 41)
+        self.assertEqual(restored.hist_data_client.next_date, 1651500000)
+        self.assertEqual(restored.order_book.current_price('AAPL'), 100.5)
+        self.assertEqual(restored.dummy_broker.positions[contract]['quantity'], 10) # keyed by the running engine's contract
+        self.assertEqual(restored.dummy_broker.account, self.controller.dummy_broker.account)
+        self.assertEqual(restored.portfolio_server.capital, self.controller.portfolio_server.capital)
+        self.assertEqual(restored.performance_manager.trade_log.to_records(), [self.trade.to_dict()])
+
+        # Strategy state restored, shared components point at the running engine
+        self.assertEqual(restored.strategy.trade_id, 2)
+        self.assertEqual(restored.strategy.prices[:3].tolist(), [1.0, 2.0, 3.0])
+        self.assertIs(restored.strategy.order_book, restored.order_book)
+        self.assertIs(restored.strategy.logger, restored.logger)
+        restored.strategy.prices[0] = 5.0 # arrays restored from out-of-band buffers remain writable
+
+    def test_prune(self):
+        checkpointer = Checkpointer(self.directory, keep=2)
+        for count in [10, 20, 30]:
+            self.controller.event_count = count
+            checkpointer.save(self.controller)
+
+        # Validation
+        self.assertEqual([os.path.basename(path) for path in checkpointer.checkpoints()], ['checkpoint_000000000020.ckpt', 'checkpoint_000000000030.ckpt'])
+        self.assertEqual(checkpointer.latest(), os.path.join(self.directory, 'checkpoint_000000000030.ckpt'))
+
+    def test_should_checkpoint(self):
+        checkpointer = Checkpointer(self.directory, every_events=100, at_eod=True)
+        self.assertTrue(checkpointer.should_checkpoint(10, True))
+        self.assertFalse(checkpointer.should_checkpoint(99, False))
+        self.assertTrue(checkpointer.should_checkpoint(100, False))
+
+        checkpointer.last_event_count = 100
+        self.assertFalse(checkpointer.should_checkpoint(150, False))
+
+    def test_run_backtest_checkpoints_and_resumes(self):
+        checkpointer = Checkpointer(self.directory, every_events=1, at_eod=False)
+        self.controller.checkpointer = checkpointer
+        self.controller.broker_client = Mock()
+        self.controller.performance_manager.calculate_statistics = Mock()
+        self.controller.performance_manager.create_backtest = Mock()
+        self.controller.hist_data_client.data_stream.side_effect = [True, False]
+        self.controller.event_queue.put(MarketEvent(timestamp=1651500000, data={'AAPL': BarData(1651500000, 100.0, 101.0, 99.0, 100.5, 1000.0)}))
+
+        self.controller._run_backtest()
+        self.assertEqual(len(checkpointer.checkpoints()), 1)
+
+        # Resume a fresh engine from the checkpoint
+        restored = self._engine()
+        restored.checkpointer = Checkpointer(self.directory)
+        restored.broker_client = Mock()
+        restored.performance_manager.calculate_statistics = Mock()
+        restored.performance_manager.create_backtest = Mock()
+        restored.hist_data_client.data_stream.side_effect = [False]
+        restored._run_backtest()
+
+        self.assertEqual(restored.event_count, 1)
+        self.assertEqual(restored.order_book.current_price('AAPL'), 100.5)
+
+    def test_every_events_validation(self):
+        with self.assertRaisesRegex(ValueError, "'every_events' must be a positive integer or None."):
+            Checkpointer(self.directory, every_events=0)
+
+if __name__ == "__main__":
+    unittest.main()
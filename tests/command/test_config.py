@@ -273,6 +273,51 @@ class TestConfig(unittest.TestCase):
             # Validation
             self.config.logger.info.assert_called_once_with("Backtest data loaded.")
 
+    def test_load_backtest_data_recorded(self):
+        mode = Mode.BACKTEST
+        self.params.data_directory = "recorded"
+        
+        with ExitStack() as stack:
+            mock_setup = stack.enter_context(patch.object(Config, 'setup'))
+            self.config = Config(mode, self.params)
+            self.config.hist_data_client = Mock()
+            self.config.logger = Mock()
+            self.config.hist_data_client.get_recorded_data.return_value = True
+            for symbol in self.valid_symbols:
+                self.config.map_symbol(symbol)
+
+            # Test
+            self.config.load_backtest_data()
+
+            # Validation
+            self.config.hist_data_client.get_recorded_data.assert_called_once_with("recorded", [symbol.ticker for symbol in self.valid_symbols], self.params.test_start, self.params.test_end, self.params.missing_values_strategy)
+            self.assertFalse(self.config.hist_data_client.get_data.called)
+            self.config.logger.info.assert_called_once_with("Backtest data loaded.")
+
+    def test_load_backtest_data_fx(self):
+        mode = Mode.BACKTEST
+        self.params.base_currency = Currency.USD
+        symbols = self.valid_symbols + [Equity(ticker="SHOP", currency=Currency.CAD, exchange=Exchange.NASDAQ, fees=0.1)]
+
+        with ExitStack() as stack:
+            mock_setup = stack.enter_context(patch.object(Config, 'setup'))
+            self.config = Config(mode, self.params)
+            for symbol in symbols:
+                self.config.map_symbol(symbol)
+            self.config.portfolio_server = Mock()
+            self.config.performance_manager = Mock()
+            self.config.order_book = Mock()
+            self.config._set_backtest_environment()
+            self.config.hist_data_client = Mock()
+            self.config.logger = Mock()
+            self.config.hist_data_client.get_data.return_value = True
+
+            # Test
+            self.config.load_backtest_data()
+
+            # Validation
+            self.config.hist_data_client.get_data.assert_called_once_with([symbol.data_ticker for symbol in symbols] + ['CADUSD'], self.params.test_start, self.params.test_end, self.params.missing_values_strategy)
+
     def test_load_backtest_data_failure(self):
         mode = Mode.BACKTEST
         
@@ -2,14 +2,16 @@ import os
 import time
 import signal
 import unittest
+import tempfile
 import threading
 from queue import Queue
 from ibapi.order import Order
 from ibapi.contract import Contract
 from unittest.mock import Mock, patch
 
-from midas.account_data import Trade
 from midas.command import EventController, Mode
+from midas.gateways.backtest.broker_client import BrokerClient
+from midas.utils.event_journal import EventJournal, read_journal
 from midas.events import MarketEvent, OrderEvent, SignalEvent, ExecutionEvent, MarketOrder
 from midas.events import MarketData, BarData, QuoteData, OrderType, Action, TradeInstruction, ExecutionDetails
 
@@ -69,6 +71,8 @@ class TestController(unittest.TestCase):
         self.assertTrue(self.mock_config._run_backtest.current_day != None)
         self.assertTrue(self.mock_config.broker_client.eod_update.called)
         self.mock_config.order_book.on_market_data.assert_called_once_with(market_event)
+        self.mock_config.broker_client.process_resting_orders.assert_called_once()
+        self.mock_config.broker_client.check_margin_call.assert_called_once()
         self.mock_config.broker_client.update_equity_value.assert_called()
         self.mock_config.strategy.handle_market_data.assert_called()
 
@@ -119,7 +123,26 @@ class TestController(unittest.TestCase):
         self.event_controller._run_backtest()
 
         # Verify interactions
-        self.mock_config.broker_client.on_order.assert_called_once_with(order_event)
+        self.mock_config.broker_client.on_basket.assert_called_once_with([order_event])
+
+    def test_run_backtest_order_basket(self):
+        self.mock_config.mode = Mode.BACKTEST
+        self.event_controller = EventController(self.mock_config)
+        legs = [OrderEvent(1651500000, 6, 1, Action.LONG, Contract(), MarketOrder(Action.LONG, 10)),
+                OrderEvent(1651500000, 6, 2, Action.SHORT, Contract(), MarketOrder(Action.SHORT, 5))]
+        other = OrderEvent(1651500000, 7, 1, Action.LONG, Contract(), MarketOrder(Action.LONG, 1))
+
+        self.mock_config.hist_data_client.data_stream.side_effect = [True, False]
+        for event in legs + [other]:
+            self.event_controller.event_queue.put(event)
+
+        # Test
+        self.event_controller._run_backtest()
+
+        # Verify the legs of a trade are placed together
+        self.assertEqual(self.mock_config.broker_client.on_basket.call_args_list[0][0][0], legs)
+        self.assertEqual(self.mock_config.broker_client.on_basket.call_args_list[1][0][0], [other])
+        self.assertEqual(self.event_controller.event_count, 3)
 
     def test_run_execution_event(self):
         self.mock_config.mode = Mode.BACKTEST
@@ -162,6 +185,120 @@ class TestController(unittest.TestCase):
         self.assertFalse(self.mock_config.performance_manager.calculate_statistics.called)
         self.assertFalse(self.mock_config.performance_manager.create_backtest.called)
     
+    def test_run_backtest_journal(self):
+        self.mock_config.mode = Mode.BACKTEST
+        order_event = OrderEvent(timestamp=1651500000,
+                           trade_id=6,
+                           leg_id=2,
+                           action=Action.LONG,
+                           order=MarketOrder(Action.LONG,10),
+                           contract=Contract())
+
+        with tempfile.TemporaryDirectory() as directory:
+            journal_path = os.path.join(directory, 'journal.bin')
+            self.event_controller = EventController(self.mock_config, journal_path=journal_path)
+            self.mock_config.hist_data_client.data_stream.side_effect = [True, False]
+            self.event_controller.event_queue.put(order_event)
+
+            # Run the backtest
+            self.event_controller.run()
+
+            # Verify journal
+            events = list(read_journal(journal_path))
+            self.assertEqual(len(events), 1)
+            self.assertEqual(events[0].trade_id, 6)
+            self.assertEqual(events[0].order.quantity, 10)
+
+    def _write_replay_journal(self, path: str):
+        self.market_event = MarketEvent(timestamp=1651500000, data={'AAPL': BarData(1651500000, 100.0, 101.0, 99.0, 100.5, 1000.0)})
+        self.signal_event = SignalEvent(1651500000, 10000, [TradeInstruction('AAPL', OrderType.MARKET, Action.LONG, 1, 1, 0.5)])
+        self.order_event = OrderEvent(timestamp=1651500000, trade_id=1, leg_id=1, action=Action.LONG, contract=Contract(), order=MarketOrder(Action.LONG, 10))
+        self.execution_event = ExecutionEvent(timestamp=1651500000,
+                                              trade_details=ExecutionDetails(timestamp=1651500000, trade_id=1, leg_id=1, symbol='AAPL', quantity=10, price=100.51234, cost=-1005.0, action='BUY', fees=0.5),
+                                              action=Action.LONG,
+                                              contract=Contract())
+
+        with EventJournal(path) as journal:
+            for event in [self.market_event, self.signal_event, self.order_event, self.execution_event]:
+                journal.write(event)
+
+    def test_replay_broker_and_performance(self):
+        self.mock_config.mode = Mode.BACKTEST
+        self.event_controller = EventController(self.mock_config)
+
+        with tempfile.TemporaryDirectory() as directory:
+            journal_path = os.path.join(directory, 'journal.bin')
+            self._write_replay_journal(journal_path)
+
+            # Test
+            self.event_controller.replay(journal_path)
+
+        # Verify upstream components skipped, journaled executions replaced by the broker's own
+        self.assertFalse(self.mock_config.strategy.handle_market_data.called)
+        self.assertFalse(self.mock_config.order_manager.on_signal.called)
+        self.mock_config.order_book.on_market_data.assert_called_once()
+        self.mock_config.performance_manager.update_signals.assert_called_once()
+        self.mock_config.broker_client.on_basket.assert_called_once()
+        self.assertFalse(self.mock_config.broker_client.on_execution.called)
+        self.assertFalse(self.mock_config.performance_manager.update_trades.called)
+        self.mock_config.broker_client.liquidate_positions.assert_called_once()
+        self.mock_config.performance_manager.calculate_statistics.assert_called_once()
+        self.assertFalse(self.mock_config.performance_manager.create_backtest.called)
+
+    def test_replay_multi_leg_basket(self):
+        self.mock_config.mode = Mode.BACKTEST
+        mock_broker = Mock()
+        mock_broker.place_basket.return_value = [True, True]
+        self.mock_config.broker_client = BrokerClient(self.mock_config.event_queue, Mock(), Mock(), Mock(), mock_broker)
+        self.event_controller = EventController(self.mock_config)
+
+        aapl_contract, msft_contract = Contract(), Contract()
+        aapl_contract.symbol, msft_contract.symbol = 'AAPL', 'MSFT'
+        market_event = MarketEvent(timestamp=1651500000, data={'AAPL': BarData(1651500000, 100.0, 101.0, 99.0, 100.5, 1000.0)})
+        aapl_order = OrderEvent(timestamp=1651500000, trade_id=1, leg_id=1, action=Action.LONG, contract=aapl_contract, order=MarketOrder(Action.LONG, 10))
+        msft_order = OrderEvent(timestamp=1651500000, trade_id=1, leg_id=2, action=Action.SHORT, contract=msft_contract, order=MarketOrder(Action.SHORT, 5))
+
+        with tempfile.TemporaryDirectory() as directory:
+            journal_path = os.path.join(directory, 'journal.bin')
+            with EventJournal(journal_path) as journal:
+                for event in [market_event, aapl_order, msft_order]:
+                    journal.write(event)
+
+            # Test
+            with patch.object(BrokerClient, 'settle'), patch.object(BrokerClient, 'liquidate_positions'):
+                self.event_controller.replay(journal_path, ['broker'])
+
+        # Validation
+        mock_broker.place_basket.assert_called_once()
+        timestamp, trade_id, legs = mock_broker.place_basket.call_args.args
+        self.assertEqual((timestamp, trade_id), (1651500000, 1))
+        self.assertEqual([(leg_id, action, contract.symbol) for leg_id, action, contract, _ in legs], [(1, Action.LONG, 'AAPL'), (2, Action.SHORT, 'MSFT')])
+
+    def test_replay_strategy_regenerates_signals(self):
+        self.mock_config.mode = Mode.BACKTEST
+        self.event_controller = EventController(self.mock_config)
+
+        with tempfile.TemporaryDirectory() as directory:
+            journal_path = os.path.join(directory, 'journal.bin')
+            self._write_replay_journal(journal_path)
+
+            # Test
+            self.event_controller.replay(journal_path, ['strategy', 'order_manager'])
+
+        # Verify journaled signals are not fed back when the strategy is replayed
+        self.mock_config.strategy.handle_market_data.assert_called_once()
+        self.assertFalse(self.mock_config.order_manager.on_signal.called)
+
+    def test_replay_components_validation(self):
+        self.mock_config.mode = Mode.BACKTEST
+        self.event_controller = EventController(self.mock_config)
+
+        with self.assertRaisesRegex(ValueError, "'components' must be a list containing only"):
+            self.event_controller.replay('journal.bin', ['dummy_broker'])
+
+        with self.assertRaisesRegex(ValueError, "'components' must include 'broker' to replay 'performance'."):
+            self.event_controller.replay('journal.bin', ['performance'])
+
     # ---- Have to exit is Ctrl + C or will hang ---- 
     # def test_run_live(self):
     #     self.mock_config.mode = Mode.LIVE
@@ -167,6 +167,58 @@ class TestParameters(unittest.TestCase):
                             symbols=self.valid_symbols,
                             benchmark=self.valid_benchmark)
              
+    def test_data_directory_type_validation(self):
+        with self.assertRaisesRegex(TypeError,"data_directory must be of type str or None"):
+             Parameters(strategy_name=self.valid_strategy_name,
+                            capital=self.valid_capital,
+                            data_type=self.valid_data_type,
+                            missing_values_strategy=self.valid_missing_values_strategy,
+                            test_start=self.valid_test_start,
+                            test_end=self.valid_test_end,
+                            symbols=self.valid_symbols,
+                            data_directory=123)
+             
+    def test_margin_call_policy_validation(self):
+        with self.assertRaisesRegex(ValueError,"'margin_call_policy' must be one of"):
+             Parameters(strategy_name=self.valid_strategy_name,
+                            capital=self.valid_capital,
+                            data_type=self.valid_data_type,
+                            missing_values_strategy=self.valid_missing_values_strategy,
+                            test_start=self.valid_test_start,
+                            test_end=self.valid_test_end,
+                            symbols=self.valid_symbols,
+                            margin_call_policy='largest')
+             
+    def test_export_validation(self):
+        with self.assertRaisesRegex(TypeError,"export_directory must be of type str or None"):
+             Parameters(strategy_name=self.valid_strategy_name,
+                            capital=self.valid_capital,
+                            data_type=self.valid_data_type,
+                            test_start=self.valid_test_start,
+                            test_end=self.valid_test_end,
+                            symbols=self.valid_symbols,
+                            export_directory=123)
+
+        with self.assertRaisesRegex(ValueError,"'export_format' must be either 'parquet' or 'feather'"):
+             Parameters(strategy_name=self.valid_strategy_name,
+                            capital=self.valid_capital,
+                            data_type=self.valid_data_type,
+                            test_start=self.valid_test_start,
+                            test_end=self.valid_test_end,
+                            symbols=self.valid_symbols,
+                            export_format='csv')
+             
+    def test_base_currency_type_validation(self):
+        with self.assertRaisesRegex(TypeError,"base_currency must be of type Currency or None"):
+             Parameters(strategy_name=self.valid_strategy_name,
+                            capital=self.valid_capital,
+                            data_type=self.valid_data_type,
+                            missing_values_strategy=self.valid_missing_values_strategy,
+                            test_start=self.valid_test_start,
+                            test_end=self.valid_test_end,
+                            symbols=self.valid_symbols,
+                            base_currency='USD')
+             
     def test_train_end_type_validation(self):
         with self.assertRaisesRegex(TypeError,"train_end must be of type str or None"):
              Parameters(strategy_name=self.valid_strategy_name,
@@ -1,10 +1,14 @@
 import unittest
+from queue import Queue
 from ibapi.order import Order
 from contextlib import ExitStack
 from ibapi.contract import Contract
 from unittest.mock import Mock, patch
 
-from midas.gateways.backtest import BrokerClient
+from midas.order_book import OrderBook
+from midas.gateways.backtest import BrokerClient, DummyBroker
+from midas.events import MarketEvent, BarData, MarketDataType
+from midas.symbols.symbols import Equity, Currency, Exchange
 from midas.account_data import AccountDetails, EquityDetails
 from midas.events import OrderEvent, ExecutionEvent, Action, MarketOrder
 from midas.gateways.backtest.dummy_broker import PositionDetails, ExecutionDetails
@@ -31,9 +35,10 @@ class TestBrokerClient(unittest.TestCase):
         contract = Contract()
         
         # Test
-        with patch.object(self.mock_dummy_broker, 'placeOrder') as mock_method:
+        with patch.object(self.mock_dummy_broker, 'placeOrder', return_value=True) as mock_method, patch.object(self.broker_client, 'settle') as mock_settle:
             self.broker_client.handle_order(timestamp, trade_id, leg_id, action, contract, order)
             mock_method.assert_called_once() # check placeOrder called on a valid order event
+            mock_settle.assert_called_once() # filled on placement
 
     def test_on_order(self):
         self.valid_timestamp = 1651500000
@@ -55,6 +60,66 @@ class TestBrokerClient(unittest.TestCase):
             self.broker_client.on_order(event)
             mock_method.assert_called_once() 
         
+    def _run_basket(self, basket: bool):
+        symbols_map = {'AAPL': Equity(ticker='AAPL', currency=Currency.USD, exchange=Exchange.NASDAQ, fees=0.1),
+                       'MSFT': Equity(ticker='MSFT', currency=Currency.USD, exchange=Exchange.NASDAQ, fees=0.1)}
+        event_queue = Queue()
+        order_book = OrderBook(MarketDataType.BAR)
+        order_book.on_market_data(MarketEvent(timestamp=1651500000, data={'AAPL': BarData(1651500000, 100.0, 101.0, 99.0, 100.0, 1000.0),
+                                                                          'MSFT': BarData(1651500000, 200.0, 201.0, 199.0, 200.0, 1000.0)}))
+        performance_manager = Mock()
+        portfolio_server = Mock()
+        broker = DummyBroker(symbols_map, event_queue, order_book, 100000, self.mock_logger)
+        broker_client = BrokerClient(event_queue, self.mock_logger, portfolio_server, performance_manager, broker)
+
+        # Two legs of one signal
+        legs = [OrderEvent(1651500000, 1, 1, Action.LONG, symbols_map['AAPL'].contract, MarketOrder(Action.LONG, 10)),
+                OrderEvent(1651500000, 1, 2, Action.SHORT, symbols_map['MSFT'].contract, MarketOrder(Action.SHORT, 5))]
+        if basket:
+            broker_client.on_basket(legs)
+        else:
+            for leg in legs:
+                broker_client.on_order(leg)
+
+        while not event_queue.empty():
+            broker_client.on_execution(event_queue.get())
+
+        trades = [call[0][0] for call in performance_manager.update_trades.call_args_list]
+        return trades, portfolio_server, performance_manager
+
+    def test_on_basket(self):
+        trades, portfolio_server, performance_manager = self._run_basket(basket=True)
+        per_leg_trades, per_leg_portfolio_server, per_leg_performance_manager = self._run_basket(basket=False)
+
+        # Validation
+        self.assertEqual(trades, per_leg_trades) # identical trade records
+        self.assertEqual(len(trades), 2)
+        self.assertEqual(portfolio_server.update_account_details.call_count, 2) # construction + one settlement
+        self.assertEqual(per_leg_portfolio_server.update_account_details.call_count, 3)
+        self.assertEqual(portfolio_server.update_positions.call_count, 2) # both positions pushed once
+        self.assertEqual(performance_manager.update_equity.call_count, 1)
+        self.assertEqual(performance_manager.update_equity.call_args, per_leg_performance_manager.update_equity.call_args)
+
+    def test_on_basket_validation(self):
+        legs = [OrderEvent(1651500000, 1, 1, Action.LONG, Contract(), MarketOrder(Action.LONG, 10)),
+                OrderEvent(1651500000, 2, 1, Action.LONG, Contract(), MarketOrder(Action.LONG, 10))]
+
+        with self.assertRaisesRegex(ValueError, "'events' must all have the same trade_id."):
+            self.broker_client.on_basket(legs)
+
+        with self.assertRaisesRegex(ValueError, "'events' must be a non-empty list of OrderEvent instances."):
+            self.broker_client.on_basket([])
+
+    def test_process_resting_orders_settles_fills(self):
+        self.mock_dummy_broker.process_resting_orders.return_value = False
+        with patch.object(self.broker_client, 'settle') as settle:
+            self.broker_client.process_resting_orders()
+            self.assertFalse(settle.called)
+
+            self.mock_dummy_broker.process_resting_orders.return_value = True
+            self.broker_client.process_resting_orders()
+            settle.assert_called_once()
+
     def test_update_positions_valid(self):
         ticker = 'HEJ4'
         contract = Contract()
@@ -72,12 +137,25 @@ class TestBrokerClient(unittest.TestCase):
                 initial_margin = 1000,
                 unrealizedPnL=0
         )
-        self.mock_dummy_broker.return_positions.return_value = {contract :valid_position} # mock position
+        self.mock_dummy_broker.return_position_changes.return_value = {contract :(1, valid_position)} # mock position
 
         # Test portfolio server update postions shoudl be called on postion updates
         with patch.object(self.mock_portfolio_server, 'update_positions') as mock_method:
             self.broker_client.update_positions() # test 
             mock_method.assert_called_once()  # check called
+            self.assertEqual(mock_method.call_args[0][2], 1) # version passed through
+
+    def test_update_positions_closed(self):
+        contract = Contract()
+        contract.symbol = 'HEJ4'
+        self.mock_dummy_broker.return_position_changes.return_value = {contract :(3, None)} # closed position
+
+        # Test
+        self.broker_client.update_positions()
+
+        # Validation
+        self.mock_portfolio_server.remove_position.assert_called_once_with(contract, 3)
+        self.mock_portfolio_server.update_positions.assert_not_called()
 
     def test_update_trades_valid(self):
         aapl_contract = Contract()
@@ -165,18 +243,14 @@ class TestBrokerClient(unittest.TestCase):
                                action=action,
                                contract=contract)
         
-        with ExitStack() as stack:
-            mock_m1 = stack.enter_context(patch.object(self.broker_client,'update_positions'))
-            mock_m2 = stack.enter_context(patch.object(self.broker_client,'update_account'))
-            mock_m3 = stack.enter_context(patch.object(self.broker_client,'update_equity_value'))
-            mock_m4 = stack.enter_context(patch.object(self.broker_client,'update_trades'))
-
+        with patch.object(self.broker_client,'settle') as mock_m1:
             self.broker_client.on_execution(exec)
 
-            mock_m1.assert_called_once()
-            mock_m2.assert_called_once()
-            mock_m3.assert_called_once()
-            mock_m4.assert_called_once()
+            self.assertFalse(mock_m1.called) # settled by the call that filled the order
+            trade = self.mock_performance_manager.update_trades.call_args[0][0]
+            self.assertEqual(trade.trade_id, trade_id)
+            self.assertEqual(trade.leg_id, leg_id)
+            self.assertEqual(trade.price, fill_price)
 
     # Type/edge/integration
             
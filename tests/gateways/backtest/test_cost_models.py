@@ -0,0 +1,98 @@
+import unittest
+import numpy as np
+
+from midas.gateways.backtest.cost_models import FixedTickSlippage, SpreadSlippage, SquareRootImpact, PerUnitCommission, TieredCommission
+
+class TestCostModels(unittest.TestCase):
+    def setUp(self) -> None:
+        self.prices = np.array([100.0, 100.0, 50.0])
+        self.quantities = np.array([10.0, -400.0, 2500.0])
+        self.tick_sizes = np.array([0.01, 0.01, 0.25])
+        self.spreads = np.array([0.04, 0.10, 0.0])
+        self.volumes = np.array([1000.0, 10000.0, 0.0])
+
+    def test_fixed_tick_slippage(self):
+        model = FixedTickSlippage(2)
+
+        # Test
+        slippage = model.slippage_array(self.prices, self.quantities, self.tick_sizes, self.spreads, self.volumes)
+
+        # Validation
+        np.testing.assert_array_almost_equal(slippage, [0.02, 0.02, 0.5])
+        self.assertEqual(model.slippage(100.0, 10, 0.25), 0.5)
+
+    def test_spread_slippage(self):
+        model = SpreadSlippage(fraction=0.5, min_ticks=1)
+
+        # Test
+        slippage = model.slippage_array(self.prices, self.quantities, self.tick_sizes, self.spreads, self.volumes)
+
+        # Validation
+        np.testing.assert_array_almost_equal(slippage, [0.02, 0.05, 0.25]) # no spread on the last, floored at a tick
+
+    def test_square_root_impact(self):
+        model = SquareRootImpact(coefficient=1.0, volatility=0.02)
+
+        # Test
+        slippage = model.slippage_array(self.prices, self.quantities, self.tick_sizes, self.spreads, self.volumes)
+
+        # Validation
+        expected = [0.02 * 100 * np.sqrt(0.01), 0.02 * 100 * np.sqrt(0.04), 0.02 * 50] # unknown volume is full participation
+        np.testing.assert_array_almost_equal(slippage, expected)
+
+    def test_scalar_matches_batch(self):
+        for model in [FixedTickSlippage(1), SpreadSlippage(0.5, 1), SquareRootImpact(0.5, 0.03, 1)]:
+            batch = model.slippage_array(self.prices, self.quantities, self.tick_sizes, self.spreads, self.volumes)
+            single = [model.slippage(*args) for args in zip(self.prices, self.quantities, self.tick_sizes, self.spreads, self.volumes)]
+            np.testing.assert_array_almost_equal(batch, single)
+
+    def test_fill_prices(self):
+        model = FixedTickSlippage(1)
+
+        # Test
+        fill_prices = model.fill_prices(self.prices, self.quantities, self.tick_sizes)
+
+        # Validation
+        np.testing.assert_array_almost_equal(fill_prices, [100.01, 99.99, 50.25]) # buys pay, sells give up
+
+    def test_per_unit_commission(self):
+        model = PerUnitCommission()
+
+        # Test
+        commission = model.commission_array(self.quantities, self.prices, np.array([0.1, 0.1, 0.05]))
+
+        # Validation
+        np.testing.assert_array_almost_equal(commission, [1.0, 40.0, 125.0])
+        self.assertAlmostEqual(model.commission(-90, 0.0, 0.1), 9.0)
+
+    def test_tiered_commission(self):
+        model = TieredCommission([(0, 0.01), (500, 0.005)], minimum=1.0, maximum_rate=0.01)
+
+        # Test
+        commission = model.commission_array(np.array([10.0, -400.0, 2500.0, 0.0]), np.array([100.0, 100.0, 50.0, 10.0]), np.zeros(4))
+
+        # Validation
+        expected = [1.0,                    # minimum
+                    4.0,                    # first tier only
+                    500 * 0.01 + 2000 * 0.005,
+                    0.0]                    # no order, no minimum
+        np.testing.assert_array_almost_equal(commission, expected)
+        self.assertAlmostEqual(model.commission(10, 0.5), 0.05) # capped at 1% of notional
+
+    # Type and Constraint Validation
+    def test_tiered_commission_validation(self):
+        with self.assertRaisesRegex(ValueError, "'tiers' must start at 0 units and be strictly increasing."):
+            TieredCommission([(100, 0.01), (50, 0.005)])
+
+        with self.assertRaisesRegex(ValueError, "'tiers' must be a non-empty list of \\(units, rate\\) tuples."):
+            TieredCommission([])
+
+    def test_slippage_validation(self):
+        with self.assertRaisesRegex(ValueError, "'ticks' must be a non-negative number."):
+            FixedTickSlippage(-1)
+
+        with self.assertRaisesRegex(ValueError, "'volatility' must be a non-negative number."):
+            SquareRootImpact(volatility=-0.1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import tempfile
 import pandas as pd
 from queue import Queue
 from datetime import datetime
@@ -7,6 +8,7 @@ from pandas.testing import assert_frame_equal
 
 from midas.events import MarketEvent, BarData
 from midas.gateways.backtest import DataClient
+from midas.utils.market_recorder import MarketDataRecorder
 
 #TODO: edge cases
 
@@ -143,6 +145,31 @@ class TestDataClient(unittest.TestCase):
         unique_timestamps  = self.unique_dates = self.valid_processed_data['timestamp'].unique().tolist()
         self.assertEqual(self.data_client.unique_timestamps,unique_timestamps)
     
+    def test_get_recorded_data(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = MarketDataRecorder(directory)
+            recorder.start()
+            for row in self.valid_processed_data.itertuples():
+                recorder.record(row.symbol, row.timestamp, row.open, row.high, row.low, row.close, row.volume)
+            recorder.record('ZC.n.0', self.valid_unique_timestamps[0], 1.0, 1.0, 1.0, 1.0, 1.0) # duplicate replaced below
+            recorder.record('ZC.n.0', self.valid_unique_timestamps[0], 802.0, 804.0, 797.0, 797.5, 12195.0)
+            recorder.record('XX', self.valid_unique_timestamps[0], 1.0, 1.0, 1.0, 1.0, 1.0) # not requested
+            recorder.stop()
+
+            # Test
+            response = self.data_client.get_recorded_data(directory, self.valid_tickers)
+
+        # Validation
+        self.assertTrue(response)
+        expected = self.valid_processed_data[list(self.data_client.data.columns)].sort_values(by=['timestamp', 'symbol']).reset_index(drop=True)
+        result = self.data_client.data.sort_values(by=['timestamp', 'symbol']).reset_index(drop=True)
+        assert_frame_equal(result, expected, check_dtype=True)
+        self.assertEqual(self.data_client.unique_timestamps, self.valid_unique_timestamps)
+
+    def test_get_recorded_data_empty(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertFalse(self.data_client.get_recorded_data(directory, self.valid_tickers))
+
     def test_get_latest_data(self):
         self.data_client.data = self.valid_processed_data
         self.data_client.unique_timestamps = self.valid_unique_timestamps
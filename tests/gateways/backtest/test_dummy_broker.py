@@ -1,14 +1,19 @@
 import unittest
+import numpy as np
+from queue import Queue
 from ibapi.order import Order
 from contextlib import ExitStack
 from ibapi.contract import Contract
 from unittest.mock import Mock, patch
 
 from midas.order_book import OrderBook
-from midas.account_data import AccountDetails, EquityDetails
-from midas.symbols.symbols import Symbol, Future, Equity, Currency,Exchange, Future
-from midas.events import ExecutionEvent, Action, BaseOrder, TradeInstruction, MarketOrder
+from midas.account_data import AccountDetails, EquityDetails, Trade
+from midas.performance import PerformanceManager
+from midas.symbols.symbols import Symbol, Future, Equity, Option, Right, Currency,Exchange, Future
+from midas.events import ExecutionEvent, Action, BaseOrder, TradeInstruction, MarketOrder, LimitOrder, StopLoss, MarketEvent, BarData, MarketDataType
 from midas.gateways.backtest.dummy_broker import DummyBroker, PositionDetails, ExecutionDetails
+from midas.gateways.backtest.cost_models import SquareRootImpact, TieredCommission
+from midas.gateways.backtest.options import VolatilitySurface
 
 #TODO : edge cases/ integration
 
@@ -70,6 +75,28 @@ class TestDummyClient(unittest.TestCase):
         self.assertIsInstance(commission, (float,int))
         self.assertEqual(commission, self.valid_symbols_map['HEJ4'].fees * quantity)
 
+    def test_cost_models(self):
+        order_book = OrderBook(MarketDataType.BAR)
+        order_book.on_market_data(MarketEvent(timestamp=1655000000, data={'AAPL': BarData(1655000000, 100.0, 101.0, 99.0, 100.0, 400.0)}))
+        broker = DummyBroker(self.valid_symbols_map, self.mock_event_queue, order_book, self.valid_capital, self.mock_logger,
+                             slippage_model=SquareRootImpact(coefficient=1.0, volatility=0.02),
+                             commission_model=TieredCommission([(0, 0.01), (50, 0.005)], minimum=1.0))
+        contract = Contract()
+        contract.symbol = 'AAPL'
+        contract.secType = 'STK'
+
+        # Test
+        fill_price = broker._fill_price(contract, Action.LONG, 100)
+        commission = broker._calculate_commission_fees(contract, 100, fill_price)
+
+        # Validation
+        self.assertAlmostEqual(fill_price, 100 + 0.02 * 100 * (100 / 400) ** 0.5) # participation in the bar's volume
+        self.assertAlmostEqual(commission, 1.0) # 0.75 over the tiers, raised to the minimum
+        
+    def test_cost_model_type_validation(self):
+        with self.assertRaisesRegex(TypeError, "'slippage_model' must be an instance of SlippageModel."):
+            DummyBroker(self.valid_symbols_map, self.mock_event_queue, self.mock_order_book, self.valid_capital, self.mock_logger, slippage_model=2)
+
     def test_fill_price_future(self):
         contract = Contract()
         contract.symbol = 'HEJ4'
@@ -544,6 +571,23 @@ class TestDummyClient(unittest.TestCase):
         self.dummy_broker._update_positions(contract,exit_action,exit_quantity, exit_price)
         self.assertEqual(self.dummy_broker.positions, {}) # position should be removed
 
+    def test_return_position_changes(self):
+        contract = Contract()
+        contract.symbol = 'HEJ4'
+
+        # Test
+        self.dummy_broker._update_positions(contract, Action.SHORT, -100, 90)
+        self.dummy_broker._update_positions(contract, Action.SHORT, -50, 91)
+        changes = self.dummy_broker.return_position_changes()
+
+        # Validation
+        self.assertEqual(changes, {contract: (2, self.dummy_broker.positions[contract])})
+        self.assertEqual(self.dummy_broker.return_position_changes(), {}) # nothing changed since
+
+        # Closed position returned as None with a newer version
+        self.dummy_broker._update_positions(contract, Action.COVER, 150, 90)
+        self.assertEqual(self.dummy_broker.return_position_changes(), {contract: (3, None)})
+
     def test_update_positions_add_to_OLD(self):
         # Variables
         ticker = 'HEJ4'
@@ -705,7 +749,7 @@ class TestDummyClient(unittest.TestCase):
         self.mock_order_book.current_prices.return_value = {ticker1: 90.9, ticker2: 9.9}
         with patch.object(self.dummy_broker, '_future_position_value', return_value = 500) as mock_future_method:
             with patch.object(self.dummy_broker, '_equity_position_value', return_value = 500) as mock_equity_method:
-                position_value = self.dummy_broker._calculate_portfolio_value()
+                position_value = self.dummy_broker._revalue_portfolio()
                 self.assertEqual(position_value, 500 * 2) # 2 positions with mock postiosn values of 500
 
                 # Equity
@@ -723,6 +767,31 @@ class TestDummyClient(unittest.TestCase):
 
         # self.assertEqual(position_value, expected_value)
 
+    def test_portfolio_value_incremental(self):
+        aapl_contract = Contract()
+        aapl_contract.symbol = 'AAPL'
+        aapl_contract.secType = 'STK'
+        he_contract = Contract()
+        he_contract.symbol = 'HEJ4'
+        he_contract.secType = 'FUT'
+
+        # Positions opened through fills
+        self.dummy_broker._update_positions(aapl_contract, Action.LONG, 10, 50)
+        self.dummy_broker._update_positions(he_contract, Action.SHORT, -10, 50)
+
+        # Only changed prices are applied, valuation matches a full revaluation
+        for prices in [{'AAPL': 90.9, 'HEJ4': 9.9}, {'HEJ4': 12.5}, {'AAPL': 88.0}]:
+            self.mock_order_book.updated_prices.return_value = prices
+            position_value = self.dummy_broker._calculate_portfolio_value()
+
+        self.mock_order_book.current_prices.return_value = {'AAPL': 88.0, 'HEJ4': 12.5}
+        self.assertAlmostEqual(position_value, self.dummy_broker._revalue_portfolio(), places=6)
+
+        # Closing a position removes it from the valuation
+        self.dummy_broker._update_positions(aapl_contract, Action.SELL, -10, 88.0)
+        self.mock_order_book.updated_prices.return_value = {}
+        self.assertAlmostEqual(self.dummy_broker._calculate_portfolio_value(), self.dummy_broker._revalue_portfolio(), places=6)
+
     def test_update_equity_value(self):
         self.mock_order_book.last_updated = 1651500000
         portfolio_value = 1000000
@@ -824,6 +893,158 @@ class TestDummyClient(unittest.TestCase):
         self.dummy_broker.account['FullInitMarginReq'] = 200
         self.assertTrue(self.dummy_broker.check_margin_call() == False)
 
+    def _margin_call_broker(self, policy: str, event_queue: Queue = None):
+        symbols_map = {'HEJ4': Future(ticker='HEJ4', currency=Currency.USD, exchange=Exchange.CME, fees=0.1, lastTradeDateOrContractMonth='202412', multiplier=400, tickSize=0.0025, initialMargin=4000),
+                       'ZCN4': Future(ticker='ZCN4', currency=Currency.USD, exchange=Exchange.CME, fees=0.1, lastTradeDateOrContractMonth='202407', multiplier=50, tickSize=0.0025, initialMargin=3000)}
+        order_book = OrderBook(MarketDataType.BAR)
+        order_book.on_market_data(MarketEvent(timestamp=1655000000, data={'HEJ4': BarData(1655000000, 100.0, 100.0, 100.0, 100.0, 1000.0),
+                                                                          'ZCN4': BarData(1655000000, 400.0, 400.0, 400.0, 400.0, 1000.0)}))
+        broker = DummyBroker(symbols_map, event_queue or self.mock_event_queue, order_book, 25000, self.mock_logger, margin_call_policy=policy)
+        broker.placeOrder(1655000000, 1, 1, Action.LONG, symbols_map['HEJ4'].contract, MarketOrder(Action.LONG, 2)) # 8000 margin
+        broker.placeOrder(1655000000, 2, 1, Action.LONG, symbols_map['ZCN4'].contract, MarketOrder(Action.LONG, 4)) # 12000 margin
+
+        # HEJ4 drops 10, about 8000 of intraday losses breach the 20000 requirement by about 3000
+        order_book.on_market_data(MarketEvent(timestamp=1655000060, data={'HEJ4': BarData(1655000060, 90.0, 90.0, 90.0, 90.0, 1000.0)}))
+        broker._update_account_equity_value()
+        return broker, symbols_map
+
+    def test_check_margin_call_intraday(self):
+        broker, symbols_map = self._margin_call_broker(None)
+        self.assertAlmostEqual(broker.account['FullAvailableFunds'], 25000 - 0.6) # losses not marked yet
+
+        # Test
+        self.assertTrue(broker.check_margin_call())
+
+        # Validation
+        quantities = {contract.symbol: position['quantity'] for contract, position in broker.positions.items()}
+        self.assertEqual(quantities, {'HEJ4': 2, 'ZCN4': 4}) # no policy, nothing liquidated
+
+    def test_margin_call_largest_margin(self):
+        broker, symbols_map = self._margin_call_broker('largest_margin')
+
+        # Test
+        self.assertTrue(broker.check_margin_call())
+
+        # Validation
+        quantities = {contract.symbol: position['quantity'] for contract, position in broker.positions.items()}
+        self.assertEqual(quantities, {'HEJ4': 2, 'ZCN4': 2})
+        liquidation = broker.last_trade[symbols_map['ZCN4'].contract]
+        self.assertEqual(liquidation['quantity'], -2)
+        self.assertEqual(liquidation['action'], 'SELL') # partial reduction is an exit
+        self.assertEqual((liquidation['trade_id'], liquidation['leg_id']), (2, 1)) # booked to the trade holding the position
+        self.assertAlmostEqual(broker.account['FullAvailableFunds'], 25000 - 0.6 - 0.2 - 0.5) # fees and the slippage on the 2 exited contracts
+        self.assertFalse(broker.check_margin_call())
+
+    def test_margin_call_worst_pnl(self):
+        broker, symbols_map = self._margin_call_broker('worst_pnl')
+
+        # Test
+        self.assertTrue(broker.check_margin_call())
+
+        # Validation
+        quantities = {contract.symbol: position['quantity'] for contract, position in broker.positions.items()}
+        self.assertEqual(quantities, {'HEJ4': 1, 'ZCN4': 4})
+        self.assertEqual(broker.account['FullInitMarginReq'], 16000)
+        self.assertFalse(broker.check_margin_call())
+
+    def test_margin_call_pro_rata(self):
+        broker, symbols_map = self._margin_call_broker('pro_rata')
+
+        # Test
+        self.assertTrue(broker.check_margin_call())
+
+        # Validation
+        quantities = {contract.symbol: position['quantity'] for contract, position in broker.positions.items()}
+        self.assertEqual(quantities, {'HEJ4': 1, 'ZCN4': 3})
+        legs = sorted((trade['trade_id'], trade['leg_id'], trade['action']) for trade in broker.last_trade.values())
+        self.assertEqual(legs, [(1, 1, 'SELL'), (2, 1, 'SELL')])
+        self.assertFalse(broker.check_margin_call())
+
+    def test_margin_call_then_liquidate_positions(self):
+        event_queue = Queue()
+        broker, symbols_map = self._margin_call_broker('largest_margin', event_queue)
+        broker.check_margin_call()
+        broker.liquidate_positions()
+
+        fills = [event_queue.get().trade_details for _ in range(event_queue.qsize())] + list(broker.last_trade.values())
+        performance_manager = PerformanceManager(Mock(), self.mock_logger, Mock())
+        for fill in fills:
+            performance_manager.update_trades(Trade(trade_id=fill['trade_id'], leg_id=fill['leg_id'], timestamp=fill['timestamp'], ticker=fill['symbol'],
+                                                    quantity=fill['quantity'], price=fill['price'], cost=fill['cost'], action=fill['action'], fees=fill['fees']))
+
+        # Test
+        aggregated = performance_manager._aggregate_trades()
+
+        # Validation, every trade is entered and exited under its own id
+        self.assertEqual(aggregated['trade_id'].tolist(), [1, 2])
+        self.assertTrue((aggregated['entry_value'] != 0).all())
+        self.assertTrue((aggregated['exit_value'] != 0).all())
+        self.assertTrue(np.isfinite(aggregated['gain/loss']).all())
+
+    def test_margin_call_policy_validation(self):
+        with self.assertRaises(ValueError):
+            DummyBroker(self.valid_symbols_map, self.mock_event_queue, self.mock_order_book, self.valid_capital, self.mock_logger, margin_call_policy='random')
+
+    def test_option_position(self):
+        symbols_map = {'AAPL': Equity(ticker='AAPL', currency=Currency.USD, exchange=Exchange.NASDAQ, fees=0.1),
+                       'AAPLC180': Option(ticker='AAPLC180', currency=Currency.USD, exchange=Exchange.NASDAQ, fees=0.1, lastTradeDateOrContractMonth='20240621',
+                                          multiplier=100, right=Right.CALL, strike=180.0, underlying='AAPL')}
+        order_book = OrderBook(MarketDataType.BAR)
+        order_book.on_market_data(MarketEvent(timestamp=1709251200, data={'AAPL': BarData(1709251200, 175.0, 175.0, 175.0, 175.0, 1000.0)}))
+        broker = DummyBroker(symbols_map, self.mock_event_queue, order_book, self.valid_capital, self.mock_logger, slippage_factor=0,
+                             volatility_surfaces={'AAPL': VolatilitySurface.flat(0.3)}, risk_free_rate=0.05)
+        contract = symbols_map['AAPLC180'].contract
+
+        # Test
+        broker.placeOrder(1709251200, 1, 1, Action.LONG, contract, MarketOrder(Action.LONG, 2))
+        premium = broker.option_book.price('AAPLC180', 1709251200, {'AAPL': 175.0})
+
+        # Validation
+        self.assertAlmostEqual(broker.account['FullAvailableFunds'], self.valid_capital - 0.2 - premium * 100 * 2)
+        self.assertAlmostEqual(broker.account['NetLiquidation'], round(self.valid_capital - 0.2, 2), places=2) # bought at the model price
+        self.assertAlmostEqual(broker.greeks['AAPL']['delta'], 200 * broker.option_book.evaluate(1709251200, {'AAPL': 175.0})['delta'][0])
+
+        # Underlying moves, the option is repriced off it
+        order_book.on_market_data(MarketEvent(timestamp=1709254800, data={'AAPL': BarData(1709254800, 180.0, 180.0, 180.0, 180.0, 1000.0)}))
+        broker._update_account_equity_value()
+        new_premium = broker.option_book.price('AAPLC180', 1709254800, {'AAPL': 180.0})
+        self.assertGreater(new_premium, premium)
+        self.assertAlmostEqual(broker.valuation.value, new_premium * 100 * 2)
+        self.assertAlmostEqual(broker._revalue_portfolio(), new_premium * 100 * 2)
+
+    def test_base_currency(self):
+        symbols_map = {'HEJ4': Future(ticker='HEJ4', currency=Currency.USD, exchange=Exchange.CME, fees=0.1, lastTradeDateOrContractMonth='202412', multiplier=400, tickSize=0.0025, initialMargin=4000),
+                       'SXF4': Future(ticker='SXF4', currency=Currency.CAD, exchange=Exchange.CME, fees=0.1, lastTradeDateOrContractMonth='202412', multiplier=200, tickSize=0.1, initialMargin=3000)}
+        order_book = OrderBook(MarketDataType.BAR)
+        order_book.on_market_data(MarketEvent(timestamp=1, data={'HEJ4': BarData(1, 100.0, 100.0, 100.0, 100.0, 1000.0),
+                                                                 'SXF4': BarData(1, 1200.0, 1200.0, 1200.0, 1200.0, 1000.0),
+                                                                 'CADUSD': BarData(1, 0.75, 0.75, 0.75, 0.75, 1000.0)}))
+        broker = DummyBroker(symbols_map, self.mock_event_queue, order_book, self.valid_capital, self.mock_logger, slippage_factor=0, base_currency=Currency.USD)
+
+        # Test
+        broker.placeOrder(1, 1, 1, Action.LONG, symbols_map['SXF4'].contract, MarketOrder(Action.LONG, 2))
+        broker.placeOrder(1, 2, 1, Action.LONG, symbols_map['HEJ4'].contract, MarketOrder(Action.LONG, 1))
+
+        # Validation
+        self.assertAlmostEqual(broker.account['FullAvailableFunds'], self.valid_capital - 0.2 * 0.75 - 0.1) # CAD fees converted
+        self.assertAlmostEqual(broker.account['FullInitMarginReq'], 3000 * 2 * 0.75 + 4000)
+
+        # The CAD future and the rate move
+        order_book.on_market_data(MarketEvent(timestamp=2, data={'SXF4': BarData(2, 1210.0, 1210.0, 1210.0, 1210.0, 1000.0),
+                                                                 'CADUSD': BarData(2, 0.8, 0.8, 0.8, 0.8, 1000.0)}))
+        broker._update_account_equity_value()
+        self.assertAlmostEqual(broker.account['NetLiquidation'], round(self.valid_capital - 0.25 + 10 * 200 * 2 * 0.8, 2))
+        self.assertAlmostEqual(broker.account['FullInitMarginReq'], 3000 * 2 * 0.8 + 4000)
+        self.assertAlmostEqual(broker._revalue_portfolio(), broker.valuation.value)
+
+        broker.mark_to_market()
+        broker.placeOrder(2, 1, 1, Action.SELL, symbols_map['SXF4'].contract, MarketOrder(Action.SELL, -2))
+        trade = broker.last_trade[symbols_map['SXF4'].contract]
+        self.assertAlmostEqual(broker.account['FullAvailableFunds'], self.valid_capital - 0.25 + 3200 - 0.2 * 0.8)
+        self.assertEqual(trade['price'], 1210.0) # quoted in CAD
+        self.assertEqual(trade['cost'], round(1210.0 * -2 * 200 * 0.8, 2)) # accounted in USD
+        self.assertEqual(trade['fees'], round(0.2 * 0.8, 4))
+
     def test_liquidate_positions(self):
         # Position 1
         ticker1 = 'AAPL'
@@ -980,6 +1201,80 @@ class TestDummyClient(unittest.TestCase):
             self.assertTrue(mock_update_trades.called)
             self.assertTrue(mock_set_execution.called)
 
+    def _resting_order_broker(self):
+        order_book = OrderBook(MarketDataType.BAR)
+        order_book.on_market_data(MarketEvent(timestamp=1655000000, data={'AAPL': BarData(1655000000, 100.0, 101.0, 99.0, 100.0, 1000.0)}))
+        broker = DummyBroker(self.valid_symbols_map, self.mock_event_queue, order_book, self.valid_capital, self.mock_logger, self.valid_slippage_factor)
+        contract = Contract()
+        contract.symbol = 'AAPL'
+        contract.secType = 'STK'
+        return broker, order_book, contract
+
+    def test_place_order_resting(self):
+        broker, order_book, contract = self._resting_order_broker()
+
+        with patch.object(broker, '_execute_order') as mock_execute_order:
+            broker.placeOrder(1655000000, 1, 1, Action.LONG, contract, LimitOrder(Action.LONG, 10, 95))
+            broker.placeOrder(1655000000, 2, 1, Action.SELL, contract, StopLoss(Action.SELL, 10, 90))
+
+            # Validation
+            self.assertFalse(mock_execute_order.called)
+            self.assertEqual(len(broker.resting_orders['AAPL']), 2)
+
+    def test_place_order_marketable_limit(self):
+        broker, order_book, contract = self._resting_order_broker()
+
+        with patch.object(broker, '_execute_order') as mock_execute_order:
+            broker.placeOrder(1655000000, 1, 1, Action.LONG, contract, LimitOrder(Action.LONG, 10, 101))
+
+            # Validation
+            fill_price = mock_execute_order.call_args[0][6]
+            self.assertEqual(fill_price, 101) # capped at the limit, slippage would have given 102
+            self.assertNotIn('AAPL', broker.resting_orders)
+
+    def test_process_resting_orders(self):
+        broker, order_book, contract = self._resting_order_broker()
+        broker.placeOrder(1655000000, 1, 1, Action.LONG, contract, LimitOrder(Action.LONG, 10, 95))
+        broker.placeOrder(1655000000, 2, 1, Action.SELL, contract, StopLoss(Action.SELL, 10, 97))
+        broker.placeOrder(1655000000, 3, 1, Action.LONG, contract, LimitOrder(Action.LONG, 10, 80))
+
+        # Next bar gaps down through the buy limit and trades through the sell stop
+        order_book.on_market_data(MarketEvent(timestamp=1655000005, data={'AAPL': BarData(1655000005, 94.0, 98.0, 93.0, 96.0, 1000.0)}))
+
+        with patch.object(broker, '_execute_order') as mock_execute_order:
+            filled = broker.process_resting_orders()
+
+            # Validation
+            self.assertTrue(filled)
+            fills = {call[0][1]: call[0][6] for call in mock_execute_order.call_args_list}
+            self.assertEqual(fills, {1: 94.0, 2: 94.0 - self.valid_slippage_factor}) # limit at the open, stop at the open with slippage
+            self.assertEqual(mock_execute_order.call_args_list[0][0][0], 1655000005)
+            self.assertEqual(len(broker.resting_orders['AAPL']), 1)
+
+    def test_place_basket(self):
+        broker, order_book, contract = self._resting_order_broker()
+        legs = [(1, Action.LONG, contract, MarketOrder(Action.LONG, 10)),
+                (2, Action.LONG, contract, LimitOrder(Action.LONG, 10, 80))]
+
+        with patch.object(broker, '_update_account_equity_value') as mock_equity_value:
+            filled = broker.place_basket(1655000000, 1, legs)
+
+            # Validation
+            self.assertEqual(filled, [True, False])
+            mock_equity_value.assert_called_once() # revalued once for the basket
+            self.assertEqual(broker.positions[contract]['quantity'], 10)
+            self.assertEqual(broker.last_trade[contract]['leg_id'], 1)
+            self.assertEqual(len(broker.resting_orders['AAPL']), 1)
+
+    def test_cancel_resting_orders(self):
+        broker, order_book, contract = self._resting_order_broker()
+        broker.placeOrder(1655000000, 1, 1, Action.LONG, contract, LimitOrder(Action.LONG, 10, 95))
+
+        cancelled = broker.cancel_resting_orders(1)
+
+        self.assertEqual([order.trade_id for order in cancelled], [1])
+        self.assertEqual(len(broker.resting_orders['AAPL']), 0)
+
     # Type and Constraint Validation
     def test_slippage_adjust_price(self):
         tick_size = 1
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from unittest.mock import Mock
+
+from midas.gateways.backtest.fx import FxRates, fx_ticker
+from midas.symbols.symbols import Future, Equity, Currency, Exchange
+
+class TestFxRates(unittest.TestCase):
+    def setUp(self) -> None:
+        self.symbols_map = {'HEJ4': Future(ticker='HEJ4', currency=Currency.USD, exchange=Exchange.CME, fees=0.1, lastTradeDateOrContractMonth='202412', multiplier=400, tickSize=0.0025, initialMargin=4000),
+                            'SHOP': Equity(ticker='SHOP', currency=Currency.CAD, exchange=Exchange.NASDAQ, fees=0.1),
+                            'AAPL': Equity(ticker='AAPL', currency=Currency.USD, exchange=Exchange.NASDAQ, fees=0.1)}
+        self.fx = FxRates(self.symbols_map, Currency.USD)
+        self.order_book = Mock()
+        self.order_book.current_price.side_effect = lambda ticker: {'CADUSD': 0.75}.get(ticker)
+
+    def test_currencies(self):
+        self.assertEqual(self.fx.currencies, [Currency.USD, Currency.CAD]) # base first
+        self.assertEqual(self.fx.tickers, {Currency.CAD: 'CADUSD'})
+        np.testing.assert_array_equal(self.fx.symbol_code, [0, 1, 0])
+
+    def test_update(self):
+        previous = self.fx.update(1, self.order_book)
+
+        # Validation
+        np.testing.assert_array_equal(previous, [1.0, 1.0])
+        self.assertEqual(self.fx.rate(Currency.CAD), 0.75)
+        np.testing.assert_array_equal(self.fx.symbol_rates(), [1.0, 0.75, 1.0])
+
+    def test_update_cached_per_timestamp(self):
+        self.fx.update(1, self.order_book)
+        self.order_book.current_price.side_effect = lambda ticker: 0.8
+
+        # Test
+        self.assertIsNone(self.fx.update(1, self.order_book)) # same timestamp, the order book is not read again
+        self.assertEqual(self.order_book.current_price.call_count, 1)
+        self.assertIsNotNone(self.fx.update(2, self.order_book))
+        self.assertEqual(self.fx.rate(Currency.CAD), 0.8)
+
+    def test_unchanged_rate(self):
+        rates = self.fx.symbol_rates()
+        self.fx.update(1, self.order_book)
+        symbol_rates = self.fx.symbol_rates()
+
+        # Test
+        self.assertIsNone(self.fx.update(2, self.order_book))
+
+        # Validation
+        self.assertIsNot(rates, symbol_rates)
+        self.assertIs(self.fx.symbol_rates(), symbol_rates) # gathered once per rate change
+
+    def test_missing_fx_bar(self):
+        self.order_book.current_price.side_effect = lambda ticker: None
+        self.assertIsNone(self.fx.update(1, self.order_book))
+        self.assertEqual(self.fx.rate(Currency.CAD), 1.0)
+
+    def test_custom_tickers(self):
+        fx = FxRates(self.symbols_map, Currency.CAD, {Currency.USD: 'USD.CAD'})
+        self.assertEqual(fx.tickers, {Currency.USD: 'USD.CAD'})
+        self.assertEqual(fx_ticker(Currency.USD, Currency.CAD), 'USDCAD')
+
+    # Type Validation
+    def test_base_currency_type(self):
+        with self.assertRaisesRegex(TypeError, "'base_currency' must be of type Currency enum."):
+            FxRates(self.symbols_map, 'USD')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import math
+import unittest
+import numpy as np
+from datetime import datetime, timezone
+
+from midas.symbols.symbols import Option, Future, Equity, Right, Currency, Exchange
+from midas.gateways.backtest.options import norm_cdf, option_values, implied_volatility, expiry_timestamp, VolatilitySurface, OptionBook
+
+class TestOptionPricing(unittest.TestCase):
+    def setUp(self) -> None:
+        self.underlying = np.array([100.0, 100.0, 95.0, 110.0])
+        self.strike = np.array([100.0, 100.0, 105.0, 100.0])
+        self.time = np.array([0.5, 0.5, 0.25, 1.0])
+        self.volatility = np.array([0.2, 0.2, 0.35, 0.15])
+        self.is_call = np.array([True, False, True, False])
+
+    def test_norm_cdf(self):
+        x = np.linspace(-6, 6, 241)
+        expected = np.array([0.5 * (1 + math.erf(value / math.sqrt(2))) for value in x])
+        np.testing.assert_allclose(norm_cdf(x), expected, atol=1e-7)
+
+    def test_black_scholes_reference(self):
+        values = option_values(100.0, 100.0, 1.0, 0.05, 0.05, 0.2, True)
+        self.assertAlmostEqual(values['price'], 10.4506, places=4) # textbook at-the-money call
+
+    def test_put_call_parity(self):
+        rate, carry = 0.03, 0.01
+        calls = option_values(self.underlying, self.strike, self.time, rate, carry, self.volatility, True, greeks=False)['price']
+        puts = option_values(self.underlying, self.strike, self.time, rate, carry, self.volatility, False, greeks=False)['price']
+
+        # Validation
+        parity = self.underlying * np.exp((carry - rate) * self.time) - self.strike * np.exp(-rate * self.time)
+        np.testing.assert_allclose(calls - puts, parity, atol=1e-6)
+
+    def test_greeks_finite_differences(self):
+        rate, carry = 0.02, 0.0 # Black-76
+        values = option_values(self.underlying, self.strike, self.time, rate, carry, self.volatility, self.is_call)
+        price = lambda s, t, v: option_values(s, self.strike, t, rate, carry, v, self.is_call, greeks=False)['price']
+
+        # Validation, steps are wide enough that the cdf approximation error does not dominate
+        h = 1e-2
+        np.testing.assert_allclose(values['delta'], (price(self.underlying + h, self.time, self.volatility) - price(self.underlying - h, self.time, self.volatility)) / (2 * h), atol=1e-4)
+        np.testing.assert_allclose(values['gamma'], (price(self.underlying + 1, self.time, self.volatility) - 2 * values['price'] + price(self.underlying - 1, self.time, self.volatility)), atol=1e-3)
+        np.testing.assert_allclose(values['vega'], (price(self.underlying, self.time, self.volatility + 1e-3) - price(self.underlying, self.time, self.volatility - 1e-3)) / 2e-3, rtol=1e-4)
+        np.testing.assert_allclose(values['theta'], -(price(self.underlying, self.time + 1e-3, self.volatility) - price(self.underlying, self.time - 1e-3, self.volatility)) / 2e-3, rtol=1e-3)
+
+    def test_expired_options(self):
+        values = option_values(np.array([110.0, 90.0]), 100.0, 0.0, 0.05, 0.05, 0.2, np.array([True, True]))
+
+        # Validation
+        np.testing.assert_array_equal(values['price'], [10.0, 0.0])
+        np.testing.assert_array_equal(values['delta'], [1.0, 0.0])
+        np.testing.assert_array_equal(values['gamma'], [0.0, 0.0])
+
+    def test_implied_volatility(self):
+        prices = option_values(self.underlying, self.strike, self.time, 0.03, 0.03, self.volatility, self.is_call, greeks=False)['price']
+
+        # Test
+        volatility = implied_volatility(prices, self.underlying, self.strike, self.time, 0.03, 0.03, self.is_call)
+
+        # Validation
+        np.testing.assert_allclose(volatility, self.volatility, atol=1e-6)
+
+    def test_implied_volatility_out_of_bounds(self):
+        volatility = implied_volatility(np.array([5.0, 150.0]), 100.0, 80.0, 0.5, 0.0, 0.0, True)
+        self.assertTrue(np.all(np.isnan(volatility))) # below intrinsic value and above the underlying
+
+    def test_expiry_timestamp(self):
+        self.assertEqual(expiry_timestamp('20240412'), int(datetime(2024, 4, 13, tzinfo=timezone.utc).timestamp()))
+        self.assertEqual(expiry_timestamp('202406'), int(datetime(2024, 6, 22, tzinfo=timezone.utc).timestamp())) # third Friday is the 21st
+
+class TestVolatilitySurface(unittest.TestCase):
+    def test_volatility(self):
+        surface = VolatilitySurface([0.25, 1.0], [np.array([90.0, 110.0]), np.array([90.0, 110.0])], [np.array([0.30, 0.20]), np.array([0.20, 0.20])])
+
+        # Test
+        volatility = surface.volatility(np.array([0.25, 0.25, 1.0, 0.5, 2.0]), np.array([100.0, 80.0, 100.0, 90.0, 90.0]))
+
+        # Validation
+        expected_mid = math.sqrt(((2 / 3) * 0.09 * 0.25 + (1 / 3) * 0.04 * 1.0) / 0.5) # linear in total variance
+        np.testing.assert_allclose(volatility, [0.25, 0.30, 0.20, expected_mid, 0.20])
+
+    def test_from_prices(self):
+        strikes = np.array([90.0, 100.0, 110.0, 90.0, 100.0, 110.0])
+        times = np.array([0.25, 0.25, 0.25, 1.0, 1.0, 1.0])
+        volatilities = np.array([0.28, 0.25, 0.23, 0.24, 0.22, 0.21])
+        is_call = strikes >= 100
+        prices = option_values(100.0, strikes, times, 0.01, 0.0, volatilities, is_call, greeks=False)['price']
+
+        # Test
+        surface = VolatilitySurface.from_prices(prices, 100.0, strikes, times, 0.01, 0.0, is_call)
+
+        # Validation
+        np.testing.assert_allclose(surface.volatility(times, strikes), volatilities, atol=1e-6)
+
+class TestOptionBook(unittest.TestCase):
+    def setUp(self) -> None:
+        self.symbols_map = {'HEN4': Future(ticker='HEN4', currency=Currency.USD, exchange=Exchange.CME, fees=0.1, lastTradeDateOrContractMonth='202407', multiplier=400, tickSize=0.0025, initialMargin=4000),
+                            'AAPL': Equity(ticker='AAPL', currency=Currency.USD, exchange=Exchange.NASDAQ, fees=0.1),
+                            'HEN4C100': Option(ticker='HEN4C100', currency=Currency.USD, exchange=Exchange.CME, fees=0.1, lastTradeDateOrContractMonth='20240612',
+                                               multiplier=400, right=Right.CALL, strike=100.0, underlying='HEN4'),
+                            'AAPLP180': Option(ticker='AAPLP180', currency=Currency.USD, exchange=Exchange.NASDAQ, fees=0.1, lastTradeDateOrContractMonth='20240621',
+                                               multiplier=100, right=Right.PUT, strike=180.0, underlying='AAPL')}
+        self.timestamp = int(datetime(2024, 3, 1, tzinfo=timezone.utc).timestamp())
+        self.option_book = OptionBook(self.symbols_map, {'AAPL': VolatilitySurface.flat(0.3)}, risk_free_rate=0.05, default_volatility=0.25)
+
+    def test_evaluate(self):
+        values = self.option_book.evaluate(self.timestamp, {'HEN4': 98.0, 'AAPL': 175.0})
+
+        # Validation
+        time = (self.option_book.expiry - self.timestamp) / (365 * 24 * 60 * 60)
+        expected_black76 = option_values(98.0, 100.0, time[0], 0.05, 0.0, 0.25, True)['price'] # futures underlying, default volatility
+        expected_black_scholes = option_values(175.0, 180.0, time[1], 0.05, 0.05, 0.3, False)['price'] # equity underlying, its surface
+        np.testing.assert_allclose(values['price'], [expected_black76, expected_black_scholes])
+
+    def test_evaluate_cached(self):
+        first = self.option_book.evaluate(self.timestamp, {'HEN4': 98.0, 'AAPL': 175.0})
+        self.assertIs(self.option_book.evaluate(self.timestamp, {'HEN4': 98.0, 'AAPL': 175.0}), first)
+        self.assertIsNot(self.option_book.evaluate(self.timestamp, {'HEN4': 99.0, 'AAPL': 175.0}), first)
+
+    def test_unpriced_underlying(self):
+        prices = self.option_book.prices(self.timestamp, {'AAPL': 175.0})
+        self.assertEqual(list(prices), ['AAPLP180'])
+        self.assertIsNone(self.option_book.price('HEN4C100', self.timestamp, {'AAPL': 175.0}))
+
+    def test_portfolio_greeks(self):
+        values = self.option_book.evaluate(self.timestamp, {'HEN4': 98.0, 'AAPL': 175.0})
+
+        # Test
+        greeks = self.option_book.portfolio_greeks(np.array([2.0, -3.0]), self.timestamp, {'HEN4': 98.0, 'AAPL': 175.0})
+
+        # Validation
+        self.assertAlmostEqual(greeks['HEN4']['delta'], 2 * 400 * values['delta'][0])
+        self.assertAlmostEqual(greeks['AAPL']['vega'], -3 * 100 * values['vega'][1])
+
+    def test_calibrate(self):
+        time = (self.option_book.expiry[1] - self.timestamp) / (365 * 24 * 60 * 60)
+        price = option_values(175.0, 180.0, time, 0.05, 0.05, 0.4, False, greeks=False)['price']
+
+        # Test
+        self.option_book.calibrate('AAPL', self.timestamp, 175.0, {'AAPLP180': float(price)})
+
+        # Validation
+        self.assertAlmostEqual(self.option_book.price('AAPLP180', self.timestamp, {'AAPL': 175.0, 'HEN4': 98.0}), float(price), places=6)
+
+    # Type and Constraint Validation
+    def test_option_without_underlying(self):
+        symbols_map = {'AAPLP180': Option(ticker='AAPLP180', currency=Currency.USD, exchange=Exchange.NASDAQ, fees=0.1, lastTradeDateOrContractMonth='20240621',
+                                          multiplier=100, right=Right.PUT, strike=180.0)}
+        with self.assertRaisesRegex(ValueError, "Option AAPLP180 has no underlying."):
+            OptionBook(symbols_map)
+
+if __name__ == "__main__":
+    unittest.main()
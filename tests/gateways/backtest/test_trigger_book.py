@@ -0,0 +1,63 @@
+import unittest
+from ibapi.contract import Contract
+
+from midas.events import Action, LimitOrder, StopLoss, MarketOrder
+from midas.gateways.backtest.trigger_book import TriggerBook, RestingOrder
+
+class TestTriggerBook(unittest.TestCase):
+    def setUp(self) -> None:
+        self.contract = Contract()
+        self.contract.symbol = 'AAPL'
+        self.trigger_book = TriggerBook()
+
+    def _resting(self, trade_id: int, action: Action, order) -> RestingOrder:
+        return RestingOrder(1651500000, trade_id, 1, action, self.contract, order)
+
+    def test_triggered_limits(self):
+        self.trigger_book.add(self._resting(1, Action.LONG, LimitOrder(Action.LONG, 10, 95)))
+        self.trigger_book.add(self._resting(2, Action.LONG, LimitOrder(Action.LONG, 10, 90)))
+        self.trigger_book.add(self._resting(3, Action.SELL, LimitOrder(Action.SELL, 10, 105)))
+        self.trigger_book.add(self._resting(4, Action.SELL, LimitOrder(Action.SELL, 10, 110)))
+
+        # Test
+        fills = self.trigger_book.triggered(buy_high=106, buy_low=94, sell_high=106, sell_low=94)
+
+        # Validation
+        self.assertEqual([order.trade_id for order in fills], [1, 3])
+        self.assertEqual(len(self.trigger_book), 2)
+
+    def test_triggered_stops(self):
+        self.trigger_book.add(self._resting(1, Action.LONG, StopLoss(Action.LONG, 10, 105)))
+        self.trigger_book.add(self._resting(2, Action.LONG, StopLoss(Action.LONG, 10, 120)))
+        self.trigger_book.add(self._resting(3, Action.SELL, StopLoss(Action.SELL, 10, 95)))
+        self.trigger_book.add(self._resting(4, Action.SELL, StopLoss(Action.SELL, 10, 80)))
+
+        # Test
+        fills = self.trigger_book.triggered(buy_high=106, buy_low=94, sell_high=106, sell_low=94)
+
+        # Validation
+        self.assertEqual([order.trade_id for order in fills], [1, 3])
+        self.assertEqual(self.trigger_book.triggered(buy_high=106, buy_low=94, sell_high=106, sell_low=94), [])
+
+    def test_time_priority(self):
+        for trade_id in [1, 2, 3]:
+            self.trigger_book.add(self._resting(trade_id, Action.LONG, LimitOrder(Action.LONG, 10, 95)))
+
+        fills = self.trigger_book.triggered(buy_high=100, buy_low=90, sell_high=100, sell_low=90)
+        self.assertEqual([order.trade_id for order in fills], [1, 2, 3])
+
+    def test_cancel(self):
+        self.trigger_book.add(self._resting(1, Action.LONG, LimitOrder(Action.LONG, 10, 95)))
+        self.trigger_book.add(self._resting(2, Action.LONG, LimitOrder(Action.LONG, 10, 95)))
+
+        cancelled = self.trigger_book.cancel(1)
+
+        self.assertEqual([order.trade_id for order in cancelled], [1])
+        self.assertEqual(len(self.trigger_book), 1)
+
+    def test_market_order_validation(self):
+        with self.assertRaisesRegex(ValueError, "cannot rest in the trigger book"):
+            self.trigger_book.add(self._resting(1, Action.LONG, MarketOrder(Action.LONG, 10)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import numpy as np
+from unittest.mock import Mock
+
+from midas.gateways.backtest.fx import FxRates
+from midas.gateways.backtest.valuation import PortfolioValuation
+from midas.symbols.symbols import Future, Equity, Currency, Exchange
+
+class TestPortfolioValuation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.symbols_map = {'HEJ4' : Future(ticker='HEJ4',
+                                            currency=Currency.USD,
+                                            exchange=Exchange.CME,
+                                            fees=0.1,
+                                            lastTradeDateOrContractMonth='202412',
+                                            multiplier=400,
+                                            tickSize=0.0025,
+                                            initialMargin=4000),
+                            'AAPL' : Equity(ticker="AAPL", 
+                                            currency=Currency.USD, 
+                                            exchange=Exchange.NASDAQ, 
+                                            fees= 0.10)}
+        self.valuation = PortfolioValuation(self.symbols_map)
+
+    def test_update_prices(self):
+        self.valuation.update_position('AAPL', 10, 50, 50)
+        self.valuation.update_position('HEJ4', -2, 100 * 400, 100)
+
+        value = self.valuation.update_prices({'AAPL': 55, 'HEJ4': 98})
+
+        # Validation
+        expected_value = 10 * 55 + ((98 * 400) - (100 * 400)) * -2
+        self.assertAlmostEqual(value, expected_value)
+
+    def test_update_prices_unknown_ticker(self):
+        self.valuation.update_position('AAPL', 10, 50, 50)
+        self.assertEqual(self.valuation.update_prices({'MSFT': 300}), 500)
+
+    def test_incremental_matches_revalue(self):
+        rng = np.random.default_rng(0)
+        self.valuation.update_position('AAPL', 7, 101.3, 101.3)
+        self.valuation.update_position('HEJ4', 3, 85.1 * 400, 85.1)
+
+        for _ in range(1000):
+            ticker = 'AAPL' if rng.random() < 0.5 else 'HEJ4'
+            self.valuation.update_prices({ticker: float(rng.uniform(50, 150))})
+
+        incremental = self.valuation.value
+        self.assertAlmostEqual(incremental, self.valuation.revalue(), places=6)
+
+    def test_position_closed(self):
+        self.valuation.update_position('HEJ4', 3, 85.1 * 400, 85.1)
+        self.valuation.update_position('HEJ4', 0, 0)
+        self.assertEqual(self.valuation.update_prices({'HEJ4': 90}), 0)
+
+class TestPortfolioValuationFx(unittest.TestCase):
+    def setUp(self) -> None:
+        self.symbols_map = {'HEJ4' : Future(ticker='HEJ4', currency=Currency.USD, exchange=Exchange.CME, fees=0.1, lastTradeDateOrContractMonth='202412', multiplier=400, tickSize=0.0025, initialMargin=4000),
+                            'SXF4' : Future(ticker='SXF4', currency=Currency.CAD, exchange=Exchange.CME, fees=0.1, lastTradeDateOrContractMonth='202412', multiplier=200, tickSize=0.1, initialMargin=3000),
+                            'SHOP' : Equity(ticker='SHOP', currency=Currency.CAD, exchange=Exchange.NASDAQ, fees=0.1)}
+        self.valuation = PortfolioValuation(self.symbols_map, FxRates(self.symbols_map, Currency.USD))
+        self.order_book = Mock()
+
+    def _set_rate(self, timestamp: int, rate: float):
+        self.order_book.current_price.side_effect = lambda ticker: rate
+        return self.valuation.update_fx(timestamp, self.order_book)
+
+    def test_update_prices(self):
+        self._set_rate(1, 0.75)
+        self.valuation.update_position('SHOP', 10, 100, 100)
+        self.valuation.update_position('SXF4', 2, 1200 * 200, 1200)
+        self.valuation.update_position('HEJ4', 1, 100 * 400, 100)
+
+        # Test
+        value = self.valuation.update_prices({'SHOP': 110, 'SXF4': 1210, 'HEJ4': 101})
+
+        # Validation
+        expected_value = 0.75 * (10 * 110 + 2 * 10 * 200) + 400
+        self.assertAlmostEqual(value, expected_value)
+        self.assertAlmostEqual(self.valuation.futures_value, 0.75 * 4000 + 400)
+
+    def test_rate_change(self):
+        self._set_rate(1, 0.75)
+        self.valuation.update_position('SHOP', 10, 100, 100)
+        self.valuation.update_position('HEJ4', 1, 100 * 400, 101)
+        self.valuation.update_prices({'HEJ4': 101})
+
+        # Test
+        self.assertTrue(self._set_rate(2, 0.8))
+        self.assertFalse(self._set_rate(2, 0.9)) # cached for the timestamp
+
+        # Validation
+        self.assertAlmostEqual(self.valuation.value, 0.8 * 1000 + 400)
+        self.assertAlmostEqual(self.valuation.value, self.valuation.revalue())
+
+    def test_incremental_matches_revalue(self):
+        rng = np.random.default_rng(0)
+        self.valuation.update_position('SHOP', 7, 101.3, 101.3)
+        self.valuation.update_position('SXF4', -3, 1185.1 * 200, 1185.1)
+        self.valuation.update_position('HEJ4', 3, 85.1 * 400, 85.1)
+
+        for timestamp in range(1000):
+            if rng.random() < 0.2:
+                self._set_rate(timestamp, float(rng.uniform(0.7, 0.8)))
+            ticker = ['SHOP', 'SXF4', 'HEJ4'][rng.integers(3)]
+            self.valuation.update_prices({ticker: float(rng.uniform(50, 150))})
+
+        incremental = self.valuation.value, self.valuation.futures_value
+        self.assertAlmostEqual(incremental[0], self.valuation.revalue(), places=6)
+        self.assertAlmostEqual(incremental[1], self.valuation.futures_value, places=6)
+
+    def test_margin_requirement(self):
+        self._set_rate(1, 0.75)
+        self.valuation.update_position('SXF4', -2, 1200 * 200, 1200)
+        self.valuation.update_position('HEJ4', 1, 100 * 400, 100)
+        self.valuation.update_position('SHOP', 10, 100, 100)
+        self.assertAlmostEqual(self.valuation.margin_requirement(), 0.75 * 6000 + 4000)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ from ibapi.contract import Contract
 from unittest.mock import Mock, patch
 
 from midas.gateways.live import BrokerClient
+from midas.gateways.live.id_allocator import IdAllocator
 from midas.events import OrderEvent, Action, BaseOrder, MarketOrder
 
 #TODO : Edge Cases
@@ -26,16 +27,17 @@ class TestBrokerClient(unittest.TestCase):
                                             clientId=1,
                                             ib_account= "U1234567")
         self.broker_client.app = Mock()
+        self.broker_client.app.id_allocator = IdAllocator()
 
     # Basic Validation
     def test_get_valid_id(self):
         id = 10
         
-        self.broker_client.app.next_valid_order_id = id
+        self.broker_client.app.id_allocator.sync(id)
         current_id = self.broker_client._get_valid_id()
 
         self.assertEqual(current_id, id)
-        self.assertEqual(self.broker_client.app.next_valid_order_id, id+1)
+        self.assertEqual(self.broker_client._get_valid_id(), id+1)
 
     def test_is_connected(self):
         # isConnected checks app's connection status
@@ -80,12 +82,12 @@ class TestBrokerClient(unittest.TestCase):
         id = 10
         self.valid_order = Order()
         self.valid_contract = Contract()
-        self.broker_client.app.next_valid_order_id = id
+        self.broker_client.app.id_allocator.sync(id)
 
         with patch.object(self.broker_client.app, 'placeOrder') as mock_method:
             self.broker_client.handle_order(self.valid_contract, self.valid_order)
             mock_method.assert_called_once_with(orderId=id, contract=self.valid_contract, order=self.valid_order)
-            self.assertEqual(self.broker_client.app.next_valid_order_id, id+1)
+            self.assertEqual(self.broker_client._get_valid_id(), id+1)
 
     # Type Validation
     def test_on_order_valueerror(self):
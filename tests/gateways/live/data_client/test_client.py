@@ -5,6 +5,7 @@ from ibapi.contract import Contract
 from unittest.mock import Mock, patch
 
 from midas.gateways.live import DataClient
+from midas.gateways.live.id_allocator import IdAllocator
 from midas.events import OrderEvent, ExecutionEvent, Action, MarketDataType
 
 #TODO: edge cases
@@ -23,17 +24,18 @@ class TestDataClient(unittest.TestCase):
                                             ib_account= "U1234567")
         self.data_client.app = Mock()
         self.data_client.app.reqId_to_symbol_map = {}
+        self.data_client.app.id_allocator = IdAllocator()
 
 
     # Basic Validation
     def test_get_valid_id(self):
         id = 10
         # test 
-        self.data_client.app.next_valid_order_id = id # mock next valid id
+        self.data_client.app.id_allocator.sync(id) # mock next valid id
         current_id = self.data_client._get_valid_id()
         # validate
         self.assertEqual(current_id, id)
-        self.assertEqual(self.data_client.app.next_valid_order_id, id+1)
+        self.assertEqual(self.data_client._get_valid_id(), id+1)
 
     def test_is_connected(self):
         # isConnected checks app's connection status
@@ -1,8 +1,12 @@
+import time
+import tempfile
 import unittest
+from concurrent.futures import Future
 from unittest.mock import Mock, patch
 
 from midas.events import BarData, MarketEvent
 from midas.gateways.live.data_client.wrapper import DataApp
+from midas.utils.market_recorder import MarketDataRecorder
 
 # TODO: edge cases
 class TestDataApp(unittest.TestCase):
@@ -46,6 +50,24 @@ class TestDataApp(unittest.TestCase):
 
         self.assertTrue(self.data_app.validate_contract_event.is_set())
 
+    def test_contract_request_future(self):
+        future = Future()
+        self.data_app.contract_requests[10] = future
+
+        self.data_app.contractDetails(10, 'details')
+        self.assertFalse(future.done()) # resolved only on end of details
+        self.data_app.contractDetailsEnd(10)
+
+        self.assertEqual(future.result(), ['details'])
+        self.assertEqual(self.data_app.contract_details, {})
+
+    def test_contract_request_future_invalid(self):
+        future = Future()
+        self.data_app.contract_requests[10] = future
+
+        self.data_app.error(reqId=10, errorCode=200, errorString="Contract not found")
+        self.assertEqual(future.result(), [])
+
     def test_realtimeBar(self):
         self.data_app.reqId_to_symbol_map[123] = 'AAPL'
 
@@ -69,5 +91,73 @@ class TestDataApp(unittest.TestCase):
         self.mock_event_queue.put.assert_called_once_with(MarketEvent(timestamp=time, data={'AAPL':valid_bar}))
         self.assertEqual(self.data_app.current_bar_data, {})
 
+    def test_realtimeBar_recorded(self):
+        self.data_app.recorder = Mock()
+        self.data_app.reqId_to_symbol_map[123] = 'AAPL'
+
+        self.data_app.realtimeBar(123, 165500000, 109.9, 110, 105.6, 108, 10000, 109, 10)
+        self.data_app.recorder.record.assert_called_once_with('AAPL', 165500000, 109.9, 110, 105.6, 108, 10000.0)
+
+    def test_realtimeBar_unrecordable_symbol(self):
+        symbol = 'SPXW  240503C05100000' * 2 # wider than a recorded symbol
+        with tempfile.TemporaryDirectory() as directory:
+            self.data_app.recorder = MarketDataRecorder(directory, self.mock_logger)
+            self.data_app.reqId_to_symbol_map[123] = symbol
+
+            # Test
+            self.data_app.realtimeBar(123, 165500000, 109.9, 110, 105.6, 108, 10000, 109, 10)
+
+            # Validation
+            self.mock_event_queue.put.assert_called_once_with(MarketEvent(timestamp=165500000, data={symbol: BarData(165500000, 109.9, 110, 105.6, 108, 10000.0)}))
+            self.assertEqual(self.data_app.recorder.skipped_symbols, {symbol})
+
+    def test_realtimeBar_waits_for_all_symbols(self):
+        self.data_app.bar_timeout = None
+        self.data_app.reqId_to_symbol_map = {123: 'AAPL', 456: 'HEJ4'}
+
+        self.data_app.realtimeBar(123, 165500000, 109.9, 110, 105.6, 108, 10000, 109, 10)
+        self.assertFalse(self.mock_event_queue.put.called)
+
+        # Bar from the next interval is held in its own bucket, pending bucket is not overwritten
+        self.data_app.realtimeBar(123, 165500005, 108, 111, 107, 110, 10000, 109, 10)
+        self.assertEqual(list(self.data_app.current_bar_data.keys()), [165500000, 165500005])
+
+        self.data_app.realtimeBar(456, 165500000, 90.0, 91.0, 89.0, 90.5, 500, 90, 5)
+        event = self.mock_event_queue.put.call_args[0][0]
+        self.assertEqual(event.timestamp, 165500000)
+        self.assertEqual(set(event.data.keys()), {'AAPL', 'HEJ4'})
+        self.assertEqual(event.data['AAPL'].close, 108)
+        self.assertEqual(list(self.data_app.current_bar_data.keys()), [165500005])
+
+    def test_realtimeBar_timeout_releases_partial(self):
+        self.data_app.bar_timeout = 0.05
+        self.data_app.reqId_to_symbol_map = {123: 'AAPL', 456: 'HEJ4'}
+
+        self.data_app.realtimeBar(123, 165500000, 109.9, 110, 105.6, 108, 10000, 109, 10)
+        time.sleep(0.2)
+
+        event = self.mock_event_queue.put.call_args[0][0]
+        self.assertEqual(event.timestamp, 165500000)
+        self.assertEqual(list(event.data.keys()), ['AAPL'])
+        self.assertEqual(self.data_app.current_bar_data, {})
+        self.assertEqual(self.data_app.bar_timers, {})
+
+    def test_realtimeBar_late_bar(self):
+        self.data_app.bar_timeout = None
+        self.data_app.reqId_to_symbol_map = {123: 'AAPL', 456: 'HEJ4'}
+
+        # Newer bucket completing releases the older partial bucket first
+        self.data_app.realtimeBar(123, 165500000, 109.9, 110, 105.6, 108, 10000, 109, 10)
+        self.data_app.realtimeBar(123, 165500005, 108, 111, 107, 110, 10000, 109, 10)
+        self.data_app.realtimeBar(456, 165500005, 90.0, 91.0, 89.0, 90.5, 500, 90, 5)
+        timestamps = [call[0][0].timestamp for call in self.mock_event_queue.put.call_args_list]
+        self.assertEqual(timestamps, [165500000, 165500005])
+
+        # Bar for a released bucket is dropped and counted
+        self.data_app.realtimeBar(456, 165500000, 90.0, 91.0, 89.0, 90.5, 500, 90, 5)
+        self.assertEqual(self.data_app.late_bars, 1)
+        self.assertEqual(self.mock_event_queue.put.call_count, 2)
+        self.assertEqual(self.data_app.current_bar_data, {})
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,10 +1,13 @@
+import os
 import unittest
+import tempfile
 import threading
-from ibapi.contract import Contract
+from ibapi.contract import Contract, ContractDetails
 from unittest.mock import patch, Mock
 
 
 from midas.gateways.live import ContractManager
+from midas.gateways.live.data_client.wrapper import DataApp
 from midas.symbols.symbols import Future, Equity, Currency, Exchange
 
 #TODO : edge cases
@@ -48,7 +51,7 @@ class TestContractManager(unittest.TestCase):
             response = self.contract_manager.validate_contract(contract) # returns bool
             self.assertEqual(response,True)
             self.mock_logger.info.assert_called_once_with(f"Contract {contract.symbol} validated successfully.") # check logger call
-            self.assertEqual(self.contract_manager.validated_contracts[contract.symbol], contract) # check contract added to valdiated contracts log
+            self.assertEqual(self.contract_manager.validated_contracts[self.contract_manager.contract_key(contract)], contract) # check contract added to valdiated contracts log
             self.assertTrue(self.contract_manager.app.validate_contract_event.is_set()) # check event is set
     
     def test_validate_contract_invalid_contract(self):
@@ -66,7 +69,7 @@ class TestContractManager(unittest.TestCase):
     def test_validate_contract_already_validate(self):
         contract = Contract()
         contract.symbol = 'AAPL'
-        self.contract_manager.validated_contracts[contract.symbol] = contract # add contract to validated contract log
+        self.contract_manager.validated_contracts[self.contract_manager.contract_key(contract)] = contract # add contract to validated contract log
         # Test
         response = self.contract_manager.validate_contract(contract)  # returns bool
         self.assertEqual(response,True) # should return contract is valid
@@ -75,7 +78,7 @@ class TestContractManager(unittest.TestCase):
     def test_is_contract_validate_valid(self):
         contract = Contract()
         contract.symbol = 'AAPL'
-        self.contract_manager.validated_contracts[contract.symbol] = contract   # add contract to validated contract log
+        self.contract_manager.validated_contracts[self.contract_manager.contract_key(contract)] = contract   # add contract to validated contract log
         # Test 
         response = self.contract_manager._is_contract_validated(contract)
         self.assertTrue(response) # should be true b/c in the validated contracts
@@ -87,7 +90,110 @@ class TestContractManager(unittest.TestCase):
         response = self.contract_manager._is_contract_validated(contract)
         self.assertFalse(response) # should be false because not in valdiated contracts
 
+    # Batch Validation
+    def fake_contract_details(self, reqId, contract):
+        # Stand-in for TWS, responds on its own thread like the EReader
+        def respond():
+            if contract.symbol == 'INVALID':
+                self.data_app.error(reqId, 200, "No security definition has been found for the request")
+            else:
+                details = ContractDetails()
+                details.contract = contract
+                self.data_app.contractDetails(reqId, details)
+                self.data_app.contractDetailsEnd(reqId)
+        threading.Thread(target=respond).start()
+
+    def batch_contract_manager(self, cache_path=None):
+        self.data_app = DataApp(event_queue=Mock(), logger=Mock())
+        self.next_id = iter(range(1, 100))
+        self.mock_client.app = self.data_app
+        self.mock_client._get_valid_id.side_effect = lambda: next(self.next_id)
+        return ContractManager(client_instance=self.mock_client, logger=self.mock_logger, cache_path=cache_path, timeout=1)
+
+    def test_validate_contracts(self):
+        contract_manager = self.batch_contract_manager()
+        contracts = [symbol.contract for symbol in self.valid_symbols_map.values()]
+        invalid = Contract()
+        invalid.symbol = 'INVALID'
+
+        with patch.object(self.data_app, 'reqContractDetails', side_effect=self.fake_contract_details) as mock_method:
+            response = contract_manager.validate_contracts(contracts + [invalid])
+            keys = [contract_manager.contract_key(contract) for contract in contracts + [invalid]]
+            self.assertEqual(response, dict(zip(keys, [True, True, False])))
+            self.assertEqual(mock_method.call_count, 3) # all requests sent up front
+            self.assertEqual(set(contract_manager.validated_contracts.keys()), set(keys[:2]))
+            self.assertEqual(self.data_app.contract_requests, {}) # outstanding requests cleared
+
+    def test_validate_contracts_from_cache(self):
+        contracts = [symbol.contract for symbol in self.valid_symbols_map.values()]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = os.path.join(tmp_dir, 'contract_cache.pkl')
+            contract_manager = self.batch_contract_manager(cache_path)
+            with patch.object(self.data_app, 'reqContractDetails', side_effect=self.fake_contract_details):
+                contract_manager.validate_contracts(contracts)
+            self.assertTrue(os.path.exists(cache_path))
+
+            # New session loads validations from disk and sends no requests
+            contract_manager = self.batch_contract_manager(cache_path)
+            with patch.object(self.data_app, 'reqContractDetails') as mock_method:
+                response = contract_manager.validate_contracts(contracts)
+                self.assertEqual(response, {contract_manager.contract_key(contract): True for contract in contracts})
+                self.assertFalse(mock_method.called)
+
+            # Expired cache entries are requested again
+            contract_manager = self.batch_contract_manager(cache_path)
+            contract_manager.cache_ttl = 0
+            with patch.object(self.data_app, 'reqContractDetails', side_effect=self.fake_contract_details) as mock_method:
+                contract_manager.validate_contracts(contracts)
+                self.assertEqual(mock_method.call_count, 2)
+
+    def test_validate_contracts_timeout(self):
+        contract_manager = self.batch_contract_manager()
+        contract_manager.timeout = 0.05
+        contract = Contract()
+        contract.symbol = 'AAPL'
+
+        with patch.object(self.data_app, 'reqContractDetails'): # no response
+            response = contract_manager.validate_contracts([contract])
+            self.assertEqual(response, {contract_manager.contract_key(contract): False})
+            self.mock_logger.warning.assert_called_once_with(f"Contract AAPL validation failed.")
+
+    def test_validate_contracts_same_symbol(self):
+        contract_manager = self.batch_contract_manager()
+        stock = Equity(ticker='HE', currency=Currency.USD, exchange=Exchange.NYSE, fees=0.1).contract
+        futures = [Future(ticker='HE', currency=Currency.USD, exchange=Exchange.CME, fees=0.1, lastTradeDateOrContractMonth=expiry,
+                          multiplier=400, tickSize=0.0025, initialMargin=4000).contract for expiry in ['202406', '202412']]
+
+        with patch.object(self.data_app, 'reqContractDetails', side_effect=self.fake_contract_details) as mock_method:
+            response = contract_manager.validate_contracts([stock] + futures)
+
+            # Validation
+            self.assertEqual(len(response), 3) # one result per contract, not per symbol
+            self.assertTrue(all(response.values()))
+            self.assertEqual(mock_method.call_count, 3)
+            self.assertEqual(self.data_app.contract_requests, {})
+
+    def test_validate_contracts_request_error(self):
+        contract_manager = self.batch_contract_manager()
+        contract = Contract()
+        contract.symbol = 'AAPL'
+
+        def reject(reqId, contract):
+            threading.Thread(target=self.data_app.error, args=(reqId, 321, "Error validating request")).start()
+
+        with patch.object(self.data_app, 'reqContractDetails', side_effect=reject):
+            response = contract_manager.validate_contracts([contract])
+
+            # Validation
+            self.assertEqual(response, {contract_manager.contract_key(contract): False})
+            self.assertFalse(self.data_app.validate_contract_event.is_set()) # only 200 answers a single validation
+
     # Type Check
+    def test_validate_contracts_invalid_type(self):
+        with self.assertRaisesRegex(ValueError,"'contracts' must be a list of Contract instances." ):
+            self.contract_manager.validate_contracts(['AAPL'])
+
     def test_validate_contract_invalid_contract_type(self):
         contract = 'AAPL'
         # Test 
@@ -0,0 +1,54 @@
+import unittest
+import threading
+
+from midas.gateways.live.id_allocator import IdAllocator
+
+class TestIdAllocator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.allocator = IdAllocator(resync_gap=10)
+
+    # Basic Validation
+    def test_next_id(self):
+        self.allocator.sync(5)
+        self.assertEqual([self.allocator.next_id() for _ in range(3)], [5, 6, 7])
+
+    def test_sync_moves_forward(self):
+        self.allocator.sync(5)
+        self.allocator.next_id() # 5
+
+        # nextValidId ahead of the counter
+        self.allocator.sync(100)
+        self.assertEqual(self.allocator.next_id(), 100)
+
+        # nextValidId behind the counter, skips the resync gap instead of reusing ids
+        self.allocator.sync(50)
+        self.assertEqual(self.allocator.next_id(), 111)
+
+    def test_concurrent_ids_unique(self):
+        self.allocator.sync(1)
+        results = []
+
+        def allocate():
+            ids = [self.allocator.next_id() for _ in range(1000)]
+            results.extend(ids)
+
+        threads = [threading.Thread(target=allocate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 8000)
+        self.assertEqual(len(set(results)), 8000)
+
+    # Type/Constraint Check
+    def test_next_id_before_sync(self):
+        with self.assertRaisesRegex(RuntimeError, "No valid id received from IB"):
+            self.allocator.next_id()
+
+    def test_invalid_resync_gap(self):
+        with self.assertRaisesRegex(ValueError, "'resync_gap' must be a positive integer."):
+            IdAllocator(resync_gap=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import pandas as pd
+from queue import Queue
+from unittest.mock import Mock
+
+from midas.events import MarketEvent
+from midas.portfolio import PortfolioServer
+from midas.events import MarketOrder, LimitOrder, Action
+from midas.gateways.live import DataClient, BrokerClient, ContractManager
+from midas.gateways.live.simulator import IBGatewaySimulator
+from midas.symbols.symbols import Equity, Future, Currency, Exchange
+
+class TestIBGatewaySimulator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_logger = Mock()
+        self.event_queue = Queue()
+        self.symbols_map = {'AAPL': Equity(ticker="AAPL", currency=Currency.USD, exchange=Exchange.NASDAQ, fees=0.1),
+                            'HEJ4': Future(ticker='HEJ4', currency=Currency.USD, exchange=Exchange.CME, fees=0.1, lastTradeDateOrContractMonth='202404', multiplier=400, tickSize=0.0025, initialMargin=4000)}
+        self.portfolio_server = PortfolioServer(self.symbols_map, self.mock_logger)
+
+        self.bars = list(IBGatewaySimulator.synthetic_bars(list(self.symbols_map.keys()), start=1700000000, count=50, seed=1))
+        self.simulator = IBGatewaySimulator(self.bars, capital=100000, valid_symbols=list(self.symbols_map.keys()), logger=self.mock_logger)
+
+        self.data_client = DataClient(self.event_queue, self.mock_logger, host='127.0.0.1', port="7497", clientId=1, ib_account="DU0000000", bar_timeout=None)
+        self.broker_client = BrokerClient(self.event_queue, self.mock_logger, self.portfolio_server, Mock(), host='127.0.0.1', port="7497", clientId=2, ib_account="DU0000000")
+        self.simulator.attach(self.data_client.app)
+        self.simulator.attach(self.broker_client.app)
+        self.data_client.connect()
+        self.broker_client.connect()
+
+    def tearDown(self) -> None:
+        self.simulator.stop()
+        self.data_client.disconnect()
+        self.broker_client.disconnect()
+
+    def market_events(self):
+        events = []
+        while not self.event_queue.empty():
+            events.append(self.event_queue.get())
+        return events
+
+    # Basic Validation
+    def test_connect_and_account_download(self):
+        self.assertTrue(self.data_client.is_connected())
+        self.assertTrue(self.broker_client.app.account_download_event.is_set())
+        self.assertEqual(self.portfolio_server.account['NetLiquidation'], 100000)
+
+    def test_contract_validation(self):
+        contract_manager = ContractManager(self.data_client, self.mock_logger)
+        invalid = Equity(ticker="NOPE", currency=Currency.USD, exchange=Exchange.NASDAQ, fees=0.1).contract
+        response = contract_manager.validate_contracts([self.symbols_map['AAPL'].contract, invalid])
+        self.assertEqual(response, {contract_manager.contract_key(self.symbols_map['AAPL'].contract): True, contract_manager.contract_key(invalid): False})
+
+    def test_replay_bars(self):
+        for symbol in self.symbols_map.values():
+            self.data_client.stream_5_sec_bars(symbol.contract)
+
+        self.simulator.start()
+        self.assertTrue(self.simulator.replay_done.wait(5))
+        self.simulator.wait_idle()
+
+        events = self.market_events()
+        self.assertEqual(len(events), len(self.bars))
+        self.assertTrue(all(isinstance(event, MarketEvent) for event in events))
+        self.assertEqual([event.timestamp for event in events], [timestamp for timestamp, _ in self.bars])
+        self.assertEqual(events[-1].data['AAPL'].close, self.bars[-1][1]['AAPL'][3])
+
+    def test_market_order_filled(self):
+        self.simulator.last_prices['AAPL'] = 150.0
+        order = MarketOrder(Action.LONG, 10)
+
+        orderId = self.broker_client.handle_order(self.symbols_map['AAPL'].contract, order.order)
+        self.simulator.wait_idle()
+
+        self.assertEqual(self.simulator.orders_filled, 1)
+        self.assertEqual(self.simulator.open_orders, {})
+        self.assertEqual(self.simulator.positions['AAPL']['position'], 10)
+        self.assertEqual(self.portfolio_server.positions['AAPL'].quantity, 10)
+        self.assertEqual(orderId, 1)
+
+    def test_limit_order_rests_until_triggered(self):
+        self.simulator.last_prices['AAPL'] = 150.0
+        order = LimitOrder(Action.LONG, 10, limit_price=140.0)
+
+        orderId = self.broker_client.handle_order(self.symbols_map['AAPL'].contract, order.order)
+        self.assertIn(orderId, self.simulator.open_orders)
+
+        self.simulator._check_resting_orders({'AAPL': (141.0, 142.0, 139.5, 141.5, 100)})
+        self.assertEqual(self.simulator.open_orders, {})
+        self.assertEqual(self.simulator.positions['AAPL']['avg_cost'], 140.0)
+
+    def test_position_accounting(self):
+        contract = self.symbols_map['HEJ4'].contract
+        with self.simulator._lock:
+            self.simulator._update_position(contract, 2, 100.0)
+            self.simulator._update_position(contract, -3, 101.0) # flip to short 1
+
+        self.assertEqual(self.simulator.positions['HEJ4']['position'], -1)
+        self.assertEqual(self.simulator.realized_pnl, 2 * 400 * 1.0)
+        self.assertEqual(self.simulator.positions['HEJ4']['avg_cost'], 101.0 * 400)
+
+    def test_bars_from_dataframe(self):
+        data = pd.DataFrame([{'timestamp': 10, 'symbol': 'AAPL', 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 100.0},
+                             {'timestamp': 5, 'symbol': 'AAPL', 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.2, 'volume': 100.0},
+                             {'timestamp': 10, 'symbol': 'HEJ4', 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.7, 'volume': 100.0}])
+        bars = list(IBGatewaySimulator.bars_from_dataframe(data))
+
+        self.assertEqual([timestamp for timestamp, _ in bars], [5, 10])
+        self.assertEqual(bars[1][1]['HEJ4'], (1.0, 2.0, 0.5, 1.7, 100.0))
+
+if __name__ == '__main__':
+    unittest.main()
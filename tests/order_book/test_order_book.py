@@ -152,6 +152,16 @@ class TestOrderBook(unittest.TestCase):
         self.assertEqual(prices[tickers[1]],  (data[tickers[1]].ask + data[tickers[1]].bid )/2)
         self.assertEqual(type(prices), dict)
 
+    def test_updated_prices(self):
+        self.valid_bardata_order_book.on_market_data(MarketEvent(timestamp=1651500000, data={'HEJ4': self.valid_bar, 'AAPL': self.valid_bar}))
+        self.valid_bardata_order_book.on_market_data(MarketEvent(timestamp=1651500005, data={'AAPL': self.valid_bar}))
+        
+        # Test
+        prices = self.valid_bardata_order_book.updated_prices()
+
+        # Validation
+        self.assertEqual(prices, {'AAPL': self.valid_bar.close}) # only tickers in the latest event
+
     # Type Check
     def test_on_market_data_type_validation(self):
         with self.assertRaisesRegex(TypeError,"'event' must be an instance MarketEvent."):
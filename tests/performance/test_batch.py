@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from midas.performance.batch import BatchStatistics
+from midas.performance.statistics import PerformanceStatistics
+
+class TestBatchStatistics(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(11)
+        self.equity_curves = 100000 * np.cumprod(1 + rng.normal(0.0005, 0.01, size=(6, 120)), axis=1)
+        self.equity_curves[2] = 100000.0 # flat run
+        self.benchmark = 4000 * np.cumprod(1 + rng.normal(0.0003, 0.008, size=120))
+        self.trade_returns = [rng.normal(0.01, 0.05, size=size) for size in [20, 0, 1, 35, 3, 12]]
+        self.trade_returns[4] = np.array([0.02, -0.01, 0.03]) # single losing trade
+
+    def test_summary_matches_per_run(self):
+        stats = BatchStatistics.summary(self.equity_curves, self.benchmark, self.trade_returns)
+
+        # Validation
+        for run, equity_curve in enumerate(self.equity_curves):
+            trade_log = pd.DataFrame({'gain/loss': self.trade_returns[run]})
+            expected = {
+                'total_return': PerformanceStatistics.total_return(equity_curve),
+                'max_drawdown': PerformanceStatistics.max_drawdown(equity_curve),
+                'annual_standard_deviation': PerformanceStatistics.annual_standard_deviation(equity_curve),
+                'ending_equity': equity_curve[-1],
+                'sharpe_ratio': PerformanceStatistics.sharpe_ratio(equity_curve),
+                'sortino_ratio': PerformanceStatistics.sortino_ratio(trade_log),
+                'alpha': PerformanceStatistics.alpha(equity_curve, self.benchmark, 0.04),
+                'beta': PerformanceStatistics.beta(equity_curve, self.benchmark),
+            }
+            for name, value in expected.items():
+                self.assertAlmostEqual(stats[name][run], float(value), places=4, msg=f"{name} run {run}")
+
+    def test_benchmark_per_run(self):
+        benchmarks = np.vstack([self.benchmark, self.benchmark * 1.1] * 3)
+        stats = BatchStatistics.summary(self.equity_curves, benchmarks)
+
+        # Validation
+        expected = BatchStatistics.beta(self.equity_curves, self.benchmark)
+        np.testing.assert_allclose(stats['beta'], expected, atol=1e-3)
+        self.assertNotIn('sortino_ratio', stats)
+
+    # Type and Constraint Validation
+    def test_equity_curves_validation(self):
+        with self.assertRaisesRegex(TypeError, "equity_curves must be a numpy array"):
+            BatchStatistics.summary([[1.0, 2.0]])
+
+        with self.assertRaisesRegex(ValueError, "'equity_curves' must be a 2-D array of runs by time."):
+            BatchStatistics.summary(np.array([1.0, 2.0]))
+
+    def test_trade_returns_validation(self):
+        with self.assertRaisesRegex(ValueError, "'trade_returns' must hold one array per run."):
+            BatchStatistics.summary(self.equity_curves, trade_returns=self.trade_returns[:2])
+
+        with self.assertRaisesRegex(TypeError, "trade_returns must be a list of numpy arrays"):
+            BatchStatistics.summary(self.equity_curves, trade_returns=[[0.1]] * 6)
+
+    def test_benchmark_validation(self):
+        with self.assertRaisesRegex(ValueError, "'benchmark_equity_curve' must be aligned with the equity curves."):
+            BatchStatistics.summary(self.equity_curves, self.benchmark[:-1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from unittest.mock import Mock
+
+from midas.performance.benchmark import BenchmarkCache, align_days, daily_closes
+
+class TestBenchmarkCache(unittest.TestCase):
+    def setUp(self) -> None:
+        BenchmarkCache.clear()
+        self.cache_dir = tempfile.mkdtemp()
+        self.database = Mock()
+        self.database.get_benchmark_data.return_value = [
+            {'timestamp': '2024-01-03', 'close': 4700.0},
+            {'timestamp': '2024-01-02', 'close': 4750.0},
+            {'timestamp': '2024-01-04', 'close': 4690.0},
+        ]
+
+    def tearDown(self) -> None:
+        BenchmarkCache.clear()
+        shutil.rmtree(self.cache_dir)
+
+    def test_series_sorted(self):
+        timestamps, closes = BenchmarkCache(self.database).series(['^GSPC'], '2024-01-01', '2024-01-05')
+
+        # Validation
+        np.testing.assert_array_equal(timestamps, [1704153600, 1704240000, 1704326400])
+        np.testing.assert_array_equal(closes, [4750.0, 4700.0, 4690.0])
+
+    def test_cached_in_process(self):
+        BenchmarkCache(self.database).daily(['^GSPC'], '2024-01-01', '2024-01-05')
+        days, closes = BenchmarkCache(Mock()).daily(['^GSPC'], '2024-01-01', '2024-01-05') # another run of the sweep
+
+        # Validation
+        self.database.get_benchmark_data.assert_called_once_with(['^GSPC'], '2024-01-01', '2024-01-05')
+        np.testing.assert_array_equal(days, [19724, 19725, 19726])
+        np.testing.assert_array_equal(closes, [4750.0, 4700.0, 4690.0])
+
+    def test_cached_on_disk(self):
+        BenchmarkCache(self.database, self.cache_dir).series(['^GSPC'], '2024-01-01', '2024-01-05')
+        BenchmarkCache.clear() # a later process
+        database = Mock()
+
+        # Test
+        timestamps, closes = BenchmarkCache(database, self.cache_dir).series(['^GSPC'], '2024-01-01', '2024-01-05')
+
+        # Validation
+        database.get_benchmark_data.assert_not_called()
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        np.testing.assert_array_equal(closes, [4750.0, 4700.0, 4690.0])
+
+    def test_keyed_by_range(self):
+        cache = BenchmarkCache(self.database)
+        cache.series(['^GSPC'], '2024-01-01', '2024-01-05')
+        cache.series(['^GSPC'], '2024-01-01', '2024-01-31')
+        self.assertEqual(self.database.get_benchmark_data.call_count, 2)
+
+    def test_daily_closes(self):
+        timestamps = np.array([1704153600, 1704160000, 1704240000, 1704250000, 1704330000])
+        days, values = daily_closes(timestamps, np.array([1.0, 2.0, 3.0, 4.0, 5.0]))
+
+        # Validation
+        np.testing.assert_array_equal(days, [19724, 19725, 19726])
+        np.testing.assert_array_equal(values, [2.0, 4.0, 5.0])
+
+    def test_align_days(self):
+        values, other_values = align_days(np.array([1, 2, 4, 7]), np.array([10.0, 20.0, 40.0, 70.0]), np.array([2, 3, 4, 5]), np.array([0.2, 0.3, 0.4, 0.5]))
+
+        # Validation
+        np.testing.assert_array_equal(values, [20.0, 40.0])
+        np.testing.assert_array_equal(other_values, [0.2, 0.4])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,7 @@
+import os
+import gzip
+import json
+import tempfile
 import unittest
 from unittest.mock import Mock, patch
 from contextlib import ExitStack
@@ -8,6 +12,8 @@ import pandas as pd
 import numpy as np
 
 from midas.performance.manager import Backtest, PerformanceManager
+from midas.performance.benchmark import BenchmarkCache
+from midas.performance.statistics import PerformanceStatistics
 from midas.account_data import EquityDetails, Trade
 from midas.events import SignalEvent, Action, ExecutionDetails
 from midas.command.parameters import Parameters
@@ -74,8 +80,8 @@ class TestBacktest(unittest.TestCase):
 
         self.backtest.parameters = self.mock_parameters
         self.backtest.static_stats = self.mock_static_stats
-        self.backtest.timeseries_stats = self.mock_timeseries_stats
-        self.backtest.trade_data = self.mock_trades
+        self.backtest.timeseries_stats = pd.DataFrame(self.mock_timeseries_stats)
+        self.backtest.trade_data = pd.DataFrame(self.mock_trades)
         self.backtest.signal_data = self.mock_signals
 
     # Basic Validation
@@ -118,6 +124,108 @@ class TestBacktest(unittest.TestCase):
             with self.assertRaisesRegex(ValueError,f"Validation Error:" ):
                 self.backtest.save()
 
+    def test_iter_json_batches(self):
+        self.backtest.trade_data = pd.DataFrame(self.mock_trades * 5)
+        self.backtest.timeseries_stats = pd.DataFrame({'timestamp': ['2023-12-09T12:00:00+00:00'] * 3, 'rolling_beta': [np.nan, 1.0, 2.0]})
+
+        # Test
+        payload = json.loads("".join(self.backtest.iter_json(batch_rows=2)))
+
+        # Validation
+        self.assertEqual(payload, self.backtest.to_dict())
+
+    def test_iter_json_empty_tables(self):
+        self.backtest.timeseries_stats = pd.DataFrame()
+        self.backtest.trade_data = pd.DataFrame()
+
+        # Validation
+        self.assertEqual(json.loads("".join(self.backtest.iter_json())), self.backtest.to_dict())
+
+    def test_iter_json_invalid_batch_rows(self):
+        for batch_rows in [0, -1, 1.5]:
+            with self.assertRaisesRegex(ValueError, "'batch_rows' must be a positive integer."):
+                self.backtest.iter_json(batch_rows)
+
+    def test_compressed_payload(self):
+        self.backtest.trade_data = pd.DataFrame(self.mock_trades * 5)
+
+        # Test
+        payload = b"".join(self.backtest.compressed_payload(batch_rows=2))
+
+        # Validation
+        self.assertEqual(json.loads(gzip.decompress(payload)), self.backtest.to_dict())
+
+    def test_save_streamed_upload(self):
+        backtest = Backtest(self.mock_db_client, upload_url="http://127.0.0.1:8000/api/backtest/", api_key="key")
+        backtest.parameters = self.mock_parameters
+        backtest.static_stats = self.mock_static_stats
+        backtest.timeseries_stats = pd.DataFrame(self.mock_timeseries_stats)
+        backtest.trade_data = pd.DataFrame(self.mock_trades * 3)
+        backtest.signal_data = self.mock_signals
+        posted = {}
+
+        def post(url, data, headers):
+            posted.update(url=url, body=b"".join(data), headers=headers)
+            return Mock(status_code=201)
+
+        with ExitStack() as stack:
+            stack.enter_context(patch('midas.performance.manager.requests.post', side_effect=post))
+            mock_print = stack.enter_context(patch('builtins.print'))
+
+            # Test
+            backtest.save(batch_rows=2)
+
+            # Validation
+            self.assertEqual(posted['url'], "http://127.0.0.1:8000/api/backtest/")
+            self.assertEqual(posted['headers']['Content-Encoding'], 'gzip')
+            self.assertEqual(posted['headers']['Authorization'], 'Token key')
+            self.assertEqual(json.loads(gzip.decompress(posted['body'])), backtest.to_dict())
+            self.mock_db_client.create_backtest.assert_not_called()
+            mock_print.assert_called_once_with("Backtest save successful.")
+
+    def test_to_dict_missing_values(self):
+        self.backtest.timeseries_stats = pd.DataFrame({'timestamp': ['2023-12-09T12:00:00+00:00'], 'rolling_beta': [np.nan]})
+
+        # Validation
+        self.assertEqual(self.backtest.to_dict()['timeseries_stats'], [{'timestamp': '2023-12-09T12:00:00+00:00', 'rolling_beta': None}])
+
+    def test_to_frames(self):
+        frames = self.backtest.to_frames()
+
+        # Validation
+        self.assertEqual(len(frames['signals']), 2) # one row per trade instruction
+        self.assertEqual(frames['signals']['signal_timestamp'].tolist(), ["2023-01-03T00:00:00+0000"] * 2)
+        self.assertEqual(frames['trades']['price'].tolist(), [130.74])
+        self.assertEqual(frames['timeseries_stats']['equity_value'].tolist(), [10000.0])
+
+    def test_export_parquet(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = self.backtest.export(directory)
+
+            # Validation
+            assert_frame_equal(pd.read_parquet(paths['trades']), self.backtest.trade_data)
+            assert_frame_equal(pd.read_parquet(paths['timeseries_stats']), self.backtest.timeseries_stats)
+            self.assertEqual(len(pd.read_parquet(paths['signals'])), 2)
+            with open(paths['backtest']) as file:
+                self.assertEqual(json.load(file)['static_stats'], self.mock_static_stats)
+
+    def test_export_feather(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = self.backtest.export(directory, format='feather')
+
+            # Validation
+            assert_frame_equal(pd.read_feather(paths['trades']), self.backtest.trade_data)
+
+    def test_export_format_validation(self):
+        with self.assertRaisesRegex(ValueError, "'format' must be one of \\['parquet', 'feather'\\]."):
+            self.backtest.export(tempfile.gettempdir(), format='csv')
+
+    def test_validate_attributes_records(self):
+        self.backtest.trade_data = self.mock_trades
+
+        with self.assertRaisesRegex(ValueError, "trade_data must be a DataFrame"):
+            self.backtest.validate_attributes()
+
     def test_validate_attributes_success(self):
         try:
             self.backtest.validate_attributes()
@@ -126,6 +234,7 @@ class TestBacktest(unittest.TestCase):
 
 class TestPerformanceManager(unittest.TestCase):    
     def setUp(self) -> None:
+        BenchmarkCache.clear() # benchmark mocks differ between tests
         self.mock_db_client = Mock()
         self.mock_logger = Mock()
         self.mock_parameters = Parameters(
@@ -199,9 +308,34 @@ class TestPerformanceManager(unittest.TestCase):
         )       
 
         self.performance_manager.update_trades(trade)
-        self.assertEqual(self.performance_manager.trades[0], trade.to_dict())
+        self.assertEqual(self.performance_manager.trade_log.to_records()[0], trade.to_dict())
         self.mock_logger.info.assert_called_once()
     
+    def test_update_trades_keeps_types(self):
+        trade = Trade(timestamp=165000000, trade_id=2, leg_id=2, ticker='HEJ4', quantity=-10, price=50, cost=-500, action=Action.SHORT.value, fees=70)
+
+        # Test
+        self.performance_manager.update_trades(trade)
+
+        # Validation
+        record = self.performance_manager.trade_log.to_records()[0]
+        self.assertIsInstance(record['quantity'], int)
+        self.assertEqual(self.performance_manager.trade_log.column('timestamp').dtype, np.int64)
+
+    def test_load_records(self):
+        trades = [dict(timestamp='2022-01-01T00:00:00+00:00', trade_id=1, leg_id=1, ticker='XYZ', quantity=10, price=10.0, cost=-100.0, fees=10.0, action=Action.LONG.value)]
+        equity_value = [EquityDetails(timestamp='2022-01-01T00:00:00+00:00', equity_value=1000.0)]
+
+        # Test
+        self.performance_manager.load_records(trades, equity_value)
+
+        # Validation
+        self.assertEqual(self.performance_manager.trade_log.to_records(), trades)
+        self.assertEqual(self.performance_manager.equity_log.to_records(), equity_value)
+        self.assertEqual(self.performance_manager.online_stats.trade_count, 1)
+        with self.assertRaises(AttributeError): # exported records are not writable views of the logs
+            self.performance_manager.trades.append(trades[0])
+
     def test_update_trades_old_trade_valid(self):        
         trade = Trade(
                 timestamp= 165000000,
@@ -214,11 +348,12 @@ class TestPerformanceManager(unittest.TestCase):
                 action=  Action.SHORT.value,
                 fees= 70 # because not actually a trade
         )  
-        self.performance_manager.trades.append(trade.to_dict())
+        self.performance_manager.update_trades(trade)
+        self.mock_logger.reset_mock()
 
         self.performance_manager.update_trades(trade)
-        self.assertEqual(self.performance_manager.trades[0], trade.to_dict())
-        self.assertEqual(len(self.performance_manager.trades), 1)
+        self.assertEqual(self.performance_manager.trade_log.to_records()[0], trade.to_dict())
+        self.assertEqual(len(self.performance_manager.trade_log.to_records()), 1)
         self.assertFalse(self.mock_logger.info.called)
     
     def test_output_trades(self):
@@ -236,6 +371,20 @@ class TestPerformanceManager(unittest.TestCase):
         self.performance_manager.update_trades(trade)
         self.mock_logger.info.assert_called_once_with("\nTrades Updated: \n {'timestamp': '1975-03-25T17:20:00+00:00', 'trade_id': 2, 'leg_id': 2, 'ticker': 'HEJ4', 'quantity': -10, 'price': 50, 'cost': -500, 'action': 'SHORT', 'fees': 70} \n")
 
+    def test_output_trades_delta(self):
+        trades = [Trade(timestamp=165000000, trade_id=2, leg_id=1, ticker='HEJ4', quantity=-10, price=50, cost=-500, action=Action.SHORT.value, fees=70),
+                  Trade(timestamp=165000060, trade_id=2, leg_id=1, ticker='HEJ4', quantity=10, price=49, cost=490, action=Action.COVER.value, fees=70)]
+
+        # Test
+        for trade in trades:
+            self.performance_manager.update_trades(trade)
+
+        # Validation
+        self.assertEqual(self.mock_logger.info.call_args_list[-1].args[0], f"\nTrades Updated: \n {trades[1].to_dict()} \n") # only the new trade
+        self.performance_manager.log_snapshot()
+        recorded = self.performance_manager.trade_log.to_records()
+        self.assertEqual(self.mock_logger.info.call_args.args[0], f"\nTrades: \n {recorded[0]} \n {recorded[1]} \n\nSignals: \n")
+
     def test_update_signals_valid(self):        
         self.valid_trade1 = TradeInstruction(ticker = 'AAPL',
                                                 order_type = OrderType.MARKET,
@@ -285,7 +434,7 @@ class TestPerformanceManager(unittest.TestCase):
         
         self.performance_manager.update_equity(equity)
 
-        self.assertEqual(self.performance_manager.equity_value[0], equity)
+        self.assertEqual(self.performance_manager.equity_log.to_records()[0], EquityDetails(timestamp='1975-03-31T12:13:20+00:00', equity_value=10000000.99)) # ISO on export
         self.mock_logger.info.assert_called_once_with((f"\nEquity Updated: {equity}"))
     
     def test_update_equity_old_valid(self):
@@ -293,20 +442,21 @@ class TestPerformanceManager(unittest.TestCase):
                     timestamp= 165500000,
                     equity_value = 10000000.99
                 )
-        self.performance_manager.equity_value.append(equity)
+        self.performance_manager.update_equity(equity)
+        self.mock_logger.reset_mock()
 
         self.performance_manager.update_equity(equity)
-        self.assertEqual(len(self.performance_manager.equity_value), 1)
+        self.assertEqual(len(self.performance_manager.equity_log.to_records()), 1)
         self.assertFalse(self.mock_logger.info.called)
 
     def test_aggregate_trades_valid(self):
         # Adjusted trades data to use ExecutionDetails format
-        self.performance_manager.trades = [
-            ExecutionDetails(timestamp='2022-01-01', trade_id=1, leg_id=1, symbol='XYZ', quantity=10, price=10, cost=-100,fees=10, action=Action.LONG.value),
-            ExecutionDetails(timestamp='2022-01-02', trade_id=1, leg_id=1, symbol='XYZ', quantity=-10, price=15, cost=150, fees=10,action=Action.SELL.value),
-            ExecutionDetails(timestamp='2022-01-01', trade_id=2, leg_id=1, symbol='HEJ4', quantity=-10, price=20, cost=500, fees=10,action=Action.SHORT.value),
-            ExecutionDetails(timestamp='2022-01-02', trade_id=2, leg_id=1, symbol='HEJ4', quantity=10, price=18, cost=-180, fees=10,  action=Action.COVER.value)
-        ]
+        self.performance_manager.load_records(trades=[
+            dict(timestamp='2022-01-01', trade_id=1, leg_id=1, ticker='XYZ', quantity=10, price=10, cost=-100,fees=10, action=Action.LONG.value),
+            dict(timestamp='2022-01-02', trade_id=1, leg_id=1, ticker='XYZ', quantity=-10, price=15, cost=150, fees=10,action=Action.SELL.value),
+            dict(timestamp='2022-01-01', trade_id=2, leg_id=1, ticker='HEJ4', quantity=-10, price=20, cost=500, fees=10,action=Action.SHORT.value),
+            dict(timestamp='2022-01-02', trade_id=2, leg_id=1, ticker='HEJ4', quantity=10, price=18, cost=-180, fees=10,  action=Action.COVER.value)
+        ])
 
         # Call the method
         aggregated_df = self.performance_manager._aggregate_trades()
@@ -330,13 +480,36 @@ class TestPerformanceManager(unittest.TestCase):
         self.assertEqual(trade_1.iloc[0]['pnl'], 30, "Incorrect net pnl for trade_id 1")
         self.assertEqual(trade_1.iloc[0]['gain/loss'], 0.30, "Incorrect gain/loss for trade_id 1")
 
+    def test_aggregate_trades_interleaved(self):
+        rng = np.random.default_rng(3)
+        actions = [Action.LONG.value, Action.SHORT.value, Action.SELL.value, Action.COVER.value]
+        for i in range(500):
+            self.performance_manager.update_trades(Trade(timestamp=1640995200 + i, trade_id=int(rng.integers(1, 40)), leg_id=1, ticker='XYZ', quantity=10,
+                                                         price=10, cost=round(float(rng.normal(0, 1000)), 2), fees=float(rng.integers(0, 5)), action=actions[rng.integers(4)]))
+
+        # Test
+        aggregated_df = self.performance_manager._aggregate_trades()
+
+        # Validation, against a groupby over the recorded fills
+        df = self.performance_manager.trade_log.to_frame()
+        expected = df.groupby('trade_id').agg(start_date=('timestamp', 'first'), end_date=('timestamp', 'last'), fees=('fees', 'sum'))
+        expected['entry_value'] = df[df['action'].isin(['LONG', 'SHORT'])].groupby('trade_id')['cost'].sum().reindex(expected.index, fill_value=0.0)
+        expected['exit_value'] = df[df['action'].isin(['SELL', 'COVER'])].groupby('trade_id')['cost'].sum().reindex(expected.index, fill_value=0.0)
+        expected['pnl'] = expected['exit_value'] + expected['entry_value'] - expected['fees']
+
+        np.testing.assert_array_equal(aggregated_df['trade_id'], expected.index)
+        np.testing.assert_allclose(aggregated_df[['entry_value', 'exit_value', 'fees', 'pnl']], expected[['entry_value', 'exit_value', 'fees', 'pnl']])
+        np.testing.assert_array_equal(aggregated_df['start_date'], pd.to_datetime(expected['start_date'], unit='s', utc=True))
+        np.testing.assert_array_equal(aggregated_df['end_date'], pd.to_datetime(expected['end_date'], unit='s', utc=True))
+        np.testing.assert_allclose(aggregated_df['gain/loss'], expected['pnl'] / expected['entry_value'].abs())
+
     def test_calculate_return_and_drawdown_valid(self):
-        self.performance_manager.equity_value = [
+        self.performance_manager.load_records(equity_value=[
             EquityDetails(timestamp='2022-01-01', equity_value=1000.0),
             EquityDetails(timestamp='2022-01-02', equity_value=1010.0),
             EquityDetails(timestamp='2022-01-03', equity_value=1005.0),
             EquityDetails(timestamp='2022-01-04', equity_value=1030.0),
-        ]
+        ])
 
         df = self.performance_manager._calculate_return_and_drawdown()
 
@@ -369,6 +542,22 @@ class TestPerformanceManager(unittest.TestCase):
         expected_drawdowns = (equity_value - rolling_max) / rolling_max  # Calculate drawdowns in decimal format
         self.assertAlmostEqual(df['drawdown'].min(), expected_drawdowns.min(), places=4, msg="Drawdown calculation does not match expected value")
 
+    def test_calculate_return_and_drawdown_rolling(self):
+        self.performance_manager.load_records(equity_value=[EquityDetails(timestamp=1640995200 + i * 3600, equity_value=1000.0 + 10 * ((i * 7) % 5)) for i in range(96)])
+        benchmark = (np.array([1640995200 + day * 86400 for day in range(1, 4)]), np.array([2000.0 + 15 * day + 5 * (day % 2) for day in range(1, 4)]))
+
+        # Test
+        df = self.performance_manager._calculate_return_and_drawdown(benchmark, rolling_window=1)
+
+        # Validation
+        equity_curve = df['equity_value'].to_numpy()
+        benchmark_curve = np.array([2000.0 + 15 * day + 5 * (day % 2) for day in [1] * 24 + [1] * 24 + [2] * 24 + [3] * 24]) # held until the next close
+        np.testing.assert_allclose(df['rolling_volatility'].to_numpy()[24:], PerformanceStatistics.rolling_volatility(equity_curve, 24, 24 * 252)[23:])
+        np.testing.assert_allclose(df['rolling_beta'].to_numpy()[24:], PerformanceStatistics.rolling_beta(equity_curve, benchmark_curve, 24)[23:])
+        self.assertTrue(df['rolling_sharpe_ratio'].iloc[:24].isna().all()) # window incomplete
+        self.assertFalse(df[['daily_return', 'cumulative_return', 'drawdown', 'drawdown_duration']].isna().any().any())
+        self.assertTrue((df['rolling_alpha'] != 0).any())
+
     def test_standardize_to_daily_values_valid(self):
         self.equity_curve = [
             EquityDetails(timestamp='2022-01-01', equity_value=1000.0),
@@ -491,15 +680,15 @@ class TestPerformanceManager(unittest.TestCase):
     
     def test_calculate_statistics(self):
         # Trades
-        self.performance_manager.trades = [
-            ExecutionDetails(timestamp='2022-01-01', trade_id=1, leg_id=1, symbol='XYZ', quantity=10, price=10, cost=-100,fees=10, action=Action.LONG.value),
-            ExecutionDetails(timestamp='2022-01-02', trade_id=1, leg_id=1, symbol='XYZ', quantity=-10, price=15, cost=150, fees=10,action=Action.SELL.value),
-            ExecutionDetails(timestamp='2022-01-01', trade_id=2, leg_id=1, symbol='HEJ4', quantity=-10, price=20, cost=500, fees=10,action=Action.SHORT.value),
-            ExecutionDetails(timestamp='2022-01-02', trade_id=2, leg_id=1, symbol='HEJ4', quantity=10, price=18, cost=-180, fees=10,  action=Action.COVER.value)
-        ]
+        self.performance_manager.load_records(trades=[
+            dict(timestamp='2022-01-01', trade_id=1, leg_id=1, ticker='XYZ', quantity=10, price=10, cost=-100,fees=10, action=Action.LONG.value),
+            dict(timestamp='2022-01-02', trade_id=1, leg_id=1, ticker='XYZ', quantity=-10, price=15, cost=150, fees=10,action=Action.SELL.value),
+            dict(timestamp='2022-01-01', trade_id=2, leg_id=1, ticker='HEJ4', quantity=-10, price=20, cost=500, fees=10,action=Action.SHORT.value),
+            dict(timestamp='2022-01-02', trade_id=2, leg_id=1, ticker='HEJ4', quantity=10, price=18, cost=-180, fees=10,  action=Action.COVER.value)
+        ])
 
         # Equity Curve
-        self.performance_manager.equity_value = [
+        self.performance_manager.load_records(equity_value=[
             EquityDetails(timestamp='2022-01-01 09:30', equity_value=1000.0),  # Initial equity
             EquityDetails(timestamp='2022-01-01 16:00', equity_value=1000.0),  # No change, trades open
             EquityDetails(timestamp='2022-01-02 09:30', equity_value=1030.0),  # Reflecting Trade 1 PnL
@@ -508,7 +697,7 @@ class TestPerformanceManager(unittest.TestCase):
             EquityDetails(timestamp='2022-01-03 09:30', equity_value=1330.0),  # Assuming no further trades
             EquityDetails(timestamp='2022-01-03 11:00', equity_value=1330.0),
             EquityDetails(timestamp='2022-01-03 16:00', equity_value=1330.0)
-        ]
+        ])
 
 
         # Benchmark Curve
@@ -528,7 +717,7 @@ class TestPerformanceManager(unittest.TestCase):
         expected_net_profit = 330
         expected_total_return = 0.33
         
-        equity_df = self.performance_manager._standardize_to_daily_values(self.performance_manager.equity_value)
+        equity_df = self.performance_manager._standardize_to_daily_values(self.performance_manager.equity_log.to_records())
         equity_value = equity_df['equity_value'].to_numpy()
         daily_returns = np.diff(equity_value ) / equity_value[:-1] # Calculate daily returns
         risk_free_rate_daily = 0.04 / 252 # Risk-free rate adjustment for daily returns
@@ -573,7 +762,7 @@ class TestPerformanceManager(unittest.TestCase):
             self.performance_manager.update_trades(trade)
 
         # Equity Curve
-        self.performance_manager.equity_value = [
+        self.performance_manager.load_records(equity_value=[
             EquityDetails(timestamp='2022-01-01 09:30', equity_value=1000.0),  # Initial equity
             EquityDetails(timestamp='2022-01-01 16:00', equity_value=1000.0),  # No change, trades open
             EquityDetails(timestamp='2022-01-02 09:30', equity_value=1030.0),  # Reflecting Trade 1 PnL
@@ -582,7 +771,7 @@ class TestPerformanceManager(unittest.TestCase):
             EquityDetails(timestamp='2022-01-03 09:30', equity_value=1330.0),  # Assuming no further trades
             EquityDetails(timestamp='2022-01-03 11:00', equity_value=1330.0),
             EquityDetails(timestamp='2022-01-03 16:00', equity_value=1330.0)
-        ]
+        ])
 
 
         # Benchmark Curve
@@ -602,7 +791,7 @@ class TestPerformanceManager(unittest.TestCase):
 
         self.assertEqual(backtest.parameters, self.mock_parameters.to_dict())
         self.assertEqual(backtest.signal_data, [signal_event.to_dict()])
-        self.assertEqual(backtest.trade_data , [trade.to_dict() for trade in self.trades])
+        self.assertEqual(backtest.to_dict()['trades'], [trade.to_dict() for trade in self.trades])
 
         expected_static_keys = {
                                 'net_profit', 
@@ -628,9 +817,23 @@ class TestPerformanceManager(unittest.TestCase):
         actual_static_keys = set(backtest.static_stats[0].keys())
         self.assertEqual(actual_static_keys, expected_static_keys, "Static stats keys do not match expected keys.")
 
-        expected_timeseries_keys = {'timestamp', 'equity_value','daily_return', 'cumulative_return', 'drawdown'}  # Adjust based on your actual expected output
-        actual_timeseries_keys = set(backtest.timeseries_stats[0].keys())
+        expected_timeseries_keys = {'timestamp', 'equity_value','daily_return', 'cumulative_return', 'drawdown', 'drawdown_duration',
+                                    'rolling_volatility', 'rolling_sharpe_ratio', 'rolling_sortino_ratio', 'rolling_beta', 'rolling_alpha'}
+        timeseries_stats = backtest.to_dict()['timeseries_stats']
+        actual_timeseries_keys = set(timeseries_stats[0].keys())
         self.assertEqual(actual_timeseries_keys, expected_timeseries_keys, "Timeseries stats keys do not match expected keys.")
+        self.assertIsNone(timeseries_stats[0]['rolling_volatility']) # incomplete window exported as None
+        self.assertEqual(timeseries_stats[0]['daily_return'], 0)
+
+        # Export, off unless the parameters set a directory
+        with tempfile.TemporaryDirectory() as directory:
+            self.mock_parameters.export_directory = directory
+            self.performance_manager.create_backtest()
+
+            # Validation
+            trades = pd.read_parquet(os.path.join(directory, 'trades.parquet'))
+            self.assertEqual(trades['quantity'].dtype, np.int64)
+            self.assertEqual(trades.to_dict(orient='records'), [trade.to_dict() for trade in self.trades])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+import unittest
+import numpy as np
+from unittest.mock import Mock
+
+from midas.account_data import Trade
+from midas.performance.manager import PerformanceManager
+from midas.performance.online import OnlineStatistics
+from midas.performance.statistics import PerformanceStatistics
+
+class TestOnlineStatistics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.performance_manager = PerformanceManager(Mock(), Mock(), Mock())
+        rng = np.random.default_rng(7)
+
+        # Intraday equity updates over 30 days
+        start = 1704067200 + 9 * 3600
+        self.equity = []
+        value = 100000.0
+        for day in range(30):
+            for minute in sorted(rng.choice(420, size=5, replace=False)):
+                value *= 1 + rng.normal(0, 0.004)
+                self.equity.append((int(start + day * 86400 + minute * 60), round(value, 2)))
+
+        # Trades filled over several legs, partly interleaved
+        self.trades = []
+        for trade_id in range(1, 21):
+            entry = round(float(rng.uniform(1000, 5000)), 2)
+            action, exit_action = ('LONG', 'SELL') if rng.random() < 0.5 else ('SHORT', 'COVER')
+            sign = -1 if action == 'LONG' else 1
+            exit_value = -sign * round(entry * (1 + rng.normal(0, 0.05)), 2)
+            self.trades.append(Trade(trade_id=trade_id, leg_id=1, timestamp=start + trade_id, ticker='AAPL', quantity=10, price=10.0, cost=sign * entry / 2, action=action, fees=1.0))
+            self.trades.append(Trade(trade_id=trade_id, leg_id=2, timestamp=start + trade_id, ticker='MSFT', quantity=10, price=10.0, cost=sign * entry / 2, action=action, fees=1.0))
+            self.trades.append(Trade(trade_id=trade_id, leg_id=1, timestamp=start + trade_id + 60, ticker='AAPL', quantity=-10, price=10.0, cost=exit_value, action=exit_action, fees=1.5))
+
+    def _batch_equity(self) -> dict:
+        equity_curve = self.performance_manager._standardize_to_daily_values(self.performance_manager.equity_log.to_records())['equity_value'].to_numpy()
+        return {
+            'total_return': PerformanceStatistics.total_return(equity_curve),
+            'max_drawdown': PerformanceStatistics.max_drawdown(equity_curve),
+            'annual_standard_deviation': PerformanceStatistics.annual_standard_deviation(equity_curve),
+            'ending_equity': equity_curve[-1],
+            'sharpe_ratio': PerformanceStatistics.sharpe_ratio(equity_curve),
+        }
+
+    def _batch(self) -> dict:
+        aggregated = self.performance_manager._aggregate_trades()
+        return {
+            **self._batch_equity(),
+            'net_profit': PerformanceStatistics.net_profit(aggregated),
+            'total_fees': aggregated['fees'].sum(),
+            'total_trades': PerformanceStatistics.total_trades(aggregated),
+            'num_winning_trades': PerformanceStatistics.total_winning_trades(aggregated),
+            'num_lossing_trades': PerformanceStatistics.total_losing_trades(aggregated),
+            'avg_win_percent': PerformanceStatistics.avg_win_return_rate(aggregated),
+            'avg_loss_percent': PerformanceStatistics.avg_loss_return_rate(aggregated),
+            'percent_profitable': PerformanceStatistics.profitability_ratio(aggregated),
+            'profit_and_loss': PerformanceStatistics.profit_and_loss_ratio(aggregated),
+            'profit_factor': PerformanceStatistics.profit_factor(aggregated),
+            'avg_trade_profit': PerformanceStatistics.avg_trade_profit(aggregated),
+            'sortino_ratio': PerformanceStatistics.sortino_ratio(aggregated),
+        }
+
+    def test_matches_batch(self):
+        for trade in sorted(self.trades, key=lambda trade: (trade.leg_id == 1 and trade.action in ['SELL', 'COVER'], trade.trade_id)):
+            self.performance_manager.update_trades(trade)
+        for timestamp, value in self.equity:
+            self.performance_manager.update_equity({'timestamp': timestamp, 'equity_value': value})
+
+        # Validation
+        online = self.performance_manager.online_stats.stats
+        for name, expected in self._batch().items():
+            self.assertAlmostEqual(online[name], float(expected), places=3, msg=name)
+
+    def test_matches_batch_mid_run(self):
+        for timestamp, value in self.equity[:62]: # stops intraday, the current day counts with its latest value
+            self.performance_manager.update_equity({'timestamp': timestamp, 'equity_value': value})
+
+        # Validation
+        online = self.performance_manager.online_stats.stats
+        for name, expected in self._batch_equity().items():
+            self.assertAlmostEqual(online[name], float(expected), places=3, msg=name)
+
+    def test_replayed_from_records(self):
+        for trade in self.trades:
+            self.performance_manager.update_trades(trade)
+        for timestamp, value in self.equity:
+            self.performance_manager.update_equity({'timestamp': timestamp, 'equity_value': value})
+        expected = dict(self.performance_manager.online_stats.stats)
+
+        # Test
+        restored = PerformanceManager(Mock(), Mock(), Mock())
+        restored.load_records(self.performance_manager.trade_log.to_records(), self.performance_manager.equity_log.to_records())
+
+        # Validation
+        for name, value in expected.items():
+            self.assertAlmostEqual(restored.online_stats.stats[name], value, places=6, msg=name)
+
+    def test_no_trades(self):
+        stats = OnlineStatistics().stats
+        self.assertEqual(stats['total_trades'], 0)
+        self.assertEqual(stats['profit_factor'], 0.0)
+        self.assertEqual(stats['sortino_ratio'], 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import numpy as np
+
+from midas.performance.recorder import ColumnRecorder, NUMBER
+
+class TestColumnRecorder(unittest.TestCase):
+    def setUp(self) -> None:
+        self.recorder = ColumnRecorder({'timestamp': np.int64, 'ticker': object, 'value': np.float64}, capacity=2)
+
+    def test_append_grows(self):
+        for i in range(5):
+            self.assertTrue(self.recorder.append({'timestamp': 1700000000 + i, 'ticker': 'AAPL', 'value': float(i)}))
+
+        # Validation
+        self.assertEqual(len(self.recorder), 5)
+        self.assertEqual(self.recorder.capacity, 8)
+        np.testing.assert_array_equal(self.recorder.column('value'), [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(self.recorder.column('timestamp').dtype, np.int64) # raw until export
+
+    def test_append_duplicate(self):
+        record = {'timestamp': 1700000000, 'ticker': 'AAPL', 'value': 1.0}
+        self.assertTrue(self.recorder.append(record))
+        self.assertFalse(self.recorder.append(dict(record)))
+        self.assertTrue(self.recorder.append({**record, 'value': 2.0}))
+        self.assertEqual(len(self.recorder), 2)
+
+    def test_to_records(self):
+        self.recorder.append({'timestamp': 1700000000, 'ticker': 'AAPL', 'value': 1.5})
+
+        # Validation
+        self.assertEqual(self.recorder.to_records(), [{'timestamp': '2023-11-14T22:13:20+00:00', 'ticker': 'AAPL', 'value': 1.5}])
+        self.assertEqual(self.recorder.to_frame()['timestamp'].tolist(), [1700000000])
+
+    def test_extend_exported(self):
+        self.recorder.append({'timestamp': 1700000000, 'ticker': 'AAPL', 'value': 1.5})
+        restored = ColumnRecorder({'timestamp': np.int64, 'ticker': object, 'value': np.float64})
+
+        # Test
+        restored.extend(self.recorder.to_records())
+
+        # Validation
+        self.assertEqual(restored.to_records(), self.recorder.to_records())
+        self.assertFalse(restored.append({'timestamp': 1700000000, 'ticker': 'AAPL', 'value': 1.5}))
+
+    # Type and Constraint Validation
+    def test_number_columns(self):
+        recorder = ColumnRecorder({'timestamp': NUMBER, 'quantity': NUMBER}, capacity=2)
+        recorder.append({'timestamp': 1700000000, 'quantity': 10})
+        recorder.append({'timestamp': 1700000001, 'quantity': -5})
+
+        # Integers stay integers
+        self.assertEqual(recorder.column('quantity').dtype, np.int64)
+        self.assertEqual(recorder.to_records()[0]['quantity'], 10)
+        self.assertIsInstance(recorder.to_records()[0]['quantity'], int)
+
+        # Test
+        recorder.append({'timestamp': 1700000002.75, 'quantity': 2.5})
+
+        # Validation, promoted without truncation
+        self.assertEqual(recorder.column('timestamp').dtype, np.float64)
+        np.testing.assert_array_equal(recorder.column('quantity'), [10.0, -5.0, 2.5])
+        self.assertEqual(recorder.to_frame()['timestamp'].tolist(), [1700000000.0, 1700000001.0, 1700000002.75])
+        self.assertEqual(recorder.to_records()[2]['timestamp'], '2023-11-14T22:13:22.750000+00:00')
+
+    def test_extend_float_timestamps(self):
+        recorder = ColumnRecorder({'timestamp': NUMBER, 'value': np.float64})
+
+        # Test
+        recorder.extend([{'timestamp': 1700000000.5, 'value': 1.0}])
+
+        # Validation, unix seconds rather than a parsed date
+        self.assertEqual(recorder.column('timestamp').tolist(), [1700000000.5])
+
+    def test_invalid_capacity(self):
+        with self.assertRaisesRegex(ValueError, "'capacity' must be a positive integer."):
+            ColumnRecorder({'timestamp': np.int64}, capacity=0)
+
+    def test_missing_timestamp_column(self):
+        with self.assertRaisesRegex(ValueError, "'timestamp' must be one of the columns."):
+            ColumnRecorder({'value': np.float64})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import numpy as np
+from unittest.mock import Mock
+
+from midas.account_data import Trade
+from midas.performance.manager import PerformanceManager
+from midas.performance.resampling import RobustnessAnalysis
+
+class TestRobustnessAnalysis(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(5)
+        self.equity_curve = 100000 * np.cumprod(np.r_[1, 1 + rng.normal(0.001, 0.01, size=249)])
+        self.trade_pnl = rng.normal(50, 400, size=40)
+        self.trade_entries = np.sort(rng.choice(240, size=40, replace=False))
+        self.analysis = RobustnessAnalysis(self.equity_curve, self.trade_pnl, self.trade_entries, workers=1, batch_size=128, seed=42)
+
+    def test_trade_permutation(self):
+        samples = self.analysis.trade_permutation(300)
+
+        # Validation
+        self.assertEqual(len(samples['max_drawdown']), 300)
+        np.testing.assert_allclose(samples['net_profit'], self.trade_pnl.sum()) # order does not change the total
+        self.assertTrue((samples['max_drawdown'] <= 0).all())
+        self.assertGreater(np.std(samples['max_drawdown']), 0)
+
+    def test_block_bootstrap(self):
+        samples = self.analysis.block_bootstrap(400, mean_block=10)
+        intervals = RobustnessAnalysis.confidence_intervals(samples, 0.9)
+
+        # Validation
+        original = self.equity_curve[-1] - self.equity_curve[0]
+        self.assertLess(intervals['net_profit'][0], original)
+        self.assertGreater(intervals['net_profit'][1], original)
+        self.assertLessEqual(intervals['sharpe_ratio'][0], intervals['sharpe_ratio'][1])
+
+    def test_entry_delay_without_delay(self):
+        samples = self.analysis.entry_delay(10, max_delay=0)
+
+        # Validation
+        np.testing.assert_allclose(samples['net_profit'], self.equity_curve[-1] - self.equity_curve[0])
+
+    def test_entry_delay(self):
+        samples = self.analysis.entry_delay(200, max_delay=5)
+
+        # Validation
+        self.assertGreater(np.std(samples['net_profit']), 0)
+
+    def test_reproducible_across_workers(self):
+        pooled = RobustnessAnalysis(self.equity_curve, self.trade_pnl, self.trade_entries, workers=2, batch_size=128, seed=42)
+
+        # Test
+        expected = self.analysis.block_bootstrap(300)
+        result = pooled.block_bootstrap(300)
+
+        # Validation
+        for name in expected:
+            np.testing.assert_array_equal(result[name], expected[name])
+
+    def test_run(self):
+        intervals = self.analysis.run(200)
+        self.assertEqual(set(intervals), {'trade_permutation', 'block_bootstrap', 'entry_delay'})
+        self.assertEqual(set(intervals['entry_delay']), {'sharpe_ratio', 'max_drawdown', 'net_profit'})
+
+    def test_from_performance_manager(self):
+        performance_manager = PerformanceManager(Mock(), Mock(), Mock())
+        for day in range(10):
+            performance_manager.update_equity({'timestamp': 1704067200 + day * 86400, 'equity_value': 1000.0 + 10 * day})
+        performance_manager.update_trades(Trade(trade_id=1, leg_id=1, timestamp=1704067200 + 3 * 86400 + 60, ticker='AAPL', quantity=1, price=10.0, cost=-10.0, action='LONG', fees=1.0))
+        performance_manager.update_trades(Trade(trade_id=1, leg_id=1, timestamp=1704067200 + 5 * 86400, ticker='AAPL', quantity=-1, price=12.0, cost=12.0, action='SELL', fees=1.0))
+
+        # Test
+        analysis = RobustnessAnalysis.from_performance_manager(performance_manager, workers=1)
+
+        # Validation
+        self.assertEqual(len(analysis.equity_curve), 10)
+        np.testing.assert_array_equal(analysis.trade_pnl, [0.0])
+        np.testing.assert_array_equal(analysis.trade_entries, [2]) # exposed to the return closing day 3
+
+    # Type and Constraint Validation
+    def test_resamples_validation(self):
+        with self.assertRaisesRegex(ValueError, "'resamples' must be a positive integer."):
+            self.analysis.trade_permutation(0)
+
+    def test_entry_delay_validation(self):
+        with self.assertRaisesRegex(ValueError, "'max_delay' must be a non-negative integer."):
+            self.analysis.entry_delay(10, max_delay=-1)
+
+        with self.assertRaisesRegex(ValueError, "'trade_entries' are required to delay entries."):
+            RobustnessAnalysis(self.equity_curve, self.trade_pnl).entry_delay(10)
+
+    def test_confidence_validation(self):
+        with self.assertRaisesRegex(ValueError, "'confidence' must be a float between 0 and 1."):
+            RobustnessAnalysis.confidence_intervals({'net_profit': np.ones(3)}, 1.5)
+
+    def test_equity_curve_type(self):
+        with self.assertRaisesRegex(TypeError, "equity_curve must be a numpy array of at least two values"):
+            RobustnessAnalysis([1.0, 2.0], self.trade_pnl)
+
+if __name__ == "__main__":
+    unittest.main()
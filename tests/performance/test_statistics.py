@@ -438,6 +438,72 @@ class TestPerformancStatistics(unittest.TestCase):
         self.assertIsInstance(result, np.ndarray)
         self.assertEqual(result, 0)  # Expecting an array with a single zero
 
+    # Rolling
+    def _rolling_curves(self):
+        rng = np.random.default_rng(3)
+        equity_curve = 100000 * np.cumprod(1 + rng.normal(0.0001, 0.001, size=2000))
+        benchmark_curve = 4000 * np.cumprod(1 + rng.normal(0.0001, 0.0008, size=2000))
+        return equity_curve, benchmark_curve
+
+    def test_rolling_volatility_and_sharpe(self):
+        equity_curve, _ = self._rolling_curves()
+        returns = pd.Series(np.diff(equity_curve) / equity_curve[:-1])
+        excess = returns - 0.04 / 252
+        rolling = excess.rolling(50)
+
+        # Test
+        volatility = PerformanceStatistics.rolling_volatility(equity_curve, 50)
+        sharpe = PerformanceStatistics.rolling_sharpe_ratio(equity_curve, 50)
+
+        # Validation
+        np.testing.assert_allclose(volatility, returns.rolling(50).std() * np.sqrt(252), atol=1e-4)
+        np.testing.assert_allclose(sharpe, rolling.mean() / rolling.std() * np.sqrt(252), atol=1e-3)
+        self.assertTrue(np.isnan(sharpe[:49]).all())
+
+    def test_rolling_sortino_ratio(self):
+        equity_curve, _ = self._rolling_curves()
+        returns = pd.Series(np.diff(equity_curve) / equity_curve[:-1])
+        downside = np.sqrt((np.minimum(returns, 0) ** 2).rolling(50).mean())
+        expected = returns.rolling(50).mean() / downside * np.sqrt(252)
+
+        # Test
+        sortino = PerformanceStatistics.rolling_sortino_ratio(equity_curve, 50)
+
+        # Validation
+        np.testing.assert_allclose(sortino, expected, atol=1e-3)
+
+    def test_rolling_beta_and_alpha(self):
+        equity_curve, benchmark_curve = self._rolling_curves()
+        returns = pd.Series(np.diff(equity_curve) / equity_curve[:-1])
+        benchmark_returns = pd.Series(np.diff(benchmark_curve) / benchmark_curve[:-1])
+        expected_beta = returns.rolling(50).cov(benchmark_returns) / benchmark_returns.rolling(50).var()
+        period_rate = 0.04 / 252
+        expected_alpha = (returns.rolling(50).mean() - (period_rate + expected_beta * (benchmark_returns.rolling(50).mean() - period_rate))) * 252
+
+        # Test
+        beta = PerformanceStatistics.rolling_beta(equity_curve, benchmark_curve, 50)
+        alpha = PerformanceStatistics.rolling_alpha(equity_curve, benchmark_curve, 50, 0.04)
+
+        # Validation
+        np.testing.assert_allclose(beta, expected_beta, atol=1e-4)
+        np.testing.assert_allclose(alpha, expected_alpha, atol=1e-4)
+
+    def test_rolling_flat_window(self):
+        equity_curve = np.array([100.0, 101.0, 101.0, 101.0, 101.0, 102.0])
+        self.assertEqual(PerformanceStatistics.rolling_sharpe_ratio(equity_curve, 3)[3], 0)
+        self.assertTrue(np.isnan(PerformanceStatistics.rolling_beta(self.equity_curve, np.array([100, 100, 100, 100, 100]), 2)).all())
+
+    def test_rolling_window_validation(self):
+        with self.assertRaisesRegex(ValueError, "'window' must be an integer of at least 2."):
+            PerformanceStatistics.rolling_volatility(self.equity_curve, 1)
+
+        with self.assertRaisesRegex(ValueError, "'benchmark_equity_curve' must be aligned with 'portfolio_equity_curve'."):
+            PerformanceStatistics.rolling_beta(self.equity_curve, self.benchmark_equity_curve[:-1], 2)
+
+    def test_drawdown_duration(self):
+        equity_curve = np.array([100, 105, 103, 104, 106, 101, 106])
+        np.testing.assert_array_equal(PerformanceStatistics.drawdown_duration(equity_curve), [0, 0, 1, 2, 0, 1, 0])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -68,6 +68,45 @@ class TestPortfolioServer(unittest.TestCase):
         self.assertEqual(len(self.portfolio_server.positions), 1)
         self.assertFalse(self.mock_logger.info.called)
 
+    def test_update_positions_versioned(self):
+        contract = Contract()
+        contract.symbol = 'AAPL'
+        position = Position(action='BUY', 
+                            avg_cost=10.9,
+                            quantity=100,
+                            total_cost=100000,
+                            market_value=10000,
+                            multiplier=1,
+                            initial_margin=0)
+        
+        # Test
+        self.portfolio_server.update_positions(contract, position, 1)
+        self.portfolio_server.update_positions(contract, position, 1) # stale version skipped
+
+        # Validation
+        self.assertEqual(self.portfolio_server.positions[contract.symbol], position)
+        self.assertEqual(self.portfolio_server.position_versions[contract.symbol], 1)
+        self.mock_logger.info.assert_called_once_with("\nPosition Updated: \n AAPL: {'action': 'BUY', 'avg_cost': 10.9, 'quantity': 100, 'total_cost': 100000, 'market_value': 10000, 'multiplier': 1, 'initial_margin': 0} \n")
+
+    def test_remove_position(self):
+        contract = Contract()
+        contract.symbol = 'AAPL'
+        position = Position(action='BUY', 
+                            avg_cost=10.9,
+                            quantity=100,
+                            total_cost=100000,
+                            market_value=10000,
+                            multiplier=1,
+                            initial_margin=0)
+        self.portfolio_server.update_positions(contract, position, 1)
+
+        # Test
+        self.portfolio_server.remove_position(contract, 2)
+
+        # Validation
+        self.assertEqual(self.portfolio_server.positions, {})
+        self.assertEqual(self.portfolio_server.position_versions[contract.symbol], 2)
+
     def test_output_positions(self):
         contract = Contract()
         contract.symbol = 'AAPL'
@@ -83,7 +122,7 @@ class TestPortfolioServer(unittest.TestCase):
         self.portfolio_server.update_positions(contract, position)
 
         # Validation
-        self.mock_logger.info.assert_called_once_with("\nPositions Updated: \n AAPL: {'action': 'BUY', 'avg_cost': 10.9, 'quantity': 100, 'total_cost': 100000, 'market_value': 10000, 'multiplier': 1, 'initial_margin': 0} \n")
+        self.mock_logger.info.assert_called_once_with("\nPosition Updated: \n AAPL: {'action': 'BUY', 'avg_cost': 10.9, 'quantity': 100, 'total_cost': 100000, 'market_value': 10000, 'multiplier': 1, 'initial_margin': 0} \n")
 
     def test_update_account_details_valid(self):
         account_info = AccountDetails(FullAvailableFunds = 100000.0, 
@@ -114,6 +153,32 @@ class TestPortfolioServer(unittest.TestCase):
         # Validation
         self.mock_logger.info.assert_called_once_with('\nAccount Updated: \n FullAvailableFunds : 100000.0 \n FullInitMarginReq : 100000.0 \n NetLiquidation : 100000.0 \n UnrealizedPnL : 100000.0 \n FullMaintMarginReq : 100000.0 \n Currency : USD \n')
         
+    def test_output_account_changes(self):
+        account_info = AccountDetails(FullAvailableFunds = 100000.0, FullInitMarginReq = 0.0, NetLiquidation = 100000.0)
+        self.portfolio_server.update_account_details(account_info)
+        self.mock_logger.reset_mock()
+
+        # Test
+        account_info['FullAvailableFunds'] = 90000.0 # the broker updates its account in place
+        self.portfolio_server.update_account_details(account_info)
+        self.portfolio_server.update_account_details(account_info)
+
+        # Validation
+        self.mock_logger.info.assert_called_once_with('\nAccount Updated: \n FullAvailableFunds : 90000.0 \n')
+
+    def test_log_snapshot(self):
+        contract = Contract()
+        contract.symbol = 'AAPL'
+        position = Position(action='BUY', avg_cost=10.9, quantity=100, total_cost=100000, market_value=10000, multiplier=1, initial_margin=0)
+        self.portfolio_server.update_positions(contract, position)
+        self.portfolio_server.update_account_details(AccountDetails(FullAvailableFunds = 100000.0))
+
+        # Test
+        self.portfolio_server.log_snapshot()
+
+        # Validation
+        self.mock_logger.info.assert_called_with(f"\nPositions: \n AAPL: {position.__dict__} \n\nOrders: \n\nAccount: \n FullAvailableFunds : 100000.0 \n")
+
     def test_update_orders_new_valid(self):
         order_id = 10
         contract = Contract()
@@ -75,6 +75,16 @@ class TestTestStrategy(unittest.TestCase):
         called_with_arg = self.mock_event_queue.put.call_args[0][0] # Get the argument with which event_queue.put was called
         self.assertIsInstance(called_with_arg, SignalEvent, "The argument is not an instance of SignalEvent")
 
+    def test_set_signal_latency(self):
+        with patch('midas.strategies.base_strategy.latency_tracker') as mock_tracker:
+            mock_tracker.enabled = False
+            self.test_strategy.set_signal(self.valid_trade_instructions, self.valid_trade_capital, self.valid_timestamp)
+            mock_tracker.mark_signal.assert_not_called() # nothing built while disabled
+
+            mock_tracker.enabled = True
+            self.test_strategy.set_signal(self.valid_trade_instructions, self.valid_trade_capital, self.valid_timestamp)
+            mock_tracker.mark_signal.assert_called_once_with({2: ['AAPL', 'TSLA']})
+
     # Type Validation
     def test_on_market_data_invalid_event(self):
         # Test invalid event type
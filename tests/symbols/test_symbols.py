@@ -796,6 +796,18 @@ class TestOption(unittest.TestCase):
         self.assertEqual(contract.right, self.valid_right.value)
         self.assertEqual(contract.strike, self.valid_strike)
 
+    def test_underlying_type_validation(self):
+        with self.assertRaisesRegex(TypeError, "underlying must be a string or None"):
+            Option(ticker=self.valid_ticker, 
+                    currency=self.valid_currency, 
+                    exchange=self.valid_exchange, 
+                    fees=self.valid_fees, 
+                    lastTradeDateOrContractMonth=self.valid_lastTradeDateOrContractMonth,
+                    multiplier=self.valid_multiplier, 
+                    right= self.valid_right, 
+                    strike=self.valid_strike,
+                    underlying=123)
+
     # Type/Constraint Validation
     def test_ticker_type_validation(self):
         with self.assertRaisesRegex(TypeError, "ticker must be a string"):
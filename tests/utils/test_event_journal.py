@@ -0,0 +1,70 @@
+import os
+import unittest
+import tempfile
+from ibapi.contract import Contract
+
+from midas.utils.event_journal import EventJournal, read_journal
+from midas.events import MarketEvent, BarData, SignalEvent, TradeInstruction, OrderEvent, MarketOrder, ExecutionEvent, ExecutionDetails, OrderType, Action
+
+class TestEventJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'journal', 'events.bin')
+
+        self.market_event = MarketEvent(timestamp=1651500000, data={'AAPL': BarData(1651500000, 100.0, 101.0, 99.0, 100.5, 1000.0)})
+        self.signal_event = SignalEvent(1651500000, 10000, [TradeInstruction('AAPL', OrderType.MARKET, Action.LONG, 1, 1, 0.5)])
+        self.order_event = OrderEvent(timestamp=1651500000, trade_id=1, leg_id=1, action=Action.LONG, contract=Contract(), order=MarketOrder(Action.LONG, 10))
+        self.execution_event = ExecutionEvent(timestamp=1651500000,
+                                              trade_details=ExecutionDetails(timestamp=1651500000, trade_id=1, leg_id=1, symbol='AAPL', quantity=10, price=100.5, cost=-1005.0, action='BUY', fees=0.5),
+                                              action=Action.LONG,
+                                              contract=Contract())
+        self.events = [self.market_event, self.signal_event, self.order_event, self.execution_event]
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_write_and_read(self):
+        with EventJournal(self.path) as journal:
+            for event in self.events:
+                journal.write(event)
+
+        events = list(read_journal(self.path))
+
+        # Validation
+        self.assertEqual(journal.events_written, 4)
+        self.assertEqual([type(event) for event in events], [MarketEvent, SignalEvent, OrderEvent, ExecutionEvent])
+        self.assertEqual(events[0], self.market_event)
+        self.assertEqual(events[1].to_dict(), self.signal_event.to_dict())
+        self.assertEqual(events[2].order.quantity, 10)
+        self.assertEqual(events[3].trade_details, self.execution_event.trade_details)
+
+    def test_read_filtered(self):
+        with EventJournal(self.path) as journal:
+            for event in self.events:
+                journal.write(event)
+
+        events = list(read_journal(self.path, [MarketEvent, OrderEvent]))
+
+        # Validation
+        self.assertEqual([type(event) for event in events], [MarketEvent, OrderEvent])
+
+    def test_truncated_record_ignored(self):
+        with EventJournal(self.path) as journal:
+            journal.write(self.market_event)
+            journal.write(self.signal_event)
+
+        with open(self.path, 'r+b') as file:
+            file.truncate(os.path.getsize(self.path) - 5)
+
+        # Validation
+        self.assertEqual(list(read_journal(self.path)), [self.market_event])
+
+    def test_invalid_journal(self):
+        with open(os.path.join(self.temp_dir.name, 'other.bin'), 'wb') as file:
+            file.write(b'not a journal')
+
+        with self.assertRaisesRegex(ValueError, "is not an event journal"):
+            list(read_journal(os.path.join(self.temp_dir.name, 'other.bin')))
+
+if __name__ == "__main__":
+    unittest.main()
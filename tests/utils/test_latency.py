@@ -0,0 +1,120 @@
+import os
+import json
+import unittest
+import tempfile
+from unittest.mock import Mock, patch
+
+from midas.utils.latency import LatencyTracker, LatencyHistogram
+
+class TestLatencyHistogram(unittest.TestCase):
+    def setUp(self) -> None:
+        self.histogram = LatencyHistogram()
+
+    def test_record(self):
+        for value in [3, 100, 5000]:
+            self.histogram.record(value)
+
+        self.assertEqual(self.histogram.count, 3)
+        self.assertEqual(self.histogram.min, 3)
+        self.assertEqual(self.histogram.max, 5000)
+        self.assertEqual(sum(self.histogram.counts), 3)
+
+    def test_percentile(self):
+        for value in [1] * 90 + [1000] * 10:
+            self.histogram.record(value)
+
+        self.assertEqual(self.histogram.percentile(0.5), 1)
+        self.assertEqual(self.histogram.percentile(0.99), 1024) # upper edge of the bucket
+
+    def test_percentile_empty(self):
+        self.assertIsNone(self.histogram.percentile(0.5))
+
+class TestLatencyTracker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_logger = Mock()
+        self.tracker = LatencyTracker()
+        self.tracker.enable(self.mock_logger)
+
+    def tearDown(self) -> None:
+        self.tracker.disable()
+
+    def test_full_path(self):
+        # Each hop 1ms after the previous one
+        stamps = iter([2_000_000, 3_000_000, 4_000_000, 5_000_000])
+        with patch.object(LatencyTracker, 'now', side_effect=lambda: next(stamps)):
+            self.tracker.mark_market('AAPL', 1_000_000)
+            self.tracker.mark_signal({1: ['AAPL']})
+            self.tracker.mark_order(1)
+            self.tracker.mark_order_placed(1, 101)
+            self.tracker.mark_order_status(101)
+
+        snapshot = self.tracker.snapshot()
+        for stage in ['bar_to_signal', 'signal_to_order', 'order_to_place', 'place_to_status']:
+            self.assertEqual(snapshot[stage]['count'], 1)
+            self.assertEqual(snapshot[stage]['mean_us'], 1000)
+        self.assertEqual(snapshot['tick_to_trade']['mean_us'], 4000)
+
+    def test_first_order_status_only(self):
+        self.tracker.mark_market('AAPL')
+        self.tracker.mark_signal({1: ['AAPL']})
+        self.tracker.mark_order_placed(1, 101)
+        self.tracker.mark_order_status(101)
+        self.tracker.mark_order_status(101) # e.g. Submitted then Filled
+
+        self.assertEqual(self.tracker.snapshot()['place_to_status']['count'], 1)
+
+    def test_multi_leg(self):
+        self.tracker.mark_market('AAPL')
+        self.tracker.mark_signal({1: ['AAPL']})
+        self.tracker.mark_order(1)
+        self.tracker.mark_order(1) # second leg, only first leg timed
+        self.tracker.mark_order_placed(1, 101)
+        self.tracker.mark_order_placed(1, 102)
+        self.tracker.mark_order_status(102)
+        self.tracker.mark_order_status(101)
+
+        snapshot = self.tracker.snapshot()
+        self.assertEqual(snapshot['signal_to_order']['count'], 1)
+        self.assertEqual(snapshot['place_to_status']['count'], 2)
+        self.assertEqual(snapshot['tick_to_trade']['count'], 2)
+
+    def test_disabled_noop(self):
+        self.tracker.disable()
+        self.tracker.mark_market('AAPL')
+        self.tracker.mark_signal({1: ['AAPL']})
+
+        self.assertEqual(self.tracker.snapshot()['bar_to_signal']['count'], 0)
+        self.assertEqual(self.tracker._trades, {})
+
+    def test_market_by_symbol(self):
+        self.tracker.mark_market('AAPL', 1_000_000)
+        self.tracker.mark_market('MSFT', 3_000_000)
+        self.tracker.mark_market('TSLA', 4_000_000) # unrelated symbol arriving last
+        with patch.object(LatencyTracker, 'now', return_value=5_000_000):
+            self.tracker.mark_signal({1: ['AAPL'], 2: ['AAPL', 'MSFT'], 3: ['NVDA']})
+
+        # Validation
+        self.assertEqual(self.tracker._trades[1]['market'], 1_000_000)
+        self.assertEqual(self.tracker._trades[2]['market'], 3_000_000) # latest of its legs
+        self.assertIsNone(self.tracker._trades[3]['market'])
+        self.assertEqual(self.tracker.snapshot()['bar_to_signal']['count'], 2)
+
+    def test_pending_bounded(self):
+        self.tracker.max_pending = 5
+        self.tracker.mark_signal({trade_id: ['AAPL'] for trade_id in range(1, 20)})
+        self.assertEqual(len(self.tracker._trades), 5)
+
+    def test_export(self):
+        self.tracker.mark_market('AAPL')
+        self.tracker.mark_signal({1: ['AAPL']})
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.tracker.export_path = os.path.join(tmp_dir, 'latency', 'latency.json')
+            snapshot = self.tracker.export()
+
+            with open(self.tracker.export_path) as file:
+                self.assertEqual(json.load(file)['bar_to_signal']['count'], snapshot['bar_to_signal']['count'])
+        self.mock_logger.info.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+from unittest.mock import Mock
+
+from midas.utils.market_recorder import MarketDataRecorder, read_recorded_bars, read_recorded_file, recorded_files
+
+class TestMarketDataRecorder(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+        self.mock_logger = Mock()
+        self.recorder = MarketDataRecorder(self.directory, self.mock_logger, buffer_size=2)
+
+        self.day_one = 1714658400 # 2024-05-02 14:00:00 UTC
+        self.day_two = self.day_one + 86400
+
+    def tearDown(self) -> None:
+        self.recorder.stop()
+        self.temp_dir.cleanup()
+
+    def test_record_and_read(self):
+        self.recorder.start()
+        self.recorder.record('AAPL', self.day_one, 100.0, 101.0, 99.0, 100.5, 1000.0)
+        self.recorder.record('MSFT', self.day_one, 200.0, 201.0, 199.0, 200.5, 500.0)
+        self.recorder.record('AAPL', self.day_one + 5, 100.5, 102.0, 100.0, 101.5, 800.0)
+        self.recorder.stop()
+
+        data = read_recorded_bars(self.directory)
+
+        # Validation
+        self.assertEqual(self.recorder.rows_written, 3)
+        self.assertEqual(list(data.columns), ['timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume'])
+        self.assertEqual(data['symbol'].tolist(), ['AAPL', 'MSFT', 'AAPL'])
+        self.assertEqual(data['timestamp'].tolist(), [self.day_one, self.day_one, self.day_one + 5])
+        self.assertEqual(data['close'].tolist(), [100.5, 200.5, 101.5])
+
+    def test_daily_rotation(self):
+        self.recorder.start()
+        self.recorder.record('AAPL', self.day_one, 100.0, 101.0, 99.0, 100.5, 1000.0)
+        self.recorder.record('AAPL', self.day_two, 101.0, 102.0, 100.0, 101.5, 1000.0)
+        self.recorder.stop()
+
+        # Validation
+        files = [os.path.basename(path) for path in recorded_files(self.directory)]
+        self.assertEqual(files, ['bars_2024-05-02.mdr', 'bars_2024-05-03.mdr'])
+        self.assertEqual(len(read_recorded_bars(self.directory, start_date='2024-05-03')), 1)
+
+    def test_append_across_sessions(self):
+        self.recorder.start()
+        self.recorder.record('AAPL', self.day_one, 100.0, 101.0, 99.0, 100.5, 1000.0)
+        self.recorder.stop()
+
+        recorder = MarketDataRecorder(self.directory, self.mock_logger)
+        recorder.start()
+        recorder.record('AAPL', self.day_one + 5, 100.5, 102.0, 100.0, 101.5, 800.0)
+        recorder.stop()
+
+        # Validation
+        self.assertEqual(read_recorded_bars(self.directory)['timestamp'].tolist(), [self.day_one, self.day_one + 5])
+
+    def test_truncated_block_ignored(self):
+        self.recorder.start()
+        self.recorder.record('AAPL', self.day_one, 100.0, 101.0, 99.0, 100.5, 1000.0)
+        self.recorder.stop()
+
+        # Simulate a write interrupted mid block
+        path = recorded_files(self.directory)[0]
+        with open(path, 'ab') as file:
+            file.write(b'MDRB\x05\x00\x00\x00' + b'\x00' * 10)
+
+        # Validation
+        columns = read_recorded_file(path)
+        self.assertEqual(len(columns['timestamp']), 1)
+        self.assertEqual(columns['timestamp'].dtype, np.dtype('int64'))
+
+    def test_read_empty_directory(self):
+        data = read_recorded_bars(self.directory)
+        self.assertTrue(data.empty)
+        self.assertEqual(list(data.columns), ['timestamp', 'symbol', 'open', 'high', 'low', 'close', 'volume'])
+
+    def test_buffer_size_validation(self):
+        with self.assertRaisesRegex(ValueError, "'buffer_size' must be a positive integer."):
+            MarketDataRecorder(self.directory, buffer_size=0)
+
+    def test_symbol_overflow(self):
+        symbol = 'SPXW  240503C05100000' * 2 # 42 bytes
+        self.recorder.record(symbol, self.day_one, 1.0, 1.0, 1.0, 1.0, 1.0)
+        self.recorder.record(symbol, self.day_one + 5, 1.0, 1.0, 1.0, 1.0, 1.0)
+        self.recorder.record('A' * 32, self.day_one, 1.0, 1.0, 1.0, 1.0, 1.0) # fits exactly
+        self.recorder.start()
+        self.recorder.stop()
+
+        # Validation
+        self.assertEqual(read_recorded_bars(self.directory)['symbol'].tolist(), ['A' * 32])
+        self.assertEqual(self.recorder.skipped_symbols, {symbol})
+        self.mock_logger.error.assert_called_once_with(f"Market data recorder skips {symbol}, it exceeds the 32 bytes recorded per symbol.")
+
+if __name__ == "__main__":
+    unittest.main()